@@ -1,6 +1,99 @@
+import collections
+
+from tools.memo_tools import evaluate
+
+############################################################
+#   top-down, memoized
+############################################################
+
+
+def children(state):
+    (x, y, z) = state
+
+    if x <= 0:
+        return ()
+    else:
+        return ((x - 1, y + 1, z), (x - 2, y + 2, z * 2), (x - 3, y + 3, z * 3))
+
+
+def combine(state, values):
+    (x, y, z) = state
+
+    if x <= 0:
+        return y + z
+    else:
+        return sum(values)
+
+
+def expensive_seq_memoized(x, y, z, memo=None):
+    """
+    Evaluate `exps(x, y, z)` from the top down, caching states in `memo`
+    (by default, a new `Memo` per call; pass one to share states between calls).
+    """
+
+    return evaluate((x, y, z), children, combine, memo=memo)
+
+
+############################################################
+#   bottom-up
+############################################################
+
+
+def expensive_seq_bottom_up(x, y, z):
+    """
+    Evaluate `exps(x, y, z)` a row of `x` at a time, from the base cases up.
+
+    Below the root, `y` only ever grows by as much as `x` shrinks, and `z` is
+    the root's `z` times `2**a * 3**b`, where `a` and `b` count the steps of
+    2 and of 3 taken so far. So the states of row `x` are just the pairs
+    `(a, b)` with `2*a + 3*b <= x0 - x`, which are all reachable, and are kept
+    as a triangle of lists, `row[a][b]`, with no keys to store or hash.
+
+    Each row only needs the three rows below it, so no more than four are
+    ever held at once.
+    """
+
+    if x <= 0:
+        return y + z
+
+    x0 = x
+
+    # (the three base rows are enumerated whole, though a few of their
+    # states can't be reached; it's cheaper than working out which)
+    powers_of_2 = [2**a for a in range(x0 // 2 + 2)]
+    powers_of_3 = [3**b for b in range(x0 // 3 + 2)]
+
+    rows = collections.deque(maxlen=3)
+
+    for row_x in (-2, -1, 0):
+        depth = x0 - row_x
+        rows.append(
+            [
+                [y + depth + z * powers_of_2[a] * powers_of_3[b] for b in range((depth - 2 * a) // 3 + 1)]
+                for a in range(depth // 2 + 1)
+            ]
+        )
+
+    for row_x in range(1, x0 + 1):
+        depth = x0 - row_x
+        (row_3, row_2, row_1) = rows
+
+        # appending drops the row three below, which is no longer needed
+        rows.append(
+            [
+                [row_1[a][b] + row_2[a + 1][b] + row_3[a][b + 1] for b in range((depth - 2 * a) // 3 + 1)]
+                for a in range(depth // 2 + 1)
+            ]
+        )
+
+    return rows[-1][0][0]
+
+
+############################################################
+
+
 def expensive_seq(x, y, z):
-    # Implement me.
-    pass
+    return expensive_seq_bottom_up(x, y, z)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 import unittest
 
-from expensive_seq import expensive_seq
+from expensive_seq import expensive_seq, expensive_seq_bottom_up, expensive_seq_memoized
+
+from tools.memo_tools import Memo
 
 
 class TestHashTable(unittest.TestCase):
@@ -28,6 +30,21 @@ class TestHashTable(unittest.TestCase):
             x == 348089347602676380885589070822523585642423790379026639337628
         )
 
+    def test_expseq_memoized(self):
+        memo = Memo()
+
+        for i in range(10):
+            x = expensive_seq_bottom_up(i * 2, i * 3, i * 4)
+            self.assertTrue(expensive_seq_memoized(i * 2, i * 3, i * 4) == x)
+            self.assertTrue(expensive_seq_memoized(i * 2, i * 3, i * 4, memo=memo) == x)
+
+        # a shared memo reuses states, so evaluating again is all hits
+        size = len(memo)
+        expensive_seq_memoized(18, 27, 36, memo=memo)
+        self.assertTrue(len(memo) == size)
+
+        self.assertTrue(expensive_seq_memoized(60, 40, 80) == expensive_seq_bottom_up(60, 40, 80))
+
 
 if __name__ == "__main__":
     unittest.main()
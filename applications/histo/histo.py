@@ -1 +1,153 @@
-# Implement me.
+import argparse
+import heapq
+import os
+import shutil
+import sys
+
+from applications.word_count.word_count import file_words, word_count_file, word_count_parallel
+from tools.data_structures.space_saving import SpaceSaving
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "robin.txt")
+
+
+def row_order(row):
+    """
+    Order `(word, count)` rows by count, most first, then by word.
+    """
+
+    return (-row[1], row[0])
+
+
+def top_counts(counts, top=None):
+    """
+    Return the `top` `(word, count)` pairs of `counts` (or all of them), in `row_order`.
+    Picking the top few goes through a heap of just `top` pairs, instead of sorting them all.
+    """
+
+    if top is None:
+        return sorted(counts.items(), key=row_order)
+    else:
+        return heapq.nsmallest(top, counts.items(), key=row_order)
+
+
+def approximate_top_counts(words, top=None, capacity=SpaceSaving.DEFAULT_CAPACITY):
+    """
+    Return about the `top` `(word, count)` pairs of a stream of `words`, in `row_order`,
+    counting at most `capacity` distinct words at once.
+    Counts may be over-estimated; see `SpaceSaving`.
+    """
+
+    heavy_hitters = SpaceSaving(capacity=capacity)
+    heavy_hitters.add_many(words)
+
+    # `SpaceSaving` breaks ties by arrival, not by word, so pick from all of its counts
+    counts = {word: count for (word, count, error) in heavy_hitters.top()}
+
+    return top_counts(counts, top=top)
+
+
+def render_histogram(rows, out=None, columns=None):
+    """
+    Write a histogram of `(word, count)` rows to `out` (by default, stdout),
+    with the bars left justified two spaces after the longest word.
+
+    By default, there is one hash mark per occurrence. If `columns` is given,
+    the bars are scaled down so every line fits in `columns` characters,
+    though any word that occurs at all keeps at least one mark.
+
+    Paddings and bars are cut from strings built once,
+    and the lines go out through the writer's buffer in one call.
+    """
+
+    if out is None:
+        out = sys.stdout
+
+    if len(rows) == 0:
+        return
+
+    width = max(len(word) for (word, count) in rows) + 2
+    max_count = max(count for (word, count) in rows)
+
+    if columns is None:
+        bar_room = max_count
+    else:
+        bar_room = min(max_count, max(1, columns - width))
+
+    padding = " " * width
+    bars = "#" * bar_room
+
+    def bar_length(count):
+        if count <= 0:
+            return 0
+        else:
+            return max(1, count * bar_room // max_count)
+
+    out.writelines(
+        f"{word}{padding[len(word):]}{bars[:bar_length(count)]}\n"
+        for (word, count) in rows
+    )
+
+    return
+
+
+def terminal_columns():
+    return shutil.get_terminal_size().columns
+
+
+def histo(
+    path=DEFAULT_PATH,
+    processes=1,
+    top=None,
+    approximate=False,
+    capacity=SpaceSaving.DEFAULT_CAPACITY,
+    columns=None,
+    out=None,
+):
+    """
+    Print a histogram of the words in the file at `path`.
+    -   `processes`: count with this many worker processes (or serially, if 1).
+    -   `top`: only print the `top` most common words.
+    -   `approximate`: find the most common words in fixed memory,
+        counting at most `capacity` distinct words at once.
+    -   `columns`: scale the bars to fit lines in this many characters.
+    -   `out`: write to this text stream instead of stdout.
+    """
+
+    if approximate:
+        rows = approximate_top_counts(file_words(path), top=top, capacity=capacity)
+
+    else:
+        if processes == 1:
+            counts = word_count_file(path)
+        else:
+            counts = word_count_parallel([path], processes=processes)
+
+        rows = top_counts(counts, top=top)
+
+    render_histogram(rows, out=out, columns=columns)
+
+    return
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print a histogram of the words in a file.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--top", type=int, default=None)
+    parser.add_argument("--approximate", action="store_true")
+    parser.add_argument("--capacity", type=int, default=SpaceSaving.DEFAULT_CAPACITY)
+    parser.add_argument("--columns", type=int, default=None)
+    parser.add_argument("--fit", action="store_true", help="scale bars to the terminal width")
+    args = parser.parse_args()
+
+    if args.fit and args.columns is None:
+        args.columns = terminal_columns()
+
+    histo(
+        args.path,
+        processes=args.processes,
+        top=args.top,
+        approximate=args.approximate,
+        capacity=args.capacity,
+        columns=args.columns,
+    )
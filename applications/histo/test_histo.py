@@ -0,0 +1,100 @@
+import collections
+import io
+import os
+import random
+import unittest
+
+from histo import approximate_top_counts, histo, render_histogram, row_order, top_counts
+
+
+def brute_force_rows(words):
+    return sorted(collections.Counter(words).items(), key=lambda row: (-row[1], row[0]))
+
+
+class TestHisto(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0o100)
+        # a skewed stream: a few heavy words, and a long tail
+        self.words = [f"w{int(random.paretovariate(1.2))}" for __ in range(0o20000)]
+
+    def test_row_order(self):
+        rows = [("b", 2), ("a", 2), ("c", 5), ("d", 1)]
+        self.assertTrue(sorted(rows, key=row_order) == [("c", 5), ("a", 2), ("b", 2), ("d", 1)])
+
+    def test_top_counts(self):
+        counts = collections.Counter(self.words)
+        expected = brute_force_rows(self.words)
+
+        self.assertTrue(top_counts(counts) == expected)
+        for top in (0, 1, 5, 0o100, len(expected) + 1):
+            self.assertTrue(top_counts(counts, top=top) == expected[:top])
+
+    def test_top_counts_ties(self):
+        counts = {"pear": 3, "apple": 3, "fig": 3, "kiwi": 1}
+        self.assertTrue(top_counts(counts, top=2) == [("apple", 3), ("fig", 3)])
+
+    def test_approximate_top_counts(self):
+        expected = brute_force_rows(self.words)
+
+        # with room for every distinct word, the counts are exact
+        rows = approximate_top_counts(self.words, top=10, capacity=len(expected))
+        self.assertTrue(rows == expected[:10])
+
+        # with less room, the heaviest words are still found, and never under-counted
+        rows = approximate_top_counts(self.words, top=3, capacity=0o40)
+        exact_counts = dict(expected)
+        self.assertTrue([word for (word, count) in rows] == [word for (word, count) in expected[:3]])
+        for (word, count) in rows:
+            self.assertTrue(count >= exact_counts[word])
+
+    def test_render_histogram(self):
+        out = io.StringIO()
+        render_histogram([("the", 4), ("a", 2), ("robin", 1)], out=out)
+        self.assertTrue(out.getvalue() == "the    ####\na      ##\nrobin  #\n")
+
+        out = io.StringIO()
+        render_histogram([], out=out)
+        self.assertTrue(out.getvalue() == "")
+
+    def test_render_histogram_columns(self):
+        rows = [("the", 100), ("and", 50), ("of", 3), ("robin", 1)]
+
+        out = io.StringIO()
+        render_histogram(rows, out=out, columns=27)
+        lines = out.getvalue().splitlines()
+
+        # bars start two spaces after the longest word, lines fit,
+        # and every word keeps at least one mark
+        self.assertTrue(len(lines) == len(rows))
+        for (line, (word, count)) in zip(lines, rows):
+            self.assertTrue(len(line) <= 27)
+            self.assertTrue(line[:7] == word.ljust(7))
+            self.assertTrue(len(line) - 7 >= 1)
+            self.assertTrue(set(line[7:]) == {"#"})
+        self.assertTrue([len(line) - 7 for line in lines] == [20, 10, 1, 1])
+
+        # columns wider than needed don't stretch the bars
+        out = io.StringIO()
+        render_histogram(rows, out=out, columns=1000)
+        self.assertTrue(out.getvalue().splitlines()[0] == "the    " + "#" * 100)
+
+        # columns narrower than the words still leave one mark
+        out = io.StringIO()
+        render_histogram(rows, out=out, columns=3)
+        self.assertTrue(all(len(line) == 8 for line in out.getvalue().splitlines()))
+
+    def test_histo(self):
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "robin.txt")
+
+        out = io.StringIO()
+        histo(path, top=3, out=out)
+        self.assertTrue(out.getvalue().split() == ["the", "#" * 48, "and", "#" * 36, "of", "#" * 35])
+
+        out = io.StringIO()
+        histo(path, out=out)
+        self.assertTrue(out.getvalue().startswith("the  "))
+
+
+if __name__ == "__main__":
+    unittest.main()
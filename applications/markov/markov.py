@@ -1,9 +1,681 @@
+import argparse
+import bisect
+import collections
+import os
 import random
+import struct
+import sys
+from array import array
 
-# Read in all the words in one go
-with open("input.txt") as f:
-    words = f.read()
+from tools.data_structures.hash_table import HashTable
 
-# TODO: analyze which words can follow other words
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
-# TODO: construct 5 random sentences
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "input.txt")
+
+STOP_PUNCTUATION = (".", "?", "!")
+
+
+def is_start_word(word):
+    """
+    Start words begin with a capital, or a `"` followed by a capital.
+    """
+
+    return word[:1].isupper() or (word[:1] == '"' and word[1:2].isupper())
+
+
+def is_stop_word(word):
+    """
+    Stop words end in any of `.?!`, or that punctuation followed by a `"`.
+    """
+
+    return word[-1:] in STOP_PUNCTUATION or (
+        word[-1:] == '"' and word[-2:-1] in STOP_PUNCTUATION
+    )
+
+
+class MarkovModel:
+    """
+    A Markov chain over words, where the next word depends on the last `order` words.
+
+    Words are interned to integer ids, and each run of `order` word ids seen
+    in training (a "state") is interned to a state id. Once `compile`d, the
+    successors of every state are kept in three flat typed arrays (compressed
+    sparse rows):
+    -   `successor_ids[offsets[i]:offsets[i + 1]]` are the states that followed state `i`,
+    -   `cumulative_counts[...]` are the running totals of how often each did,
+    so picking the next word is a bisection over cumulative weights, O(log k),
+    with no per-word Python lists, no duplicated successors, and no hashing.
+
+    Training is incremental: each call to `train` picks up where the last
+    one stopped, until `break_text`. A compiled model can be `save`d to, and
+    `load`ed from, a compact binary file.
+    """
+
+    DEFAULT_ORDER = 1
+    DEFAULT_BATCH_SIZE = 0o2000
+
+    FILE_MAGIC = b"MRKV"
+    FILE_VERSION = 1
+    FILE_HEADER = struct.Struct("<4sIQQQQQ?")
+
+    def __init__(self, order=DEFAULT_ORDER):
+
+        if order < 1:
+            raise Exception("InvalidOrderError")
+        else:
+            self.__order = order
+
+        self.__words = []
+        self.__states = array("q")
+        self.__word_ids = HashTable(default_value=None)
+        self.__state_ids = HashTable(default_value=None)
+        self.__pair_counts = HashTable(default_value=0)
+        self.__window = collections.deque(maxlen=order)
+
+        self.__offsets = array("q", [0])
+        self.__successor_ids = array("q")
+        self.__cumulative_counts = array("q")
+        self.__start_ids = array("q")
+        self.__stop_flags = bytearray()
+        self.__is_compiled = False
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__words)
+
+    @property
+    def order(self):
+        return self.__order
+
+    @property
+    def words(self):
+        return self.__words
+
+    @property
+    def state_count(self):
+        return len(self.__states) // self.__order
+
+    @property
+    def is_compiled(self):
+        return self.__is_compiled
+
+    ############################################################
+    #   training
+    ############################################################
+
+    def intern(self, word):
+        """
+        Return the integer id of `word`, giving it the next id if it's new.
+        """
+
+        word_id = self.__word_ids.find_item(word)
+
+        if word_id is None:
+            word_id = len(self.__words)
+            self.__words.append(word)
+            self.__word_ids.push_item(word, word_id)
+
+        return word_id
+
+    def intern_state(self, state):
+        """
+        Return the integer id of `state`, a tuple of `order` word ids,
+        giving it the next id if it's new.
+        """
+
+        state_id = self.__state_ids.find_item(state)
+
+        if state_id is None:
+            state_id = self.state_count
+            self.__states.extend(state)
+            self.__state_ids.push_item(state, state_id)
+
+        return state_id
+
+    def state(self, state_id):
+        """
+        Return the tuple of word ids of `state_id`.
+        """
+
+        start = state_id * self.__order
+        return tuple(self.__states[start:start + self.__order])
+
+    def train(self, words):
+        """
+        Count which words follow which runs of `order` words in the iterable `words`,
+        continuing from the end of the previous call.
+        Returns the model.
+        """
+
+        if self.__pair_counts is None:
+            self.thaw()
+
+        window = self.__window
+
+        for word in words:
+            word_id = self.intern(word)
+            if len(window) == self.__order:
+                pair = (self.intern_state(tuple(window)), word_id)
+                self.__pair_counts.push_item(pair, self.__pair_counts.find_item(pair) + 1)
+            window.append(word_id)
+
+        self.__is_compiled = False
+
+        return self
+
+    def break_text(self):
+        """
+        End the current text, so the next call to `train` starts afresh.
+        """
+
+        self.__window.clear()
+
+        return
+
+    def compile(self):
+        """
+        Pack the counted transitions into flat arrays of successors and cumulative counts.
+        Returns the model.
+        """
+
+        # nothing was trained since the arrays were packed (or `load`ed)
+        if self.__is_compiled:
+            return self
+
+        edges = []
+        for ((state_id, word_id), count) in self.__pair_counts.items():
+            next_state_id = self.intern_state(self.state(state_id)[1:] + (word_id,))
+            edges.append((state_id, next_state_id, count))
+
+        rows = [[] for __ in range(self.state_count)]
+        for (state_id, next_state_id, count) in edges:
+            rows[state_id].append((next_state_id, count))
+
+        offsets = array("q", [0])
+        successor_ids = array("q")
+        cumulative_counts = array("q")
+
+        for row in rows:
+            total = 0
+            for (next_state_id, count) in sorted(row):
+                total += count
+                successor_ids.append(next_state_id)
+                cumulative_counts.append(total)
+            offsets.append(len(successor_ids))
+
+        self.__offsets = offsets
+        self.__successor_ids = successor_ids
+        self.__cumulative_counts = cumulative_counts
+        self.__stop_flags = bytearray(is_stop_word(word) for word in self.__words)
+
+        # a sentence starts at a state that opens with a start word,
+        # and doesn't stop before the state's last word
+        self.__start_ids = array("q")
+        for state_id in range(self.state_count):
+            state = self.state(state_id)
+            if is_start_word(self.__words[state[0]]) and not any(
+                self.__stop_flags[word_id] for word_id in state[:-1]
+            ):
+                self.__start_ids.append(state_id)
+
+        self.__is_compiled = True
+
+        return self
+
+    def thaw(self):
+        """
+        Rebuild the training tables of a `load`ed model from its arrays,
+        so it can be trained further.
+        """
+
+        self.__word_ids = HashTable(default_value=None)
+        for (word_id, word) in enumerate(self.__words):
+            self.__word_ids.push_item(word, word_id)
+
+        self.__state_ids = HashTable(default_value=None)
+        for state_id in range(self.state_count):
+            self.__state_ids.push_item(self.state(state_id), state_id)
+
+        self.__pair_counts = HashTable(default_value=0)
+        for state_id in range(self.state_count):
+            total = 0
+            for index in range(self.__offsets[state_id], self.__offsets[state_id + 1]):
+                word_id = self.last_word_id(self.__successor_ids[index])
+                count = self.__cumulative_counts[index] - total
+                total = self.__cumulative_counts[index]
+                self.__pair_counts.push_item((state_id, word_id), count)
+
+        return
+
+    ############################################################
+    #   generation
+    ############################################################
+
+    def last_word_id(self, state_id):
+        return self.__states[state_id * self.__order + self.__order - 1]
+
+    def next_state_id(self, state_id, rng=random):
+        """
+        Pick a random successor of `state_id`, weighted by how often it was seen.
+        Returns `None` if the state was never followed by anything.
+        """
+
+        start = self.__offsets[state_id]
+        end = self.__offsets[state_id + 1]
+
+        if start == end:
+            return None
+
+        target = rng.randrange(self.__cumulative_counts[end - 1])
+        index = bisect.bisect_right(self.__cumulative_counts, target, start, end)
+
+        return self.__successor_ids[index]
+
+    def sentence_ids(self, rng=random, max_length=None):
+        """
+        Yield the word ids of a random sentence: from a random start state,
+        follow the chain until a stop word (or a dead end, or `max_length` words).
+        """
+
+        if not self.__is_compiled:
+            self.compile()
+
+        if len(self.__start_ids) == 0:
+            return
+
+        state_id = self.__start_ids[rng.randrange(len(self.__start_ids))]
+        length = 0
+
+        for word_id in self.state(state_id):
+            yield word_id
+            length += 1
+            if length == max_length:
+                return
+
+        if self.__stop_flags[word_id]:
+            return
+
+        while True:
+            state_id = self.next_state_id(state_id, rng)
+            if state_id is None:
+                break
+
+            word_id = self.last_word_id(state_id)
+            yield word_id
+            length += 1
+            if self.__stop_flags[word_id] or length == max_length:
+                break
+
+        return
+
+    def sentence(self, rng=random, max_length=None):
+        """
+        Return a random sentence as a string.
+        """
+
+        words = self.__words
+        return " ".join(words[word_id] for word_id in self.sentence_ids(rng, max_length))
+
+    def sentences(self, count, rng=random, max_length=None):
+        """
+        Yield `count` random sentences.
+        """
+
+        for __ in range(count):
+            yield self.sentence(rng, max_length)
+
+        return
+
+    ########################################
+    #   batch generation
+    ########################################
+
+    def generate(
+        self,
+        count,
+        batch_size=DEFAULT_BATCH_SIZE,
+        seed=None,
+        max_length=None,
+        use_numpy=True,
+    ):
+        """
+        Yield `count` random sentences, as they finish, from `batch_size` chains
+        advanced in lockstep: each step draws the random numbers for every
+        running chain at once, and looks up all of their successors together.
+        A finished chain's place goes to a new one until `count` have started.
+
+        With NumPy (unless `use_numpy` is false), each step is a few array
+        operations; without it, the same steps run as plain Python loops.
+        The same `seed` gives the same sentences, for a given backend.
+        """
+
+        if not self.__is_compiled:
+            self.compile()
+
+        if count <= 0 or len(self.__start_ids) == 0:
+            return
+
+        if numpy is not None and use_numpy:
+            yield from self.__generate_numpy(count, batch_size, seed, max_length)
+        else:
+            yield from self.__generate_python(count, batch_size, seed, max_length)
+
+        return
+
+    def __generate_python(self, count, batch_size, seed, max_length):
+
+        rng = random.Random(seed)
+
+        words = self.__words
+        stop_flags = self.__stop_flags
+        offsets = self.__offsets
+        successor_ids = self.__successor_ids
+        cumulative_counts = self.__cumulative_counts
+
+        def is_finished(word_ids):
+            return stop_flags[word_ids[-1]] or (
+                max_length is not None and len(word_ids) >= max_length
+            )
+
+        states = []
+        chains = []
+        started = 0
+
+        while started < count or chains:
+
+            # fill the free places with new chains
+            new_count = min(batch_size - len(chains), count - started)
+            if new_count > 0:
+                started += new_count
+                for state_id in rng.choices(self.__start_ids, k=new_count):
+                    word_ids = list(self.state(state_id))
+                    if is_finished(word_ids):
+                        yield " ".join(map(words.__getitem__, word_ids[:max_length]))
+                    else:
+                        states.append(state_id)
+                        chains.append(word_ids)
+
+            draws = [rng.random() for __ in states]
+            next_states = []
+            next_chains = []
+
+            for (state_id, word_ids, draw) in zip(states, chains, draws):
+                start = offsets[state_id]
+                end = offsets[state_id + 1]
+
+                if start == end:
+                    yield " ".join(map(words.__getitem__, word_ids))
+                    continue
+
+                total = cumulative_counts[end - 1]
+                target = min(int(draw * total), total - 1)
+                state_id = successor_ids[bisect.bisect_right(cumulative_counts, target, start, end)]
+
+                word_ids.append(self.last_word_id(state_id))
+                if is_finished(word_ids):
+                    yield " ".join(map(words.__getitem__, word_ids))
+                else:
+                    next_states.append(state_id)
+                    next_chains.append(word_ids)
+
+            states = next_states
+            chains = next_chains
+
+        return
+
+    def __generate_numpy(self, count, batch_size, seed, max_length):
+        """
+        Each state's cumulative counts are shifted up by the total count of
+        all the states before it, which makes one sorted array of all the
+        edges, so a single `searchsorted` finds the successors of a whole batch.
+
+        The chains keep fixed slots, and a finished chain's slot is refilled,
+        so the per-step work outside NumPy is one append per running chain.
+        """
+
+        rng = numpy.random.default_rng(seed)
+
+        words = self.__words
+        order = self.__order
+
+        offsets = numpy.asarray(self.__offsets, dtype=numpy.int64)
+        successor_ids = numpy.asarray(self.__successor_ids, dtype=numpy.int64)
+        cumulative_counts = numpy.asarray(self.__cumulative_counts, dtype=numpy.int64)
+        start_ids = numpy.asarray(self.__start_ids, dtype=numpy.int64)
+        last_word_ids = numpy.asarray(self.__states[order - 1::order], dtype=numpy.int64)
+        stop_flags = numpy.array(self.__stop_flags, dtype=bool)
+
+        row_sizes = numpy.diff(offsets)
+        row_totals = numpy.zeros(len(row_sizes), dtype=numpy.int64)
+        row_totals[row_sizes > 0] = cumulative_counts[offsets[1:][row_sizes > 0] - 1]
+        row_bases = numpy.cumsum(row_totals) - row_totals
+        shifted_counts = cumulative_counts + numpy.repeat(row_bases, row_sizes)
+
+        slot_count = min(batch_size, count)
+        states = numpy.full(slot_count, -1, dtype=numpy.int64)
+        lengths = numpy.zeros(slot_count, dtype=numpy.int64)
+
+        # free slots append to `idle`, which is thrown away every step
+        idle = []
+        chains = [idle] * slot_count
+        free_slots = list(range(slot_count))
+        started = 0
+
+        while True:
+
+            # fill the free slots with new chains
+            while free_slots and started < count:
+                new_count = min(len(free_slots), count - started)
+                started += new_count
+                new_states = start_ids[rng.integers(len(start_ids), size=new_count)].tolist()
+
+                still_free = free_slots[new_count:]
+                for (slot, state_id) in zip(free_slots, new_states):
+                    word_ids = list(self.state(state_id))
+                    if stop_flags[word_ids[-1]] or (
+                        max_length is not None and len(word_ids) >= max_length
+                    ):
+                        yield " ".join(map(words.__getitem__, word_ids[:max_length]))
+                        still_free.append(slot)
+                    else:
+                        states[slot] = state_id
+                        lengths[slot] = len(word_ids)
+                        chains[slot] = word_ids
+                free_slots = still_free
+
+            is_running = states >= 0
+            if not is_running.any():
+                break
+
+            # draw every running chain's successor at once
+            running_states = numpy.where(is_running, states, 0)
+            totals = numpy.where(is_running, row_totals[running_states], 0)
+            has_next = totals > 0
+
+            targets = row_bases[running_states] + numpy.minimum(
+                (rng.random(slot_count) * totals).astype(numpy.int64),
+                numpy.maximum(totals - 1, 0),
+            )
+            indexes = numpy.minimum(
+                numpy.searchsorted(shifted_counts, targets, side="right"),
+                max(len(shifted_counts) - 1, 0),
+            )
+
+            next_states = numpy.where(has_next, successor_ids[indexes] if len(successor_ids) else 0, -1)
+            word_ids = numpy.where(has_next, last_word_ids[numpy.maximum(next_states, 0)], -1)
+            lengths += has_next
+
+            is_finished = is_running & (~has_next | stop_flags[numpy.maximum(word_ids, 0)])
+            if max_length is not None:
+                is_finished |= is_running & (lengths >= max_length)
+
+            for (chain, word_id) in zip(chains, word_ids.tolist()):
+                chain.append(word_id)
+            idle.clear()
+
+            for slot in numpy.flatnonzero(is_finished).tolist():
+                word_ids = chains[slot]
+                if not has_next[slot]:
+                    word_ids.pop()
+                yield " ".join(map(words.__getitem__, word_ids))
+                chains[slot] = idle
+                free_slots.append(slot)
+
+            states = numpy.where(is_finished, -1, next_states)
+
+        return
+
+    ############################################################
+    #   persistence
+    ############################################################
+
+    def save(self, path):
+        """
+        Write the compiled model to a binary file at `path`:
+        a header, then the words, the states, and the successor arrays,
+        each as a flat block of 64-bit integers (or UTF-8 bytes, for the words).
+        """
+
+        if not self.__is_compiled:
+            self.compile()
+
+        word_bytes = [word.encode() for word in self.__words]
+
+        with open(path, "wb") as f:
+            f.write(
+                self.FILE_HEADER.pack(
+                    self.FILE_MAGIC,
+                    self.FILE_VERSION,
+                    self.__order,
+                    len(self.__words),
+                    self.state_count,
+                    len(self.__successor_ids),
+                    len(self.__start_ids),
+                    sys.byteorder == "little",
+                )
+            )
+            array("q", map(len, word_bytes)).tofile(f)
+            f.write(b"".join(word_bytes))
+            for block in (
+                self.__states,
+                self.__offsets,
+                self.__successor_ids,
+                self.__cumulative_counts,
+                self.__start_ids,
+            ):
+                block.tofile(f)
+
+        return
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a model written by `save`. It's ready to generate straight away,
+        and is `thaw`ed if trained further.
+        """
+
+        with open(path, "rb") as f:
+            (
+                magic,
+                version,
+                order,
+                word_count,
+                state_count,
+                edge_count,
+                start_count,
+                is_little_endian,
+            ) = cls.FILE_HEADER.unpack(f.read(cls.FILE_HEADER.size))
+
+            if magic != cls.FILE_MAGIC or version != cls.FILE_VERSION:
+                raise Exception("UnknownModelFileError")
+
+            def read_block(length):
+                block = array("q")
+                block.fromfile(f, length)
+                if is_little_endian != (sys.byteorder == "little"):
+                    block.byteswap()
+                return block
+
+            word_lengths = read_block(word_count)
+            word_blob = f.read(sum(word_lengths))
+            states = read_block(state_count * order)
+            offsets = read_block(state_count + 1)
+            successor_ids = read_block(edge_count)
+            cumulative_counts = read_block(edge_count)
+            start_ids = read_block(start_count)
+
+        words = []
+        start = 0
+        for length in word_lengths:
+            words.append(word_blob[start:start + length].decode())
+            start += length
+
+        model = cls(order=order)
+        model.__words = words
+        model.__states = states
+        model.__offsets = offsets
+        model.__successor_ids = successor_ids
+        model.__cumulative_counts = cumulative_counts
+        model.__start_ids = start_ids
+        model.__stop_flags = bytearray(is_stop_word(word) for word in words)
+        model.__is_compiled = True
+
+        # the training tables are only rebuilt if needed
+        model.__word_ids = None
+        model.__state_ids = None
+        model.__pair_counts = None
+
+        return model
+
+
+def train_file(path=DEFAULT_PATH, model=None, order=MarkovModel.DEFAULT_ORDER):
+    """
+    Train a model (by default, a new one of `order`) on the words in the file at `path`,
+    reading it a line at a time.
+    Returns the compiled model.
+    """
+
+    if model is None:
+        model = MarkovModel(order=order)
+
+    with open(path) as f:
+        model.train(word for line in f for word in line.split())
+
+    model.break_text()
+
+    return model.compile()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sentences from a Markov chain of words.")
+    parser.add_argument("paths", nargs="*", help="text files to train on")
+    parser.add_argument("--order", type=int, default=MarkovModel.DEFAULT_ORDER)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=MarkovModel.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--load", help="start from a model saved with --save")
+    parser.add_argument("--save", help="save the trained model here")
+    args = parser.parse_args()
+
+    if args.load:
+        model = MarkovModel.load(args.load)
+    else:
+        model = MarkovModel(order=args.order)
+
+    paths = args.paths or ([] if args.load else [DEFAULT_PATH])
+    for path in paths:
+        train_file(path, model=model)
+
+    if args.save:
+        model.save(args.save)
+
+    for sentence in model.generate(args.count, batch_size=args.batch_size, seed=args.seed):
+        print(sentence)
+        print()
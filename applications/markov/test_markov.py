@@ -0,0 +1,178 @@
+import os
+import random
+import tempfile
+import unittest
+
+from markov import DEFAULT_PATH, MarkovModel, is_start_word, is_stop_word, numpy, train_file
+
+
+def read_words(path=DEFAULT_PATH):
+    with open(path) as f:
+        return f.read().split()
+
+
+def n_grams(words, n):
+    return set(tuple(words[i:i + n]) for i in range(len(words) - n + 1))
+
+
+class TestMarkov(unittest.TestCase):
+
+    def setUp(self):
+        self.words = read_words()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "model.markov")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assert_sentence(self, sentence, model, grams, max_length=None):
+        words = sentence.split()
+
+        self.assertTrue(len(words) >= model.order)
+        self.assertTrue(is_start_word(words[0]))
+        if max_length is None or len(words) < max_length:
+            self.assertTrue(is_stop_word(words[-1]) or not any(
+                gram[:-1] == tuple(words[-model.order:]) for gram in grams
+            ))
+        else:
+            self.assertTrue(len(words) == max_length)
+
+        # every run of `order + 1` words was seen in training
+        for gram in n_grams(words, model.order + 1):
+            self.assertTrue(gram in grams)
+
+    def test_start_and_stop_words(self):
+        self.assertTrue(is_start_word("Alice") and is_start_word('"Oh'))
+        self.assertTrue(not is_start_word("alice") and not is_start_word('"oh') and not is_start_word(""))
+        self.assertTrue(is_stop_word("end.") and is_stop_word("what?") and is_stop_word('so!"'))
+        self.assertTrue(not is_stop_word("and,") and not is_stop_word('said"') and not is_stop_word(""))
+
+    def test_invalid_order(self):
+        for order in (0, -1):
+            with self.assertRaises(Exception):
+                MarkovModel(order=order)
+
+    def test_train(self):
+        model = MarkovModel().train("A b. A c. A b.".split())
+        model.compile()
+
+        self.assertTrue(model.words == ["A", "b.", "c."])
+        self.assertTrue(model.state_count == 3)
+
+        # "A" is followed by "b." twice as often as "c."
+        rng = random.Random(0o100)
+        sentences = [model.sentence(rng) for __ in range(0o1000)]
+        self.assertTrue(set(sentences) == {"A b.", "A c."})
+        self.assertTrue(1.5 < sentences.count("A b.") / sentences.count("A c.") < 2.5)
+
+    def test_break_text(self):
+        model = MarkovModel()
+        model.train("One two.".split())
+        model.break_text()
+        model.train("Three four.".split())
+        model.compile()
+
+        rng = random.Random(0o100)
+        sentences = set(model.sentence(rng) for __ in range(0o100))
+        self.assertTrue(sentences == {"One two.", "Three four."})
+
+    def test_n_grams(self):
+        for order in (1, 2, 3):
+            model = train_file(order=order)
+            grams = n_grams(self.words, order + 1)
+
+            self.assertTrue(model.order == order)
+            self.assertTrue(len(model) == len(set(self.words)))
+
+            rng = random.Random(order)
+            for sentence in model.sentences(0o100, rng):
+                self.assert_sentence(sentence, model, grams)
+            for sentence in model.sentences(0o100, rng, max_length=5):
+                self.assert_sentence(sentence, model, grams, max_length=5)
+
+    def test_seeded_generation(self):
+        model = train_file(order=2)
+        grams = n_grams(self.words, 3)
+
+        backends = [False, True] if numpy is not None else [False]
+        for use_numpy in backends:
+            for batch_size in (1, 7, 0o2000):
+                sentences = list(model.generate(0o200, batch_size=batch_size, seed=0o1, use_numpy=use_numpy))
+                again = list(model.generate(0o200, batch_size=batch_size, seed=0o1, use_numpy=use_numpy))
+
+                self.assertTrue(len(sentences) == 0o200)
+                self.assertTrue(sentences == again)
+                for sentence in sentences:
+                    self.assert_sentence(sentence, model, grams)
+
+                sentences = list(
+                    model.generate(0o200, batch_size=batch_size, seed=0o2, max_length=4, use_numpy=use_numpy)
+                )
+                self.assertTrue(len(sentences) == 0o200)
+                for sentence in sentences:
+                    self.assert_sentence(sentence, model, grams, max_length=4)
+
+        self.assertTrue(list(model.generate(0)) == [])
+        self.assertTrue(list(MarkovModel().generate(5)) == [])
+
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_numpy_generation(self):
+        model = MarkovModel().train("A b. A c. A b.".split())
+
+        sentences = list(model.generate(0o4000, batch_size=0o100, seed=0o1))
+        self.assertTrue(set(sentences) == {"A b.", "A c."})
+        self.assertTrue(1.5 < sentences.count("A b.") / sentences.count("A c.") < 2.5)
+
+    def test_save_and_load(self):
+        model = train_file(order=2)
+        model.save(self.path)
+
+        loaded = MarkovModel.load(self.path)
+        self.assertTrue(loaded.is_compiled)
+        self.assertTrue(loaded.order == 2)
+        self.assertTrue(loaded.words == model.words)
+        self.assertTrue(loaded.state_count == model.state_count)
+
+        # a loaded model compiles (as a no-op) and generates just like the original
+        self.assertTrue(loaded.compile() is loaded)
+        for use_numpy in (False, True):
+            loaded_sentences = list(loaded.generate(0o100, seed=0o3, use_numpy=use_numpy))
+            self.assertTrue(loaded_sentences == list(model.generate(0o100, seed=0o3, use_numpy=use_numpy)))
+        loaded_sentences = list(loaded.sentences(0o100, random.Random(0o4)))
+        self.assertTrue(loaded_sentences == list(model.sentences(0o100, random.Random(0o4))))
+
+        # and saves back to the same bytes
+        path = os.path.join(self.temp_dir.name, "again.markov")
+        loaded.save(path)
+        with open(self.path, "rb") as f, open(path, "rb") as g:
+            self.assertTrue(f.read() == g.read())
+
+    def test_load_and_train(self):
+        half = len(self.words) // 2
+        (first, second) = (self.words[:half], self.words[half:])
+
+        model = MarkovModel(order=2).train(first)
+        model.break_text()
+        model.save(self.path)
+
+        loaded = MarkovModel.load(self.path)
+        loaded.train(second)
+        loaded.compile()
+
+        self.assertTrue(loaded.words[:len(model)] == model.words)
+        self.assertTrue(set(loaded.words) == set(self.words))
+
+        grams = n_grams(first, 3) | n_grams(second, 3)
+        for sentence in loaded.sentences(0o200, random.Random(0o5)):
+            self.assert_sentence(sentence, loaded, grams)
+
+    def test_load_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * MarkovModel.FILE_HEADER.size)
+
+        with self.assertRaises(Exception):
+            MarkovModel.load(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,270 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from tools import hash_tools
+from tools.data_structures.bloom_filter import BloomFilter
+from tools.data_structures.hash_set import HashSet
+from tools.data_structures.ordered_hash_table import OrderedHashTable
+
+DEFAULT_CAPACITY = 0o100000
+DEFAULT_PARTITION_COUNT = 0o100
+DEFAULT_CACHED_PARTITION_COUNT = DEFAULT_PARTITION_COUNT
+DEFAULT_HASHER = "fnv1a"
+
+
+class SeenWords:
+    """
+    The set of words seen so far in a stream.
+
+    Words are kept in a `HashSet`, sized up front for `capacity` words, so
+    adding a word and finding out whether it was new is a single probe.
+
+    With a `memory_budget`, once that many words are held, they are spilled to
+    disk under `spill_dir` (by default, a temporary directory), split into
+    `partition_count` files by hash, and a Bloom filter of them is kept as the
+    spill's index. A word missing from memory then only reads a spilled file
+    if that spill's filter might hold it, and only the one file its hash points
+    to. The words of the last `cached_partition_count` files read are kept in
+    `HashSet`s, so checking them is a lookup rather than a scan. Spilled words
+    are written with their lengths (see `encode_words`), so any string,
+    even an empty one or one with whitespace in it, reads back the same.
+    """
+
+    def __init__(
+        self,
+        capacity=DEFAULT_CAPACITY,
+        memory_budget=None,
+        spill_dir=None,
+        partition_count=DEFAULT_PARTITION_COUNT,
+        cached_partition_count=DEFAULT_CACHED_PARTITION_COUNT,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        self.__capacity = capacity if memory_budget is None else memory_budget
+        self.__memory_budget = memory_budget
+        self.__spill_dir = spill_dir
+        self.__owns_spill_dir = False
+        self.__partition_count = partition_count
+        self.__cached_partition_count = cached_partition_count
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+
+        # never shrunk below the size for `capacity`, as it's only ever emptied whole
+        self.__bucket_count = HashSet(hasher=hasher).bucket_count_for(self.__capacity)
+        self.__words = self.new_words()
+
+        # one Bloom filter per spill, in order
+        self.__spills = []
+
+        # `(spill_index, partition_index)` => a `HashSet` of its words, oldest first
+        self.__partitions = OrderedHashTable(default_value=None)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__words) + sum(len(spill) for spill in self.__spills)
+
+    def __contains__(self, word):
+        return word in self.__words or self.is_spilled(word)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
+
+    @property
+    def spill_count(self):
+        return len(self.__spills)
+
+    def new_words(self):
+        return HashSet(
+            bucket_count=self.__bucket_count,
+            min_bucket_count=self.__bucket_count,
+            hasher=self.__hasher,
+        )
+
+    #-----------------------------------------------------------
+
+    def add(self, word):
+        """
+        Add `word` to the set.
+        Returns `True` if it's new, or `False` if it was seen already.
+        """
+
+        if not self.__words.add(word):
+            return False
+
+        # new to memory, but it may have been spilled
+        if self.is_spilled(word):
+            self.__words.discard(word)
+            return False
+
+        if self.__memory_budget is not None and len(self.__words) >= self.__memory_budget:
+            self.spill()
+
+        return True
+
+    ########################################
+    #   spilling
+    ########################################
+
+    def partition_path(self, spill_index, partition_index):
+        return os.path.join(self.__spill_dir, f"{spill_index:06}-{partition_index:04}.words")
+
+    def spill(self):
+        """
+        Write the words held in memory to a new spill on disk, and let them go.
+        """
+
+        if self.__spill_dir is None:
+            self.__spill_dir = tempfile.mkdtemp(prefix="no_dups-")
+            self.__owns_spill_dir = True
+
+        partitions = [[] for __ in range(self.__partition_count)]
+        spill = BloomFilter(capacity=len(self.__words), hasher=self.__hasher)
+
+        for word in self.__words:
+            word_hash = self.__hash(word)
+            partitions[word_hash % self.__partition_count].append(word)
+            spill.add(word, word_hash)
+
+        spill_index = len(self.__spills)
+        for (partition_index, words) in enumerate(partitions):
+            with open(self.partition_path(spill_index, partition_index), "w", encoding="utf-8", newline="") as f:
+                f.write(encode_words(words))
+
+        self.__spills.append(spill)
+        self.__words = self.new_words()
+
+        return
+
+    def is_spilled(self, word):
+        """
+        Whether `word` is in any spill, hashing it just once for all of them.
+        """
+
+        if not self.__spills:
+            return False
+
+        word_hash = self.__hash(word)
+        partition_index = word_hash % self.__partition_count
+
+        for (spill_index, spill) in enumerate(self.__spills):
+            if spill.might_contain(word, word_hash) and word in self.read_partition(spill_index, partition_index):
+                return True
+
+        return False
+
+    def read_partition(self, spill_index, partition_index):
+        """
+        Returns a `HashSet` of the words in a spilled file,
+        reading the file only if it isn't among those cached.
+        """
+
+        key = (spill_index, partition_index)
+        words = self.__partitions.find_item(key)
+
+        if words is None:
+            with open(self.partition_path(spill_index, partition_index), encoding="utf-8", newline="") as f:
+                words = HashSet(decode_words(f.read()), hasher=self.__hasher)
+
+            if len(self.__partitions) >= self.__cached_partition_count:
+                self.__partitions.pop_item(next(iter(self.__partitions.keys())))
+            self.__partitions.push_item(key, words)
+
+        return words
+
+    def close(self):
+        """
+        Delete the spilled files, if they're in a temporary directory.
+        """
+
+        if self.__owns_spill_dir:
+            shutil.rmtree(self.__spill_dir, ignore_errors=True)
+            self.__spill_dir = None
+            self.__owns_spill_dir = False
+
+        return
+
+
+def encode_words(words):
+    """
+    Join `words` into one string, each as its length, a ":", then the word.
+    """
+
+    return "".join(f"{len(word)}:{word}" for word in words)
+
+
+def decode_words(text):
+    """
+    Split a string made by `encode_words` back into its words.
+    """
+
+    words = []
+    start = 0
+
+    while start < len(text):
+        colon = text.index(":", start)
+        end = colon + 1 + int(text[start:colon])
+        words.append(text[colon + 1:end])
+        start = end
+
+    return words
+
+
+############################################################
+
+
+def unique_words(words, capacity=DEFAULT_CAPACITY, memory_budget=None, spill_dir=None):
+    """
+    Yield each word of the iterable `words` the first time it appears.
+    See `SeenWords` for `memory_budget` and `spill_dir`.
+    """
+
+    with SeenWords(capacity=capacity, memory_budget=memory_budget, spill_dir=spill_dir) as seen:
+        for word in words:
+            if seen.add(word):
+                yield word
+
+    return
+
+
+def file_words(path):
+    """
+    Yield the words in the file at `path` (or stdin, if "-") one at a time.
+    """
+
+    if path == "-":
+        for line in sys.stdin:
+            yield from line.split()
+        return
+
+    with open(path) as f:
+        for line in f:
+            yield from line.split()
+
+    return
+
+
 def no_dups(s):
-    # Implement me.
-    pass
+    words = s.split()
+    return " ".join(unique_words(words, capacity=len(words)))
 
 
 if __name__ == "__main__":
-    print(no_dups(""))
-    print(no_dups("hello"))
-    print(no_dups("hello hello"))
-    print(no_dups("cats dogs fish cats dogs"))
-    print(no_dups("spam spam spam eggs spam sausage spam spam and spam"))
+    if len(sys.argv) > 1:
+        for word in unique_words(word for path in sys.argv[1:] for word in file_words(path)):
+            print(word)
+
+    else:
+        print(no_dups(""))
+        print(no_dups("hello"))
+        print(no_dups("hello hello"))
+        print(no_dups("cats dogs fish cats dogs"))
+        print(no_dups("spam spam spam eggs spam sausage spam spam and spam"))
@@ -1,6 +1,9 @@
+import os
+import random
+import tempfile
 import unittest
 
-from no_dups import no_dups
+from no_dups import SeenWords, no_dups, unique_words
 
 
 class TestNoDups(unittest.TestCase):
@@ -17,6 +20,38 @@ class TestNoDups(unittest.TestCase):
         x = no_dups("spam spam spam eggs spam sausage spam spam and spam")
         self.assertTrue(x == "spam eggs sausage and")
 
+    def test_unique_words_spill(self):
+        words = [f"w{i % 300}" for i in range(1000)] + ["w7", "new"]
+        x = list(unique_words(iter(words), memory_budget=50))
+        self.assertTrue(x == [f"w{i}" for i in range(300)] + ["new"])
+
+    def test_unique_words_spill_odd_words(self):
+        # words that are empty, or hold whitespace or colons, survive a spill
+        odd_words = ["", " ", "a b", "a\nb", "a\r\nb", "\t", "3:abc", ":", "caf\u00e9"]
+        words = odd_words + [f"w{i}" for i in range(100)] + odd_words
+        x = list(unique_words(iter(words), memory_budget=4))
+        self.assertTrue(x == odd_words + [f"w{i}" for i in range(100)])
+
+    def test_seen_words_spill(self):
+        random.seed(0o100)
+        words = [f"w{random.randrange(2000)}" for __ in range(0o20000)]
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            with SeenWords(memory_budget=0o200, spill_dir=spill_dir, cached_partition_count=2) as seen:
+                seen_set = set()
+                for word in words:
+                    self.assertTrue(seen.add(word) == (word not in seen_set))
+                    seen_set.add(word)
+
+                self.assertTrue(len(seen) == len(seen_set))
+                self.assertTrue(seen.spill_count == len(seen_set) // 0o200)
+                self.assertTrue(all(word in seen for word in seen_set))
+                self.assertTrue(not any(f"x{i}" in seen for i in range(0o1000)))
+                self.assertTrue(len(os.listdir(spill_dir)) > 0)
+
+            # a given spill directory is left in place
+            self.assertTrue(len(os.listdir(spill_dir)) > 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,20 @@ find all a, b, c, d in q such that
 f(a) + f(b) = f(c) - f(d)
 """
 
+from tools.data_structures.multi_map import MultiMap
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# how many sums and differences the NumPy path holds at once
+DEFAULT_CHUNK_SIZE = 0o10000000
+
+# integer `f` values must stay under this in size for the NumPy path,
+# so that no sum, difference or bisection bound overflows 64 bits
+MAX_INT_VALUE = 2 ** 61
+
 # q = set(range(1, 10))
 # q = set(range(1, 200))
 q = (1, 3, 4, 7, 12)
@@ -12,4 +26,234 @@ def f(x):
     return x * 4 + 6
 
 
-# TODO: Implement me.
+def sum_index(values):
+    """
+    Index every ordered pair of `(x, f(x))` `values` by the sum of their `f`s.
+    Returns a `MultiMap` of each distinct sum => the codes `i * n + j` of its
+    pairs of the `i`th and `j`th values, kept in one typed arena.
+    """
+
+    n = len(values)
+    index = MultiMap(typecode="q")
+
+    for (i, (a, f_a)) in enumerate(values):
+        for (j, (b, f_b)) in enumerate(values):
+            index.append(f_a + f_b, i * n + j)
+
+    return index
+
+
+def sumdiff(q=q, f=f, use_numpy=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield every `(a, b, c, d)` of elements of `q` where `f(a) + f(b) == f(c) - f(d)`,
+    with NumPy if it's installed (unless `use_numpy` is false),
+    and the `f` values are all floats or all ints smaller than `MAX_INT_VALUE`,
+    or else with a `MultiMap`.
+    """
+
+    if numpy is not None and use_numpy:
+        xs = numpy.array(list(q))
+        fs = numeric_values(xs, f)
+
+        if fs is not None:
+            yield from sumdiff_sorted(xs, fs, chunk_size=chunk_size)
+            return
+
+    yield from sumdiff_hashed(q, f)
+
+    return
+
+
+def sumdiff_hashed(q=q, f=f):
+    """
+    Yield every `(a, b, c, d)` of elements of `q` where `f(a) + f(b) == f(c) - f(d)`.
+
+    `f` is called once per element. The pairwise sums are indexed by value,
+    then each pairwise difference is looked up in the index, so the work is
+    O(n**2) plus the number of matches, rather than O(n**4).
+    """
+
+    values = [(x, f(x)) for x in q]
+    n = len(values)
+    sums = sum_index(values)
+
+    for (c, f_c) in values:
+        for (d, f_d) in values:
+            for code in sums.values(f_c - f_d):
+                yield (values[code // n][0], values[code % n][0], c, d)
+
+    return
+
+
+############################################################
+#   NumPy
+############################################################
+
+
+def numeric_values(xs, f):
+    """
+    Return an array of `f` of every element of the array `xs`, as `int64`s or
+    `float64`s, or `None` if they can't all be held exactly.
+
+    `f` is called on the whole array at once if it can be, but over Python
+    objects, so that integer values are exact, and can be checked against
+    `MAX_INT_VALUE` before they are packed into 64 bits.
+    """
+
+    try:
+        values = numpy.asarray(f(xs.astype(object)))
+        if values.shape != xs.shape:
+            raise ValueError
+        values = values.tolist()
+    except (TypeError, ValueError):
+        values = [f(x) for x in xs.tolist()]
+
+    if all(type(value) is int for value in values):
+        if all(-MAX_INT_VALUE < value < MAX_INT_VALUE for value in values):
+            return numpy.array(values, dtype=numpy.int64)
+    elif all(type(value) is float for value in values):
+        return numpy.array(values, dtype=numpy.float64)
+
+    return None
+
+
+def sumdiff_sorted(xs, fs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield every `(a, b, c, d)` of elements of the array `xs` where
+    `f(a) + f(b) == f(c) - f(d)`, given the array `fs` of their `f` values.
+
+    With the `f` values sorted, the `b`s whose `f(a) + f(b)` falls in a range
+    of values are a run of consecutive elements, found by bisection, and the
+    same goes for the `d`s of `f(c) - f(d)`. So the range of the sums is split
+    into slices of about `chunk_size` sums and differences together (see
+    `value_slices`), and for each slice, just its sums and differences are
+    built, and matched up by sorting the sums and bisecting them for the
+    differences.
+    """
+
+    order = numpy.argsort(fs, kind="stable")
+    xs = xs[order]
+    fs = fs[order]
+
+    for (a_rows, b_rows, c_rows, d_rows) in value_slices(fs, chunk_size=chunk_size):
+
+        if len(a_rows) == 0 or len(c_rows) == 0:
+            continue
+
+        sums = fs[a_rows] + fs[b_rows]
+        sum_order = numpy.argsort(sums, kind="stable")
+        sums = sums[sum_order]
+        differences = fs[c_rows] - fs[d_rows]
+
+        firsts = numpy.searchsorted(sums, differences, "left")
+        match_counts = numpy.searchsorted(sums, differences, "right") - firsts
+
+        # expand the matches a batch of differences at a time,
+        # so there are never many more than `chunk_size` of them at once
+        totals = numpy.cumsum(match_counts)
+        cuts = numpy.searchsorted(totals, numpy.arange(chunk_size, totals[-1], chunk_size), "right")
+
+        for (start, end) in zip([0, *cuts], [*cuts, len(differences)]):
+            (difference_indexes, sum_positions) = runs_to_pairs(
+                firsts[start:end],
+                firsts[start:end] + match_counts[start:end],
+            )
+            difference_indexes += start
+            sum_indexes = sum_order[sum_positions]
+
+            yield from zip(
+                xs[a_rows[sum_indexes]].tolist(),
+                xs[b_rows[sum_indexes]].tolist(),
+                xs[c_rows[difference_indexes]].tolist(),
+                xs[d_rows[difference_indexes]].tolist(),
+            )
+
+    return
+
+
+def value_slices(fs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Given the sorted array `fs`, split the range of its pairwise sums into
+    slices, and yield `(a_rows, b_rows, c_rows, d_rows)` for each slice:
+    the index pairs of its sums `fs[a] + fs[b]` and differences `fs[c] - fs[d]`.
+
+    Differences outside the range of the sums can't match any of them, so they
+    are left out. The slices are split at quantiles of a sample of the sums and
+    (kept) differences together, so each holds about `chunk_size` of them,
+    unless many of them are equal.
+    """
+
+    n = len(fs)
+
+    if n == 0:
+        return
+
+    min_sum = fs[0] + fs[0]
+    max_sum = fs[-1] + fs[-1]
+
+    slice_count = -(-2 * n * n // chunk_size)
+    rng = numpy.random.default_rng(0)
+    sample_size = slice_count * 0o100
+    sample = numpy.concatenate((
+        fs[rng.integers(n, size=sample_size)] + fs[rng.integers(n, size=sample_size)],
+        fs[rng.integers(n, size=sample_size)] - fs[rng.integers(n, size=sample_size)],
+    ))
+    sample = numpy.sort(sample[(min_sum <= sample) & (sample <= max_sum)])
+    bounds = [None] + list(numpy.unique(sample[0o100::0o100])) + [None]
+
+    for (low, high) in zip(bounds, bounds[1:]):
+
+        # the `(a, b)`s with `low <= f(a) + f(b) < high`
+        if low is None:
+            b_starts = numpy.zeros(n, dtype=numpy.int64)
+        else:
+            b_starts = numpy.searchsorted(fs, low - fs, "left")
+
+        if high is None:
+            b_ends = numpy.full(n, n, dtype=numpy.int64)
+        else:
+            b_ends = numpy.searchsorted(fs, high - fs, "left")
+
+        # the `(c, d)`s with `low <= f(c) - f(d) < high`,
+        # or `min_sum <= f(c) - f(d) <= max_sum` at the outer bounds
+        if high is None:
+            d_starts = numpy.searchsorted(fs, fs - max_sum, "left")
+        else:
+            d_starts = numpy.searchsorted(fs, fs - high, "right")
+
+        if low is None:
+            d_ends = numpy.searchsorted(fs, fs - min_sum, "right")
+        else:
+            d_ends = numpy.searchsorted(fs, fs - low, "right")
+
+        (a_rows, b_rows) = runs_to_pairs(b_starts, b_ends)
+        (c_rows, d_rows) = runs_to_pairs(d_starts, d_ends)
+
+        yield (a_rows, b_rows, c_rows, d_rows)
+
+    return
+
+
+def runs_to_pairs(starts, ends):
+    """
+    Given the runs `starts[i]` to `ends[i]`, return the arrays `(rows, columns)`
+    of every `(i, j)` where `starts[i] <= j < ends[i]`.
+    """
+
+    lengths = numpy.maximum(ends - starts, 0)
+    rows = numpy.repeat(numpy.arange(len(lengths)), lengths)
+    columns = numpy.arange(len(rows)) - numpy.repeat(numpy.cumsum(lengths) - lengths - starts, lengths)
+
+    return (rows, columns)
+
+
+############################################################
+
+
+def format_match(a, b, c, d, f=f):
+    return f"f({a}) + f({b}) = f({c}) - f({d})    {f(a)} + {f(b)} = {f(c)} - {f(d)}"
+
+
+if __name__ == "__main__":
+    for match in sumdiff(q):
+        print(format_match(*match))
@@ -0,0 +1,97 @@
+import itertools
+import random
+import unittest
+
+from sumdiff import f, numpy, q, sumdiff, sumdiff_hashed, sumdiff_sorted, value_slices
+
+
+def brute_force(q, f):
+    return sorted(
+        (a, b, c, d) for (a, b, c, d) in itertools.product(q, repeat=4) if f(a) + f(b) == f(c) - f(d)
+    )
+
+
+class TestSumdiff(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0o100)
+        self.cases = [
+            (q, f),
+            ((), f),
+            ((5,), f),
+            (range(1, 20), f),
+            (range(-8, 9), lambda x: x * x - 3),
+            (random.sample(range(-50, 50), 24), lambda x: x),
+            ([random.randrange(10) for __ in range(16)], lambda x: 2 * x + 1),
+        ]
+
+    def test_sumdiff_hashed(self):
+        for (values, function) in self.cases:
+            self.assertTrue(sorted(sumdiff_hashed(values, function)) == brute_force(values, function))
+
+        self.assertTrue(len(brute_force(q, f)) > 0)
+
+    def test_sumdiff_without_numpy(self):
+        for (values, function) in self.cases:
+            self.assertTrue(sorted(sumdiff(values, function, use_numpy=False)) == brute_force(values, function))
+
+    def test_sumdiff_of_non_numbers(self):
+        # `f` values only need to add, subtract and hash
+        from fractions import Fraction
+
+        values = range(1, 12)
+        function = lambda x: Fraction(1, x)  # noqa: E731
+        self.assertTrue(sorted(sumdiff(values, function)) == brute_force(values, function))
+
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_sumdiff_numpy(self):
+        for (values, function) in self.cases:
+            expected = brute_force(values, function)
+            self.assertTrue(sorted(sumdiff(values, function)) == expected)
+
+            # small chunks split the sums into many slices, and the matches into many batches
+            xs = numpy.array(list(values), dtype=numpy.int64)
+            fs = numpy.array([function(x) for x in values], dtype=numpy.int64)
+            for chunk_size in (1, 7, 0o100):
+                self.assertTrue(sorted(sumdiff_sorted(xs, fs, chunk_size=chunk_size)) == expected)
+
+        # numpy-aware `f`s are called on the whole array at once
+        values = range(-20, 20)
+        function = lambda x: x * 3 - 1  # noqa: E731
+        self.assertTrue(sorted(sumdiff(values, function)) == brute_force(values, function))
+
+        values = [0.5, 1.5, 2.0, 3.5]
+        function = lambda x: x * 2  # noqa: E731
+        self.assertTrue(sorted(sumdiff(values, function)) == brute_force(values, function))
+
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_sumdiff_numpy_does_not_overflow(self):
+        # these `f` values overflow 64 bits, so they go to the hashed path
+        values = range(1, 40)
+        function = lambda x: x ** 13  # noqa: E731
+        self.assertTrue(list(sumdiff(values, function)) == [])
+
+        values = range(-6, 7)
+        function = lambda x: x * 2 ** 62 + 1  # noqa: E731
+        self.assertTrue(sorted(sumdiff(values, function)) == brute_force(values, function))
+
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_sumdiff_numpy_slices_are_bounded(self):
+        n = 2000
+        chunk_size = 100000
+        fs = numpy.array([f(x) for x in range(n)], dtype=numpy.int64)
+
+        sum_count = 0
+        max_slice_size = 0
+        for (a_rows, b_rows, c_rows, d_rows) in value_slices(fs, chunk_size=chunk_size):
+            sum_count += len(a_rows)
+            max_slice_size = max(max_slice_size, len(a_rows) + len(c_rows))
+
+        # every sum is in exactly one slice,
+        # and no slice holds many more than `chunk_size` sums and differences
+        self.assertTrue(sum_count == n * n)
+        self.assertTrue(max_slice_size <= 2 * chunk_size)
+
+
+if __name__ == "__main__":
+    unittest.main()
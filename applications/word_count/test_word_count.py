@@ -1,6 +1,9 @@
+import io
+import os
+import tempfile
 import unittest
 
-from word_count import word_count
+from word_count import whole_word_texts, word_count, word_count_file, word_count_parallel, word_count_stream
 
 
 class TestWordCount(unittest.TestCase):
@@ -49,6 +52,49 @@ class TestWordCount(unittest.TestCase):
         x = word_count("a a\ra\na\ta \t\r\n")
         self.assertTrue(x == {"a": 5})
 
+    def test_word_count_stream(self):
+        s = 'Hello, my cat.  And my cat doesn\'t say "hello" back.\n' * 10
+
+        for chunk_size in (1, 2, 3, 7, 64, 1024):
+            x = dict(word_count_stream(io.StringIO(s), chunk_size=chunk_size).items())
+            self.assertTrue(
+                x == {
+                    "hello": 20,
+                    "my": 20,
+                    "cat": 20,
+                    "and": 10,
+                    "doesn't": 10,
+                    "say": 10,
+                    "back": 10,
+                }
+            )
+
+    def test_whole_word_texts(self):
+        texts = list(whole_word_texts(["ab", "c d", "e", "f ", "g"]))
+        self.assertTrue("".join(texts) == "abc def g")
+        self.assertTrue(texts == ["abc ", "def ", "g"])
+
+        # a run with no whitespace is let go once it passes `max_word_length`,
+        # rather than held (and rescanned) to the end
+        texts = list(whole_word_texts(["x" * 10] * 100 + [" y"], max_word_length=25))
+        self.assertTrue("".join(texts) == "x" * 1000 + " y")
+        self.assertTrue(max(len(text) for text in texts) <= 40)
+
+    def test_word_count_parallel(self):
+        s = "Caf\u00e9 cat.  And my cat doesn't say \"hello\" back.\n" * 100
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "input.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(s)
+
+            serial = dict(word_count_file(path).items())
+            for processes in (1, 3, 8):
+                parallel = dict(word_count_parallel([path, path], processes=processes).items())
+                self.assertTrue(parallel == {k: v * 2 for (k, v) in serial.items()})
+
+        self.assertTrue(serial == word_count(s))
+
 
 if __name__ == "__main__":
     unittest.main()
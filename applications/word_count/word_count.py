@@ -1,14 +1,288 @@
+import codecs
+import multiprocessing
+import os
+import sys
+
+from tools.data_structures.hash_table import HashTable
+
+IGNORED_CHARACTERS = '":;,.-+=/\\|[]{}()*^&'
+IGNORED_CHARACTERS_TABLE = str.maketrans("", "", IGNORED_CHARACTERS)
+
+DEFAULT_CHUNK_SIZE = 0o200000
+DEFAULT_MAX_WORD_LENGTH = 0o200000
+DEFAULT_ENCODING = "utf-8"
+
+# ASCII whitespace bytes never occur inside a multi-byte UTF-8 character,
+# so a file can be cut at any of them without splitting a word or a character
+WHITESPACE_BYTES = b" \t\n\r\x0b\x0c"
+
+
+def count_words(text, counts):
+    """
+    Add the words in `text` to `counts`, a `HashTable` with a default value of 0.
+    Returns `counts`.
+    """
+
+    for word in text.translate(IGNORED_CHARACTERS_TABLE).lower().split():
+        counts.push_item(word, counts.find_item(word) + 1)
+
+    return counts
+
+
+def word_count_stream(stream, chunk_size=DEFAULT_CHUNK_SIZE, counts=None):
+    """
+    Count the words read from the text `stream`, `chunk_size` characters at a time.
+    Memory use grows with the number of distinct words, not the size of the input.
+    Returns a `HashTable` of word counts.
+    """
+
+    return word_count_chunks(iter(lambda: stream.read(chunk_size), ""), counts=counts)
+
+
+def word_count_chunks(chunks, counts=None):
+    """
+    Count the words in an iterable of text `chunks`,
+    where words may be split across chunks.
+    Returns a `HashTable` of word counts.
+    """
+
+    if counts is None:
+        counts = HashTable(default_value=0)
+
+    for text in whole_word_texts(chunks):
+        count_words(text, counts)
+
+    return counts
+
+
+def whole_word_texts(chunks, max_word_length=DEFAULT_MAX_WORD_LENGTH):
+    """
+    Regroup an iterable of text `chunks` into texts that never split a word,
+    unless the word runs past `max_word_length` characters: then what's held
+    of it goes out as it is, so a text with no whitespace can't fill memory.
+    """
+
+    # the pieces of the last word, which may continue in the next chunk
+    held = []
+    held_length = 0
+
+    for chunk in chunks:
+
+        # only the new chunk is searched for its last whitespace, from the right
+        if chunk == "" or chunk[-1].isspace():
+            end = len(chunk)
+        else:
+            end = len(chunk) - len(chunk.rsplit(None, 1)[-1])
+
+        if end == 0:
+            held.append(chunk)
+            held_length += len(chunk)
+            if held_length > max_word_length:
+                yield "".join(held)
+                held = []
+                held_length = 0
+            continue
+
+        held.append(chunk[:end])
+        yield "".join(held)
+        held = [chunk[end:]]
+        held_length = len(chunk) - end
+
+    yield "".join(held)
+
+    return
+
+
+def stream_words(stream, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the words read from the text `stream` one at a time,
+    cleaned up the same way `count_words` does.
+    """
+
+    for text in whole_word_texts(iter(lambda: stream.read(chunk_size), "")):
+        yield from text.translate(IGNORED_CHARACTERS_TABLE).lower().split()
+
+    return
+
+
+def file_words(path, chunk_size=DEFAULT_CHUNK_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Yield the words in the file at `path` (or stdin, if "-") one at a time.
+    """
+
+    if path == "-":
+        yield from stream_words(sys.stdin, chunk_size=chunk_size)
+        return
+
+    with open(path, encoding=encoding) as f:
+        yield from stream_words(f, chunk_size=chunk_size)
+
+    return
+
+
+def word_count_file(path, chunk_size=DEFAULT_CHUNK_SIZE, encoding=DEFAULT_ENCODING, counts=None):
+    """
+    Count the words in the file at `path`, or in stdin if `path` is "-".
+    Returns a `HashTable` of word counts.
+    """
+
+    if path == "-":
+        return word_count_stream(sys.stdin, chunk_size=chunk_size, counts=counts)
+
+    with open(path, encoding=encoding) as f:
+        return word_count_stream(f, chunk_size=chunk_size, counts=counts)
+
+
+############################################################
+#   parallel counting
+############################################################
+
+
+def split_file(path, part_count):
+    """
+    Split the file at `path` into at most `part_count` byte ranges of about
+    the same size, each ending on whitespace (or at the end of the file).
+    Returns a list of `(start, end)` pairs.
+    """
+
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+
+    with open(path, "rb") as f:
+        for part in range(1, part_count + 1):
+            end = max(start, size * part // part_count)
+
+            # move `end` forward to the next whitespace byte
+            f.seek(end)
+            while end < size:
+                block = f.read(DEFAULT_CHUNK_SIZE)
+                cuts = [i for i in map(block.find, WHITESPACE_BYTES) if i >= 0]
+                if cuts:
+                    end += min(cuts)
+                    break
+                end += len(block)
+
+            end = min(end, size)
+            if end > start:
+                ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def read_byte_range(path, start, end, chunk_size=DEFAULT_CHUNK_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Yield the text of bytes `start` to `end` of the file at `path`, in chunks.
+    """
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+
+    yield decoder.decode(b"", final=True)
+
+    return
+
+
+def count_byte_range(path, start, end, chunk_size=DEFAULT_CHUNK_SIZE, encoding=DEFAULT_ENCODING):
+    """
+    Count the words in bytes `start` to `end` of the file at `path`.
+    Returns a list of `(word, count)` pairs, which are cheaper to send between processes.
+    """
+
+    counts = word_count_chunks(read_byte_range(path, start, end, chunk_size, encoding))
+
+    return list(counts.items())
+
+
+def merge_counts(*partial_counts):
+    """
+    Merge lists of `(word, count)` pairs, adding the counts of equal words.
+    Returns a list of `(word, count)` pairs.
+    """
+
+    counts = HashTable(default_value=0)
+
+    for pairs in partial_counts:
+        for (word, count) in pairs:
+            counts.push_item(word, counts.find_item(word) + count)
+
+    return list(counts.items())
+
+
+def word_count_parallel(
+    paths,
+    processes=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    encoding=DEFAULT_ENCODING,
+):
+    """
+    Count the words in the files at `paths` using a pool of `processes` workers
+    (by default, one per core). Each file is split into byte ranges on whitespace,
+    each range is counted by a worker, and the partial counts are merged pairwise,
+    in a tree, also by the workers.
+    Returns a `HashTable` of word counts, the same as counting serially.
+    """
+
+    processes = processes or os.cpu_count() or 1
+
+    tasks = [
+        (path, start, end, chunk_size, encoding)
+        for path in paths
+        for (start, end) in split_file(path, processes)
+    ]
+
+    with multiprocessing.Pool(processes) as pool:
+        partial_counts = pool.starmap(count_byte_range, tasks)
+
+        while len(partial_counts) > 1:
+            pairs = [partial_counts[i:i + 2] for i in range(0, len(partial_counts), 2)]
+            partial_counts = pool.starmap(merge_counts, pairs)
+
+    counts = HashTable(default_value=0)
+
+    for pairs in partial_counts:
+        for (word, count) in pairs:
+            counts.push_item(word, count)
+
+    return counts
+
+
+############################################################
+
+
 def word_count(s):
-    # Implement me.
-    pass
+    return dict(count_words(s, HashTable(default_value=0)).items())
 
 
 if __name__ == "__main__":
-    print(word_count(""))
-    print(word_count("Hello"))
-    print(word_count('Hello, my cat. And my cat doesn\'t say "hello" back.'))
-    print(
-        word_count(
-            "This is a test of the emergency broadcast network. This is only a test."
+    if len(sys.argv) > 1:
+        paths = sys.argv[1:]
+        if "-" in paths:
+            counts = HashTable(default_value=0)
+            for path in paths:
+                word_count_file(path, counts=counts)
+        else:
+            counts = word_count_parallel(paths)
+        for (word, count) in counts.items():
+            print(f"{word} {count}")
+
+    else:
+        print(word_count(""))
+        print(word_count("Hello"))
+        print(word_count('Hello, my cat. And my cat doesn\'t say "hello" back.'))
+        print(
+            word_count(
+                "This is a test of the emergency broadcast network. This is only a test."
+            )
         )
-    )
@@ -0,0 +1,255 @@
+############################################################
+
+import asyncio
+
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   async hash table
+############################################################
+
+
+class AsyncHashTable:
+    """
+    An asyncio-friendly front end to a chained `HashTable`.
+
+    Resizing never blocks the event loop: when the load factor calls for it,
+    a background task migrates items to a new table, yielding to the loop
+    every `yield_every` items. During the migration, lookups keep using the
+    old table, and writes go to both tables, so neither goes stale.
+
+    Any other keyword arguments are passed on to the `HashTable`s.
+    """
+
+    DEFAULT_YIELD_EVERY = 0o400
+
+    def __init__(self, yield_every=DEFAULT_YIELD_EVERY, **table_kwargs):
+
+        if table_kwargs.get("storage", HashTable.DEFAULT_STORAGE) != "chain":
+            # cuckoo inserts move other items between slots, which could
+            # slip them past a migration that is part-way through the array
+            raise Exception("UnsupportedStorageError")
+
+        self.yield_every = yield_every
+
+        self.__table_kwargs = table_kwargs
+        self.__table = HashTable(**table_kwargs)
+        self.__next_table = None
+        self.__migration = None
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.item_count
+
+    #-----------------------------------------------------------
+
+    @property
+    def yield_every(self):
+        return self.__yield_every
+
+    @yield_every.setter
+    def yield_every(self, value):
+        self.__yield_every = max(1, int(value))
+        return
+
+    @yield_every.deleter
+    def yield_every(self):
+        setattr(self, "yield_every", self.DEFAULT_YIELD_EVERY)
+        return
+
+    #-----------------------------------------------------------
+
+    @property
+    def table(self):
+        """
+        The `HashTable` that currently serves lookups.
+        """
+
+        return self.__table
+
+    @property
+    def item_count(self):
+        return self.__table.item_count
+
+    @property
+    def bucket_count(self):
+        return self.__table.bucket_count
+
+    @property
+    def is_resizing(self):
+        return self.__next_table is not None
+
+    ############################################################
+    #   resizing
+    ############################################################
+
+    def maybe_resize(self):
+        """
+        Start migrating to a resized table if the load factor calls for it
+        and no migration is already running.
+        Returns the migration task, or `None`.
+        """
+
+        if self.__migration is not None:
+            return self.__migration
+
+        table = self.__table
+        new_bucket_count = table.bucket_count
+
+        if table.load_factor >= table.load_before_resize_up:
+            new_bucket_count = table.bucket_count_after_resize_up
+
+        elif table.load_factor <= table.load_before_resize_down:
+            new_bucket_count = table.bucket_count_after_resize_down
+
+        if new_bucket_count != table.bucket_count:
+            self.__next_table = HashTable(
+                **{
+                    **self.__table_kwargs,
+                    "bucket_count": new_bucket_count,
+                }
+            )
+            self.__migration = asyncio.ensure_future(self.migrate())
+
+        return self.__migration
+
+    async def migrate(self):
+        """
+        Copy every item of the current table into the next table,
+        yielding to the event loop every `yield_every` items,
+        then swap the next table in.
+        """
+
+        next_table = self.__next_table
+
+        # the copy directly follows each `yield`, so it always sees the latest value,
+        # and items written after they were copied are kept in step by `push_item`
+        for (count, (key, value)) in enumerate(self.__table.items(), 1):
+            next_table.push_item(key, value, should_resize=False)
+            if count % self.__yield_every == 0:
+                await asyncio.sleep(0)
+
+        self.__table = next_table
+        self.__next_table = None
+        self.__migration = None
+
+        # writes during the migration may have pushed the load past a threshold again
+        self.maybe_resize()
+
+        return self.__table.bucket_count
+
+    async def wait_for_resize(self):
+        """
+        Wait until no migration is running.
+        Returns the final `bucket_count`.
+        """
+
+        while self.__migration is not None:
+            await self.__migration
+
+        return self.__table.bucket_count
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    async def push_item(self, key, value):
+        """
+        Set `key`'s value to `value` in the hash table.
+        Returns the hash table's new item count.
+        """
+
+        item_count = self.__table.push_item(key, value, should_resize=False)
+
+        if self.__next_table is not None:
+            self.__next_table.push_item(key, value, should_resize=False)
+
+        self.maybe_resize()
+
+        return item_count
+
+    def find_item(self, key):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        return self.__table.find_item(key)
+
+    async def pop_item(self, key):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        (value, item_count) = self.__table.pop_item(key, should_resize=False)
+
+        if self.__next_table is not None:
+            self.__next_table.pop_item(key, should_resize=False)
+
+        self.maybe_resize()
+
+        return (value, item_count)
+
+    ########################################
+    #   bulk access
+    ########################################
+
+    async def update(self, items):
+        """
+        Set the value of every `(key, value)` pair in `items`,
+        yielding to the event loop every `yield_every` items.
+        Returns the hash table's new item count.
+        """
+
+        for (count, (key, value)) in enumerate(items, 1):
+            await self.push_item(key, value)
+            if count % self.__yield_every == 0:
+                await asyncio.sleep(0)
+
+        return self.item_count
+
+    async def get_many(self, keys):
+        """
+        Get the value of every key in `keys`,
+        yielding to the event loop every `yield_every` keys.
+        Returns a list of the values, in the same order as `keys`.
+        """
+
+        values = []
+
+        for (count, key) in enumerate(keys, 1):
+            values.append(self.find_item(key))
+            if count % self.__yield_every == 0:
+                await asyncio.sleep(0)
+
+        return values
+
+    def items(self):
+        return self.__table.items()
+
+    ########################################
+    #   other names
+    ########################################
+
+    async def set(self, key, value):
+        return await self.push_item(key, value)
+
+    async def put(self, key, value):
+        return await self.push_item(key, value)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    async def delete(self, key):
+        await self.pop_item(key)
+        return
+
+    async def pop(self, key):
+        return await self.pop_item(key)
@@ -0,0 +1,259 @@
+############################################################
+
+import math
+
+from tools import hash_tools
+from tools.math_tools import int_max
+
+############################################################
+#   bloom filter
+############################################################
+
+
+class BloomFilter:
+    """
+    A compact, probabilistic set of keys.
+
+    `might_contain(key)` is never wrong about keys that were added, but may
+    wrongly claim a key was added at about `error_rate`, once `capacity` keys
+    are in. A miss is therefore a definite miss, and can skip a real lookup.
+
+    Each key sets `hash_count` of `bit_count` bits. The bit indexes are derived
+    from one seeded hash and a cheap rescramble of it (Kirsch-Mitzenmacher),
+    so a key's string is only hashed once per operation. Where the caller has
+    already hashed the key (unseeded, with the same `hasher`), it can pass that
+    as `key_hash`, and the key isn't hashed at all.
+    """
+
+    DEFAULT_CAPACITY = 0o100
+    DEFAULT_ERROR_RATE = 1 / 100
+    DEFAULT_HASHER = "fnv1a"
+    DEFAULT_SEED = 0o1000
+
+    def __init__(
+        self,
+        capacity=DEFAULT_CAPACITY,
+        error_rate=DEFAULT_ERROR_RATE,
+        hasher=DEFAULT_HASHER,
+        seed=DEFAULT_SEED,
+    ):
+
+        capacity = int_max(1, capacity)
+
+        self.__capacity = capacity
+        self.__error_rate = error_rate
+        self.__bit_count = int_max(
+            8,
+            math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)),
+        )
+        self.__hash_count = int_max(
+            1,
+            round(self.__bit_count / capacity * math.log(2)),
+        )
+
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+        self.__seed_hash = hash_tools.get_seed_hasher(hasher)
+        self.__seed = seed
+
+        self.__item_count = 0
+        self.__cells = self.new_cells(self.__bit_count)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.item_count
+
+    def __contains__(self, key):
+        return self.might_contain(key)
+
+    #-----------------------------------------------------------
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    @property
+    def error_rate(self):
+        return self.__error_rate
+
+    @property
+    def bit_count(self):
+        return self.__bit_count
+
+    @property
+    def hash_count(self):
+        return self.__hash_count
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    @property
+    def item_count(self):
+        """
+        The number of keys added (and, for counting filters, not removed).
+        """
+
+        return self.__item_count
+
+    @property
+    def cells(self):
+        return self.__cells
+
+    @property
+    def expected_error_rate(self):
+        """
+        The false positive rate expected at the current `item_count`.
+        """
+
+        fill = math.exp(-self.__hash_count * self.__item_count / self.__bit_count)
+
+        return (1 - fill) ** self.__hash_count
+
+    ############################################################
+    #   indexing
+    ############################################################
+
+    def hash_indexes(self, key, key_hash=None):
+        """
+        Return the `hash_count` bit indexes of `key`,
+        given its unseeded `key_hash`, if known.
+        """
+
+        (h_1, h_2) = self.hash_pair(key, key_hash)
+
+        return [(h_1 + i * h_2) % self.__bit_count for i in range(self.__hash_count)]
+
+    def hash_pair(self, key, key_hash=None):
+        """
+        Return the two hashes of `key` that its bit indexes are combined from.
+        """
+
+        if key_hash is None:
+            h_1 = self.__hash(key, self.__seed)
+        else:
+            h_1 = self.__seed_hash(key_hash, self.__seed)
+
+        h_2 = hash_tools.seed_hash_64(h_1, self.__seed + 1) | 1
+
+        return (h_1, h_2)
+
+    ############################################################
+    #   cells
+    ############################################################
+
+    def new_cells(self, bit_count):
+        return bytearray((bit_count + 7) // 8)
+
+    def mark_cell(self, index):
+        self.__cells[index >> 3] |= 1 << (index & 7)
+        return
+
+    def unmark_cell(self, index):
+        raise Exception("UnsupportedRemoveError")
+
+    def test_cell(self, index):
+        return (self.__cells[index >> 3] >> (index & 7)) & 1
+
+    ############################################################
+    #   membership
+    ############################################################
+
+    def add(self, key, key_hash=None):
+        """
+        Add `key` to the filter.
+        Returns the filter's new item count.
+        """
+
+        for index in self.hash_indexes(key, key_hash):
+            self.mark_cell(index)
+
+        self.__item_count += 1
+
+        return self.__item_count
+
+    def add_many(self, keys):
+        """
+        Add every key in `keys` to the filter.
+        Returns the filter's new item count.
+        """
+
+        for key in keys:
+            self.add(key)
+
+        return self.__item_count
+
+    def might_contain(self, key, key_hash=None):
+        """
+        Returns `False` if `key` was definitely never added,
+        and `True` if it probably was.
+        """
+
+        # the indexes are tested as they are made, so a miss usually stops early
+        (h_1, h_2) = self.hash_pair(key, key_hash)
+
+        for i in range(self.__hash_count):
+            if not self.test_cell((h_1 + i * h_2) % self.__bit_count):
+                return False
+
+        return True
+
+    def remove(self, key, key_hash=None):
+        """
+        Remove `key` from the filter, if the filter supports it.
+        Only remove keys that are known to have been added!
+        Returns the filter's new item count.
+        """
+
+        for index in self.hash_indexes(key, key_hash):
+            self.unmark_cell(index)
+
+        self.__item_count -= 1
+
+        return self.__item_count
+
+    def clear(self):
+        """
+        Remove every key from the filter.
+        """
+
+        self.__item_count = 0
+        self.__cells = self.new_cells(self.__bit_count)
+
+        return
+
+
+############################################################
+#   counting bloom filter
+############################################################
+
+
+class CountingBloomFilter(BloomFilter):
+    """
+    A bloom filter that also supports `remove`, by keeping a small counter
+    (one byte) per bit instead of the bit itself.
+
+    Counters saturate at 0xFF and are never decremented afterwards, which
+    can only cause false positives, never false negatives.
+    """
+
+    MAX_COUNT = 0xFF
+
+    def new_cells(self, bit_count):
+        return bytearray(bit_count)
+
+    def mark_cell(self, index):
+        if self.cells[index] < self.MAX_COUNT:
+            self.cells[index] += 1
+        return
+
+    def unmark_cell(self, index):
+        if 0 < self.cells[index] < self.MAX_COUNT:
+            self.cells[index] -= 1
+        return
+
+    def test_cell(self, index):
+        return self.cells[index]
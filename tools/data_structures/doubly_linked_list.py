@@ -102,16 +102,19 @@ class DoublyLinkedList:
     Each DoublyLinkedList contains
     -   `head_node`: a reference to the list's head node.
     -   `tail_node`: a reference to the list's tail node.
+    -   `owner`: an optional tag for whoever holds the list.
     """
 
     def __init__(
         self,
         value=None,
         value_iter=None,
+        owner=None,
     ):
 
         self.head_node = None
         self.tail_node = None
+        self.owner = owner
         self.__length = 0
 
         if is_iterable(value_iter):
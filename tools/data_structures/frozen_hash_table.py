@@ -0,0 +1,249 @@
+############################################################
+
+from array import array
+
+from tools import hash_tools
+from tools.math_tools import int_max
+
+############################################################
+#   frozen hash table
+############################################################
+
+
+class FrozenHashTable:
+    """
+    An immutable hash table over a fixed set of keys.
+
+    Keys are placed with a minimal perfect hash, built "hash and displace"
+    style (as in CHD): keys are first hashed into small groups, and each group
+    is given a `displacement`, a seed under which all of its keys hash to free
+    slots. Groups of one key just take a free slot directly, which is stored
+    as a negative displacement. With about one key per group, most groups are
+    empty or single, so the build stays fast at the cost of one displacement
+    per key.
+
+    Keys and values live in flat tuples of exactly `item_count` slots, so a
+    lookup is two hashes, one slot, and one key comparison, with no chains.
+    """
+
+    DEFAULT_GROUP_SIZE = 1
+    DEFAULT_MAX_SEED = 0o1000000
+    DEFAULT_DEFAULT_VALUE = None
+    DEFAULT_HASHER = "fnv1a"
+
+    def __init__(
+        self,
+        displacements,
+        keys,
+        values,
+        default_value=DEFAULT_DEFAULT_VALUE,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        self.__displacements = array("q", displacements)
+        self.__keys = tuple(keys)
+        self.__values = tuple(values)
+
+        self.__default_value = default_value
+
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+
+        return
+
+    @classmethod
+    def build(
+        cls,
+        items,
+        group_size=DEFAULT_GROUP_SIZE,
+        max_seed=DEFAULT_MAX_SEED,
+        default_value=DEFAULT_DEFAULT_VALUE,
+        hasher=DEFAULT_HASHER,
+    ):
+        """
+        Build a frozen hash table from an iterable of `(key, value)` pairs.
+        Later pairs win over earlier pairs with the same key.
+        Raises `PerfectHashBuildError` if no seed up to `max_seed` separates
+        some keys. Seeds only rescramble a key's unseeded hash, so two keys
+        with the same unseeded hash (anagrams under "naive", or "Ez" and "FY"
+        under "djb2") can never be separated, and raise before any search.
+        """
+
+        hash_function = hash_tools.get_hasher(hasher)
+
+        item_dict = dict(items)
+        keys = list(item_dict.keys())
+
+        key_hashes = [hash_function(key, 0) for key in keys]
+        if len(set(key_hashes)) != len(key_hashes):
+            raise Exception("PerfectHashBuildError")
+
+        slot_count = len(keys)
+        group_count = int_max(1, -(-slot_count // group_size))
+
+        # hash every key into a group
+        groups = [[] for __ in range(group_count)]
+        for (key, key_hash) in zip(keys, key_hashes):
+            groups[key_hash % group_count].append(key)
+
+        displacements = [0] * group_count
+        slots = [None] * slot_count
+        filled = [False] * slot_count
+
+        # place the biggest groups first, while there is the most room
+        group_order = sorted(range(group_count), key=lambda g: len(groups[g]), reverse=True)
+
+        single_groups = []
+
+        for g in group_order:
+            group = groups[g]
+
+            if len(group) == 0:
+                break
+
+            elif len(group) == 1:
+                single_groups.append(g)
+                continue
+
+            # search for a seed that sends every key in the group to a distinct free slot
+            seed = 1
+            while True:
+                indexes = [hash_function(key, seed) % slot_count for key in group]
+                if len(set(indexes)) == len(indexes) and not any(filled[index] for index in indexes):
+                    break
+                elif seed >= max_seed:
+                    raise Exception("PerfectHashBuildError")
+                seed += 1
+
+            displacements[g] = seed
+            for (key, index) in zip(group, indexes):
+                slots[index] = key
+                filled[index] = True
+
+        # give every single-key group a free slot directly
+        free_indexes = [index for index in range(slot_count) if not filled[index]]
+
+        for (g, index) in zip(single_groups, free_indexes):
+            displacements[g] = -index - 1
+            slots[index] = groups[g][0]
+
+        return cls(
+            displacements,
+            slots,
+            (item_dict[key] for key in slots),
+            default_value=default_value,
+            hasher=hasher,
+        )
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.item_count
+
+    def __contains__(self, key):
+        return self.find_index(key) is not None
+
+    def __iter__(self):
+        return iter(self.__keys)
+
+    def __eq__(self, other):
+        if not isinstance(other, FrozenHashTable):
+            return NotImplemented
+        elif len(self) != len(other):
+            return False
+        else:
+            return all(
+                key in other and other.find_item(key) == value
+                for (key, value) in self.items()
+            )
+
+    def __hash__(self):
+        return hash(frozenset(self.items()))
+
+    #-----------------------------------------------------------
+
+    @property
+    def item_count(self):
+        return len(self.__keys)
+
+    @property
+    def group_count(self):
+        return len(self.__displacements)
+
+    @property
+    def default_value(self):
+        return self.__default_value
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    ############################################################
+    #   indexing
+    ############################################################
+
+    def hash_index(self, key):
+        """
+        Return the only slot index where `key` could be stored.
+        """
+
+        if len(self.__keys) == 0:
+            return None
+
+        displacement = self.__displacements[self.__hash(key, 0) % len(self.__displacements)]
+
+        if displacement < 0:
+            return -displacement - 1
+        else:
+            return self.__hash(key, displacement) % len(self.__keys)
+
+    def find_index(self, key):
+        """
+        Return the slot index of `key`, or `None` if the key is not found.
+        """
+
+        index = self.hash_index(key)
+
+        if index is not None and self.__keys[index] == key:
+            return index
+        else:
+            return None
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    def find_item(self, key):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        index = self.find_index(key)
+
+        if index is not None:
+            return self.__values[index]
+        else:
+            return self.__default_value
+
+    def items(self):
+        return zip(self.__keys, self.__values)
+
+    def keys(self):
+        return iter(self.__keys)
+
+    def values(self):
+        return iter(self.__values)
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
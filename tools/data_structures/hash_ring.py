@@ -0,0 +1,399 @@
+############################################################
+
+import bisect
+from array import array
+
+from tools import hash_tools
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   hash ring
+############################################################
+
+MODES = ("ring", "jump", "rendezvous")
+
+# keys are hashed with a seed, so their hashes are finalized (mixed) and
+# don't line up with the unseeded hashes the shards' own tables use
+KEY_SEED = 0o7
+
+# the multiplier of the linear congruential generator in jump consistent hash
+JUMP_MULTIPLIER = 2862933555777941757
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+def jump_hash(key_hash, bucket_count):
+    """
+    Lamping and Veach's jump consistent hash: the bucket, out of
+    `bucket_count`, for the 64-bit `key_hash`. Going from n to n + 1 buckets
+    moves just the keys that land in the new bucket, about 1/(n + 1) of them.
+    """
+
+    bucket = -1
+    j = 0
+
+    while j < bucket_count:
+        bucket = j
+        key_hash = (key_hash * JUMP_MULTIPLIER + 1) & MASK_64
+        j = int((bucket + 1) * ((1 << 31) / ((key_hash >> 33) + 1)))
+
+    return bucket
+
+
+class HashRing:
+    """
+    Assigns keys to `nodes` by consistent hashing, so that adding or removing
+    one of n nodes only moves about 1/n of the keys, by `mode`:
+    -   "ring": each node is hashed to `virtual_node_count` points on a ring
+        of hash values, and a key goes to the node of the first point at or
+        after its hash, wrapping around.
+    -   "jump": jump consistent hash over the list of nodes, by position.
+        No state but the node list. Removing a node moves the last node into
+        its place, so only the keys of those two nodes move, about 2/n.
+    -   "rendezvous": a key goes to the node giving the highest hash of the
+        key and node together. O(n) per key, but any node can come or go.
+
+    All hashes are the project's `hasher`, seeded.
+    """
+
+    DEFAULT_MODE = "ring"
+    DEFAULT_VIRTUAL_NODE_COUNT = 0o100
+    DEFAULT_HASHER = HashTable.DEFAULT_HASHER
+
+    def __init__(
+        self,
+        nodes=(),
+        mode=DEFAULT_MODE,
+        virtual_node_count=DEFAULT_VIRTUAL_NODE_COUNT,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        if mode not in MODES:
+            raise Exception("UnknownModeError")
+
+        self.__mode = mode
+        self.__virtual_node_count = virtual_node_count
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+
+        self.__nodes = []
+
+        # "ring": the sorted points, and the node of each
+        self.__points = array("Q")
+        self.__point_nodes = []
+
+        # "rendezvous": each node's hash, as a seed for the key's
+        self.__node_hashes = []
+
+        for node in nodes:
+            self.add_node(node)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__nodes)
+
+    def __contains__(self, node):
+        return node in self.__nodes
+
+    @property
+    def nodes(self):
+        return tuple(self.__nodes)
+
+    @property
+    def mode(self):
+        return self.__mode
+
+    @property
+    def virtual_node_count(self):
+        return self.__virtual_node_count
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    ############################################################
+    #   nodes
+    ############################################################
+
+    def add_node(self, node):
+
+        if node in self.__nodes:
+            raise Exception("DuplicateNodeError")
+
+        self.__nodes.append(node)
+        self.__node_hashes.append(self.__hash(node))
+
+        if self.__mode == "ring":
+            for replica in range(self.__virtual_node_count):
+                point = self.__hash(node, seed=replica + 1)
+                index = bisect.bisect_left(self.__points, point)
+                self.__points.insert(index, point)
+                self.__point_nodes.insert(index, node)
+
+        return
+
+    def remove_node(self, node):
+        """
+        Remove `node`.
+        Returns the nodes whose keys may have been reassigned: `node`, and in
+        "jump" mode, the last node, which takes over its position.
+        """
+
+        if node not in self.__nodes:
+            raise Exception("UnknownNodeError")
+
+        index = self.__nodes.index(node)
+        changed_nodes = (node,)
+
+        # jump hash maps keys to positions, so every node after a removed one
+        # would take over the keys of the one before it; moving the last node
+        # into the gap leaves the rest where they are
+        if self.__mode == "jump" and index < len(self.__nodes) - 1:
+            self.__nodes[index] = self.__nodes[-1]
+            self.__node_hashes[index] = self.__node_hashes[-1]
+            changed_nodes = (node, self.__nodes[index])
+            index = len(self.__nodes) - 1
+
+        del self.__nodes[index]
+        del self.__node_hashes[index]
+
+        if self.__mode == "ring":
+            kept = [i for (i, point_node) in enumerate(self.__point_nodes) if point_node != node]
+            self.__points = array("Q", (self.__points[i] for i in kept))
+            self.__point_nodes = [self.__point_nodes[i] for i in kept]
+
+        return changed_nodes
+
+    ############################################################
+    #   keys
+    ############################################################
+
+    def node_for(self, key):
+        """
+        Returns the node that `key` is assigned to.
+        """
+
+        if not self.__nodes:
+            raise Exception("NoNodesError")
+
+        key_hash = self.__hash(key, seed=KEY_SEED)
+
+        if self.__mode == "ring":
+            index = bisect.bisect_left(self.__points, key_hash)
+            return self.__point_nodes[index if index < len(self.__points) else 0]
+
+        if self.__mode == "jump":
+            return self.__nodes[jump_hash(key_hash, len(self.__nodes))]
+
+        scores = [hash_tools.seed_hash_64(key_hash, node_hash) for node_hash in self.__node_hashes]
+        return self.__nodes[scores.index(max(scores))]
+
+
+############################################################
+#   sharded hash table
+############################################################
+
+
+class ShardedHashTable:
+    """
+    A hash table split across `shards`, one `HashTable` each, with every key
+    routed to its shard by a `HashRing`. Adding or removing a shard moves only
+    the keys the ring reassigns, and says how many that was.
+
+    `mode`, `virtual_node_count` and `hasher` go to the ring, and any other
+    keyword arguments to each shard's `HashTable`.
+    """
+
+    def __init__(
+        self,
+        shards=(),
+        mode=HashRing.DEFAULT_MODE,
+        virtual_node_count=HashRing.DEFAULT_VIRTUAL_NODE_COUNT,
+        hasher=HashRing.DEFAULT_HASHER,
+        **table_kwargs,
+    ):
+
+        self.__ring = HashRing(mode=mode, virtual_node_count=virtual_node_count, hasher=hasher)
+        self.__table_kwargs = table_kwargs
+        self.__tables = {}
+        self.__item_count = 0
+
+        for shard in shards:
+            self.add_shard(shard)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__item_count
+
+    @property
+    def ring(self):
+        return self.__ring
+
+    @property
+    def shards(self):
+        return self.__ring.nodes
+
+    @property
+    def item_count(self):
+        return self.__item_count
+
+    def table(self, shard):
+        return self.__tables[shard]
+
+    def shard_sizes(self):
+        """
+        Returns a dict of each shard => its item count.
+        """
+
+        return {shard: len(self.__tables[shard]) for shard in self.shards}
+
+    ############################################################
+    #   rebalancing
+    ############################################################
+
+    def add_shard(self, shard):
+        """
+        Add `shard`, and move the keys the ring now assigns to it.
+        Returns the number of keys moved.
+        """
+
+        self.__ring.add_node(shard)
+        self.__tables[shard] = HashTable(**self.__table_kwargs)
+
+        return self.rebalance(tuple(self.__tables))
+
+    def remove_shard(self, shard):
+        """
+        Remove `shard`, and move its keys, and any others that the ring
+        reassigns, to the shards the ring assigns them.
+        Returns the number of keys moved.
+        The last shard can only be removed once it's empty,
+        since its keys would have nowhere to go.
+        """
+
+        if shard in self.__tables and len(self.__tables) == 1 and len(self.__tables[shard]) > 0:
+            raise Exception("LastShardError")
+
+        moved_count = self.rebalance(self.__ring.remove_node(shard))
+        del self.__tables[shard]
+
+        return moved_count
+
+    def rebalance(self, shards):
+        """
+        Move each key in the tables of `shards` that the ring assigns elsewhere.
+        Returns the number of keys moved.
+        """
+
+        moved_count = 0
+
+        for shard in shards:
+            table = self.__tables[shard]
+            for (key, value) in list(table.items()):
+                new_shard = self.__ring.node_for(key)
+                if new_shard != shard:
+                    table.pop_item(key)
+                    self.__tables[new_shard].push_item(key, value)
+                    moved_count += 1
+
+        return moved_count
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    def push_item(self, key, value, **kwargs):
+        """
+        Set `key`'s value to `value` in its shard.
+        Returns the hash table's new item count.
+        """
+
+        table = self.__tables[self.__ring.node_for(key)]
+
+        old_count = len(table)
+        table.push_item(key, value, **kwargs)
+        self.__item_count += len(table) - old_count
+
+        return self.__item_count
+
+    def find_item(self, key, **kwargs):
+        """
+        Get `key`'s value from its shard.
+        Returns the key's value or the shard's `default_value` if it's not found.
+        """
+
+        return self.__tables[self.__ring.node_for(key)].find_item(key, **kwargs)
+
+    def pop_item(self, key, **kwargs):
+        """
+        Remove `key`'s value from its shard.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        table = self.__tables[self.__ring.node_for(key)]
+
+        old_count = len(table)
+        (value, __) = table.pop_item(key, **kwargs)
+        self.__item_count += len(table) - old_count
+
+        return (value, self.__item_count)
+
+    def items(self):
+        for shard in self.shards:
+            yield from self.__tables[shard].items()
+        return
+
+    def keys(self):
+        for (key, __) in self.items():
+            yield key
+        return
+
+    def values(self):
+        for (__, value) in self.items():
+            yield value
+        return
+
+    def __iter__(self):
+        return self.keys()
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __setitem__(self, key, value, **kwargs):
+        self.push_item(key, value, **kwargs)
+        return
+
+    def set(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def put(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def push(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
+
+    def __delitem__(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def delete(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def pop(self, key, **kwargs):
+        return self.pop_item(key, **kwargs)
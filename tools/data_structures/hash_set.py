@@ -0,0 +1,373 @@
+############################################################
+
+import math
+
+from tools import hash_tools
+from tools.math_tools import int_min, int_max
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   hash set
+############################################################
+
+
+class HashSet:
+    """
+    A set of keys, hashed and resized the same way as a chained `HashTable`,
+    but storing keys only: each bucket is `None` or a plain list of its keys,
+    with no values, `(key, value)` tuples, or linked-list nodes.
+
+    The set operations iterate the smaller operand where they can,
+    and size the result up front, so it is rehashed at most once.
+    """
+
+    DEFAULT_BUCKET_COUNT = HashTable.DEFAULT_BUCKET_COUNT
+    DEFAULT_MIN_BUCKET_COUNT = HashTable.DEFAULT_MIN_BUCKET_COUNT
+    DEFAULT_MAX_BUCKET_COUNT = HashTable.DEFAULT_MAX_BUCKET_COUNT
+    DEFAULT_RESIZE_UP_FACTOR = HashTable.DEFAULT_RESIZE_UP_FACTOR
+    DEFAULT_RESIZE_DOWN_FACTOR = HashTable.DEFAULT_RESIZE_DOWN_FACTOR
+    DEFAULT_LOAD_BEFORE_RESIZE_UP = HashTable.DEFAULT_LOAD_BEFORE_RESIZE_UP
+    DEFAULT_LOAD_BEFORE_RESIZE_DOWN = HashTable.DEFAULT_LOAD_BEFORE_RESIZE_DOWN
+    DEFAULT_HASHER = HashTable.DEFAULT_HASHER
+
+    def __init__(
+        self,
+        keys=None,
+        bucket_count=DEFAULT_BUCKET_COUNT,
+        min_bucket_count=DEFAULT_MIN_BUCKET_COUNT,
+        max_bucket_count=DEFAULT_MAX_BUCKET_COUNT,
+        resize_up_factor=DEFAULT_RESIZE_UP_FACTOR,
+        resize_down_factor=DEFAULT_RESIZE_DOWN_FACTOR,
+        load_before_resize_up=DEFAULT_LOAD_BEFORE_RESIZE_UP,
+        load_before_resize_down=DEFAULT_LOAD_BEFORE_RESIZE_DOWN,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        self.__bucket_count = bucket_count
+        self.__min_bucket_count = int_min(bucket_count, min_bucket_count)
+        self.__max_bucket_count = int_max(bucket_count, max_bucket_count)
+        self.__resize_up_factor = resize_up_factor
+        self.__resize_down_factor = resize_down_factor
+        self.__load_before_resize_up = load_before_resize_up
+        self.__load_before_resize_down = load_before_resize_down
+
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+
+        self.__item_count = 0
+        self.__array = [None] * bucket_count
+
+        if keys is not None:
+            self.add_many(keys)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__item_count
+
+    def __contains__(self, key):
+        return self.contains(key)
+
+    def __iter__(self):
+        return self.keys()
+
+    def __eq__(self, other):
+        if not isinstance(other, HashSet):
+            return NotImplemented
+        return len(self) == len(other) and all(key in other for key in self)
+
+    def __repr__(self):
+        return f"HashSet({list(self.keys())!r})"
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    #-----------------------------------------------------------
+
+    @property
+    def item_count(self):
+        return self.__item_count
+
+    @property
+    def bucket_count(self):
+        return self.__bucket_count
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    @property
+    def load_factor(self):
+        return self.__item_count / self.__bucket_count
+
+    def bucket_count_for(self, item_count):
+        """
+        The `bucket_count` that the resize policy would settle on for
+        `item_count` keys: grown by `resize_up_factor` until the load
+        is under `load_before_resize_up`, within the min and max.
+        """
+
+        bucket_count = self.__min_bucket_count
+
+        while item_count / bucket_count >= self.__load_before_resize_up and bucket_count < self.__max_bucket_count:
+            bucket_count = int_min(
+                self.__max_bucket_count,
+                math.ceil(bucket_count * self.__resize_up_factor),
+            )
+
+        return bucket_count
+
+    ############################################################
+    #   hashing and resizing
+    ############################################################
+
+    def hash_index(self, key):
+        return self.__hash(key) % self.__bucket_count
+
+    def resize(self):
+        """
+        Resize the internal array if the load factor calls for it.
+        Returns the final `bucket_count`.
+        """
+
+        if self.load_factor >= self.__load_before_resize_up:
+            self.rehash(
+                int_min(self.__max_bucket_count, self.__bucket_count * self.__resize_up_factor)
+            )
+
+        elif self.load_factor <= self.__load_before_resize_down:
+            self.rehash(
+                int_max(self.__min_bucket_count, self.__bucket_count / self.__resize_down_factor)
+            )
+
+        return self.__bucket_count
+
+    def reserve(self, item_count):
+        """
+        Grow the internal array once, if need be, to hold `item_count` keys
+        without further resizing on the way.
+        Returns the final `bucket_count`.
+        """
+
+        bucket_count = self.bucket_count_for(item_count)
+
+        if bucket_count > self.__bucket_count:
+            self.rehash(bucket_count)
+
+        return self.__bucket_count
+
+    def rehash(self, bucket_count):
+        """
+        Move every key into a new internal array of `bucket_count` buckets.
+        """
+
+        if bucket_count == self.__bucket_count:
+            return
+
+        old_array = self.__array
+
+        self.__bucket_count = bucket_count
+        self.__array = [None] * bucket_count
+
+        for bucket in old_array:
+            if bucket is not None:
+                for key in bucket:
+                    self.__insert(key)
+
+        return
+
+    def __insert(self, key):
+        """
+        Put `key`, known not to be in the set, in its bucket, without counting it.
+        """
+
+        index = self.hash_index(key)
+        bucket = self.__array[index]
+
+        if bucket is None:
+            self.__array[index] = [key]
+        else:
+            bucket.append(key)
+
+        return
+
+    ############################################################
+    #   keys
+    ############################################################
+
+    def add(self, key, should_resize=True):
+        """
+        Add `key` to the set.
+        Returns `True` if it's new, or `False` if it was in the set already.
+        """
+
+        index = self.hash_index(key)
+        bucket = self.__array[index]
+
+        if bucket is None:
+            self.__array[index] = [key]
+        elif key in bucket:
+            return False
+        else:
+            bucket.append(key)
+
+        self.__item_count += 1
+
+        if should_resize:
+            self.resize()
+
+        return True
+
+    def add_many(self, keys):
+        """
+        Add every key in `keys`, growing the array at most once first,
+        if `keys` has a length.
+        Returns the number of keys that were new.
+        """
+
+        if hasattr(keys, "__len__"):
+            self.reserve(self.__item_count + len(keys))
+
+        # (resizing as each key went in would shrink the reserved array again)
+        added_count = 0
+        for key in keys:
+            if self.add(key, should_resize=False):
+                added_count += 1
+                if self.load_factor >= self.__load_before_resize_up:
+                    self.resize()
+
+        self.resize()
+
+        return added_count
+
+    def contains(self, key):
+        bucket = self.__array[self.hash_index(key)]
+        return bucket is not None and key in bucket
+
+    def discard(self, key, should_resize=True):
+        """
+        Remove `key` from the set, if it's there.
+        Returns `True` if it was removed.
+        """
+
+        index = self.hash_index(key)
+        bucket = self.__array[index]
+
+        if bucket is None or key not in bucket:
+            return False
+
+        bucket.remove(key)
+        if not bucket:
+            self.__array[index] = None
+
+        self.__item_count -= 1
+
+        if should_resize:
+            self.resize()
+
+        return True
+
+    def keys(self):
+        for bucket in self.__array:
+            if bucket is not None:
+                yield from bucket
+        return
+
+    def copy(self):
+        """
+        Returns a new set of the same keys, with the same array size and
+        policy, copied bucket by bucket with no rehashing.
+        """
+
+        other = self.empty(self.__bucket_count)
+        other.__array = [None if bucket is None else list(bucket) for bucket in self.__array]
+        other.__item_count = self.__item_count
+
+        return other
+
+    def empty(self, bucket_count=None):
+        """
+        Returns a new, empty set with the same policy and hasher,
+        and `bucket_count` buckets (by default, the minimum).
+        """
+
+        return HashSet(
+            bucket_count=self.__min_bucket_count if bucket_count is None else bucket_count,
+            min_bucket_count=self.__min_bucket_count,
+            max_bucket_count=self.__max_bucket_count,
+            resize_up_factor=self.__resize_up_factor,
+            resize_down_factor=self.__resize_down_factor,
+            load_before_resize_up=self.__load_before_resize_up,
+            load_before_resize_down=self.__load_before_resize_down,
+            hasher=self.__hasher,
+        )
+
+    ############################################################
+    #   set operations
+    ############################################################
+
+    def union(self, other):
+        """
+        Returns a new set of the keys in either set:
+        a copy of the larger set, grown once, with the smaller set's keys added.
+        """
+
+        (smaller, larger) = sorted((self, other), key=len)
+
+        result = larger.copy()
+        result.reserve(len(larger) + len(smaller))
+
+        for key in smaller:
+            result.add(key, should_resize=False)
+
+        result.resize()
+
+        return result
+
+    def intersection(self, other):
+        """
+        Returns a new set of the keys in both sets,
+        looking up each key of the smaller set in the larger.
+        """
+
+        (smaller, larger) = sorted((self, other), key=len)
+
+        result = self.empty(self.bucket_count_for(len(smaller)))
+
+        for key in smaller:
+            if larger.contains(key):
+                result.add(key, should_resize=False)
+
+        result.resize()
+
+        return result
+
+    def difference(self, other):
+        """
+        Returns a new set of the keys in this set but not in `other`:
+        when `other` is the smaller, a copy of this set with its keys removed,
+        else this set's keys that `other` doesn't have.
+        """
+
+        if len(other) < len(self):
+            result = self.copy()
+            for key in other:
+                result.discard(key, should_resize=False)
+
+        else:
+            result = self.empty(self.bucket_count_for(len(self)))
+            for key in self:
+                if not other.contains(key):
+                    result.add(key, should_resize=False)
+
+        result.resize()
+
+        return result
@@ -1,7 +1,13 @@
 ############################################################
 
+import copy
+import itertools
+
+from tools import hash_tools
 from tools.math_tools import int_min, int_max
+from tools.data_structures.bloom_filter import CountingBloomFilter
 from tools.data_structures.doubly_linked_list import DoublyLinkedList
+from tools.data_structures.frozen_hash_table import FrozenHashTable
 
 ############################################################
 #   hash table
@@ -13,12 +19,24 @@ class HashTable:
     A hash table with `bucket_count` buckets
     that accepts string keys.
 
-    Implement this.
+    Items are stored according to `storage`:
+    -   "chain": each bucket holds a linked list of colliding items.
+    -   "cuckoo": each key lives in one of `cuckoo_ways` buckets,
+        chosen by differently-seeded hashes, or in a small stash;
+        lookups never probe more than `cuckoo_ways + cuckoo_stash_size` slots.
+        (The "naive" and "djb2" hashers can't be used. `max_bucket_count`
+        is a hard limit here, so it defaults to `DEFAULT_CUCKOO_MAX_BUCKET_COUNT`,
+        and a push that overfills the stash at that limit is undone, then
+        raises `CuckooStashOverflowError`.
+        A down-size may overfill the stash until the next push settles it.
+        Two ways fill up at about half load, so two-way tables do best with
+        `load_before_resize_up=1/2` and `load_before_resize_down=1/8`.)
     """
 
     DEFAULT_BUCKET_COUNT = 0o100
     DEFAULT_MIN_BUCKET_COUNT = 0o10
     DEFAULT_MAX_BUCKET_COUNT = 0o100000
+    DEFAULT_CUCKOO_MAX_BUCKET_COUNT = 0o10000000000
     DEFAULT_RESIZE_FACTOR = 2
     DEFAULT_RESIZE_UP_FACTOR = DEFAULT_RESIZE_FACTOR
     DEFAULT_RESIZE_DOWN_FACTOR = DEFAULT_RESIZE_FACTOR
@@ -26,13 +44,19 @@ class HashTable:
     DEFAULT_LOAD_BEFORE_RESIZE_DOWN = 1 / 4
     DEFAULT_DEFAULT_VALUE = None
     DEFAULT_HASHER = "fnv1a"
+    DEFAULT_STORAGE = "chain"
+    DEFAULT_CUCKOO_WAYS = 2
+    DEFAULT_CUCKOO_MAX_KICKS = 0o40
+    DEFAULT_CUCKOO_STASH_SIZE = 0o4
+    DEFAULT_MEMBERSHIP_FILTER = False
+    DEFAULT_FILTER_ERROR_RATE = 1 / 100
     DEFAULT_DEBUG = False
 
     def __init__(
         self,
         bucket_count=DEFAULT_BUCKET_COUNT,
         min_bucket_count=DEFAULT_MIN_BUCKET_COUNT,
-        max_bucket_count=DEFAULT_MAX_BUCKET_COUNT,
+        max_bucket_count=None,
         resize_factor=DEFAULT_RESIZE_FACTOR,
         resize_up_factor=DEFAULT_RESIZE_UP_FACTOR,
         resize_down_factor=DEFAULT_RESIZE_DOWN_FACTOR,
@@ -40,11 +64,25 @@ class HashTable:
         load_before_resize_down=DEFAULT_LOAD_BEFORE_RESIZE_DOWN,
         default_value=DEFAULT_DEFAULT_VALUE,
         hasher=DEFAULT_HASHER,
+        storage=DEFAULT_STORAGE,
+        cuckoo_ways=DEFAULT_CUCKOO_WAYS,
+        cuckoo_max_kicks=DEFAULT_CUCKOO_MAX_KICKS,
+        cuckoo_stash_size=DEFAULT_CUCKOO_STASH_SIZE,
+        membership_filter=DEFAULT_MEMBERSHIP_FILTER,
+        filter_error_rate=DEFAULT_FILTER_ERROR_RATE,
         debug=DEFAULT_DEBUG,
     ):
 
         self.debug = debug
 
+        # chained tables can overfill past `max_bucket_count`, but cuckoo tables
+        # can't, so they default to a limit that only memory would reach
+        if max_bucket_count is None:
+            if storage == "cuckoo":
+                max_bucket_count = self.DEFAULT_CUCKOO_MAX_BUCKET_COUNT
+            else:
+                max_bucket_count = self.DEFAULT_MAX_BUCKET_COUNT
+
         self.__bucket_count = bucket_count
         self.min_bucket_count = int_min(bucket_count, min_bucket_count)
         self.max_bucket_count = int_max(bucket_count, max_bucket_count)
@@ -63,7 +101,45 @@ class HashTable:
         if hasher not in HashTable.hashers:
             raise Exception("UnknownHasherError")
         else:
-            self.__hash = getattr(self, f"{hasher}_hash")
+            self.__hasher = hasher
+
+        if storage not in HashTable.storages:
+            raise Exception("UnknownStorageError")
+        elif storage == "cuckoo" and hasher not in HashTable.cuckoo_hashers:
+            raise Exception("WeakHasherError")
+        else:
+            self.__storage = storage
+
+        self.__bind_methods()
+
+        # copy-on-write state, see `fork`
+        self.__shared_array = False
+        self.__owner = None
+
+        self.__stash = []
+        self.cuckoo_ways = cuckoo_ways
+        self.cuckoo_max_kicks = cuckoo_max_kicks
+        self.cuckoo_stash_size = cuckoo_stash_size
+
+        self.__use_filter = bool(membership_filter)
+        self.__filter_error_rate = filter_error_rate
+        self.__filter = None
+        self.__shared_filter = False
+        self.__filter_reset()
+
+        return
+
+    def __bind_methods(self):
+        """
+        Bind the hashing and storage methods picked by `hasher` and `storage`.
+        """
+
+        self.__hash = getattr(self, f"{self.__hasher}_hash")
+        self.__seed_hash = hash_tools.get_seed_hasher(self.__hasher)
+        self.__push_item = getattr(self, f"push_{self.__storage}_item")
+        self.__find_item = getattr(self, f"find_{self.__storage}_item")
+        self.__pop_item = getattr(self, f"pop_{self.__storage}_item")
+        self.__rehash_from_array = getattr(self, f"rehash_from_{self.__storage}_array")
 
         return
 
@@ -140,7 +216,10 @@ class HashTable:
 
     @max_bucket_count.deleter
     def max_bucket_count(self):
-        setattr(self, "max_bucket_count", self.DEFAULT_MAX_BUCKET_COUNT)
+        if self.__storage == "cuckoo":
+            setattr(self, "max_bucket_count", self.DEFAULT_CUCKOO_MAX_BUCKET_COUNT)
+        else:
+            setattr(self, "max_bucket_count", self.DEFAULT_MAX_BUCKET_COUNT)
         return
 
     #-----------------------------------------------------------
@@ -245,96 +324,159 @@ class HashTable:
 
     #-----------------------------------------------------------
 
+    @property
+    def hasher(self):
+        return self.__hasher
+
     @property
     def hash(self):
         return self.__hash
 
+    #-----------------------------------------------------------
+
+    @property
+    def storage(self):
+        return self.__storage
+
+    #-----------------------------------------------------------
+
+    @property
+    def cuckoo_ways(self):
+        return self.__cuckoo_ways
+
+    @cuckoo_ways.setter
+    def cuckoo_ways(self, value):
+        self.__cuckoo_ways = int_max(1, value)
+        return
+
+    @cuckoo_ways.deleter
+    def cuckoo_ways(self):
+        setattr(self, "cuckoo_ways", self.DEFAULT_CUCKOO_WAYS)
+        return
+
+    #-----------------------------------------------------------
+
+    @property
+    def cuckoo_max_kicks(self):
+        return self.__cuckoo_max_kicks
+
+    @cuckoo_max_kicks.setter
+    def cuckoo_max_kicks(self, value):
+        self.__cuckoo_max_kicks = value
+        return
+
+    @cuckoo_max_kicks.deleter
+    def cuckoo_max_kicks(self):
+        setattr(self, "cuckoo_max_kicks", self.DEFAULT_CUCKOO_MAX_KICKS)
+        return
+
+    #-----------------------------------------------------------
+
+    @property
+    def cuckoo_stash_size(self):
+        return self.__cuckoo_stash_size
+
+    @cuckoo_stash_size.setter
+    def cuckoo_stash_size(self, value):
+        self.__cuckoo_stash_size = value
+        return
+
+    @cuckoo_stash_size.deleter
+    def cuckoo_stash_size(self):
+        setattr(self, "cuckoo_stash_size", self.DEFAULT_CUCKOO_STASH_SIZE)
+        return
+
+    @property
+    def stash_count(self):
+        return len(self.__stash)
+
+    #-----------------------------------------------------------
+
+    @property
+    def membership_filter(self):
+        """
+        The counting bloom filter kept alongside the items, or `None`.
+        """
+
+        return self.__filter
+
     ############################################################
     #   hashing functions
     ############################################################
 
-    hashers = (
-        "naive",
-        "djb2",
-        "fnv1",
-        "fnv1a",
+    hashers = tuple(hash_tools.hashers)
+
+    storages = (
+        "chain",
+        "cuckoo",
     )
 
-    def naive_hash(self, string):
+    # seeds only rescramble the finished hash, so keys whose unseeded hashes
+    # are equal collide under every seed, and no number of ways or resizes can
+    # place them; the naïve hash collides on every anagram, and djb2's 32 bits
+    # collide on short keys that are easy to stumble on ("Ez" and "FY")
+    cuckoo_hashers = tuple(hasher for hasher in hashers if hasher not in ("naive", "djb2"))
+
+    def naive_hash(self, string, seed=0):
         """
         Naïve hash from string to integer.
         """
 
-        s_bytes = str(string).encode()
-        s_hash = 0
-
-        for b in s_bytes:
-            s_hash += b
-            s_hash &= 0xFFFFFFFF
+        return hash_tools.naive_hash(string, seed=seed)
 
-        return s_hash
-
-    def djb2_hash(self, string):
+    def djb2_hash(self, string, seed=0):
         """
         DJB2 32-bit hash function
         """
 
-        s_bytes = str(string).encode()
-        s_hash = 5381
-
-        for b in s_bytes:
-            s_hash *= 0x21
-            s_hash += b
-            s_hash &= 0xFFFFFFFF
-
-        return s_hash
+        return hash_tools.djb2_hash(string, seed=seed)
 
-    def fnv1_hash(self, string):
+    def fnv1_hash(self, string, seed=0):
         """
         FNV-1 64-bit hash function
         """
 
-        s_bytes = str(string).encode()
-        s_hash = 0xCBF29CE484222325
+        return hash_tools.fnv1_hash(string, seed=seed)
 
-        for b in s_bytes:
-            s_hash *= 0x100000001B3
-            s_hash += b
-            s_hash &= 0xFFFFFFFFFFFFFFFF
-
-        return s_hash
-
-    def fnv1a_hash(self, string):
+    def fnv1a_hash(self, string, seed=0):
         """
         FNV-1a 64-bit hash function
         """
 
-        s_bytes = str(string).encode()
-        s_hash = 0xCBF29CE484222325
-
-        for b in s_bytes:
-            s_hash += b
-            s_hash *= 0x100000001B3
-            s_hash &= 0xFFFFFFFFFFFFFFFF
-
-        return s_hash
+        return hash_tools.fnv1a_hash(string, seed=seed)
 
     ############################################################
     #   indexing
     ############################################################
 
-    def hash_index(self, key):
+    def hash_index(self, key, seed=0, key_hash=None):
         """
         Take an arbitrary key and return a valid integer index
         between within the storage `bucket_count` of the hash table.
+        If the key's unseeded `key_hash` is known, it is reseeded
+        rather than hashing the key again.
         """
 
-        index = self.__hash(key) % self.__bucket_count
+        if key_hash is None:
+            index = self.__hash(key, seed) % self.__bucket_count
+        else:
+            index = self.__seed_hash(key_hash, seed) % self.__bucket_count
 
         # print(f"hash_index({repr(key)}) => {repr(index)}")
 
         return index
 
+    def cuckoo_indexes(self, key, key_hash=None):
+        """
+        Return the candidate indexes of `key` under cuckoo storage,
+        one per hash seed (way), all from one hash of the key.
+        """
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        return tuple(self.hash_index(key, seed=way, key_hash=key_hash) for way in range(self.__cuckoo_ways))
+
     @staticmethod
     def find_node_by_key(key, chain):
 
@@ -389,7 +531,7 @@ class HashTable:
 
         def debug_print(*messages):
             self.debug_print(
-                f"resize()",
+                "resize()",
                 *messages,
                 local_debug=local_debug,
             )
@@ -405,19 +547,19 @@ class HashTable:
 
         if self.load_factor >= self.__load_before_resize_up:
 
-            debug_print(f"... resizing up",)
+            debug_print("... resizing up",)
 
             new_bucket_count = self.resize_up()
 
         elif self.load_factor <= self.__load_before_resize_down:
 
-            debug_print(f"... resizing down",)
+            debug_print("... resizing down",)
 
             new_bucket_count = self.resize_down()
 
         else:
 
-            debug_print(f"... not resizing",)
+            debug_print("... not resizing",)
 
             pass
 
@@ -437,7 +579,7 @@ class HashTable:
 
         # yapf: disable
         def debug_print(*messages):
-            self.debug_print(f"resize_up()", *messages, local_debug=local_debug)
+            self.debug_print("resize_up()", *messages, local_debug=local_debug)
             return
 
         debug_print()
@@ -453,13 +595,14 @@ class HashTable:
         if new_bucket_count > old_bucket_count:
 
             # yapf: disable
-            debug_print(f"... resizing",)
+            debug_print("... resizing",)
             # yapf: enable
 
             old_array = self.__array
 
             self.__bucket_count = new_bucket_count
             self.__array = [None] * new_bucket_count
+            self.__shared_array = False
 
             self.rehash_from_array(old_array)
 
@@ -467,7 +610,7 @@ class HashTable:
         else:
 
             # yapf: disable
-            debug_print(f"... not resizing",)
+            debug_print("... not resizing",)
             # yapf: enable
 
             pass
@@ -483,7 +626,7 @@ class HashTable:
 
         # yapf: disable
         def debug_print(*messages):
-            self.debug_print(f"resize_down()", *messages, local_debug=local_debug)
+            self.debug_print("resize_down()", *messages, local_debug=local_debug)
             return
 
         debug_print()
@@ -499,13 +642,14 @@ class HashTable:
         if new_bucket_count < old_bucket_count:
 
             # yapf: disable
-            debug_print(f"... resizing",)
+            debug_print("... resizing",)
             # yapf: enable
 
             old_array = self.__array
 
             self.__bucket_count = new_bucket_count
             self.__array = [None] * new_bucket_count
+            self.__shared_array = False
 
             self.rehash_from_array(old_array)
 
@@ -513,7 +657,7 @@ class HashTable:
         else:
 
             # yapf: disable
-            debug_print(f"... not resizing",)
+            debug_print("... not resizing",)
             # yapf: enable
 
             pass
@@ -525,8 +669,16 @@ class HashTable:
         Rehash the items in `from_array` to the hash table's internal array.
         """
 
+        return self.__rehash_from_array(from_array)
+
+    def rehash_from_chain_array(self, from_array):
+        """
+        Rehash the chains in `from_array` to the hash table's internal array.
+        """
+
         # we need to reset the item count because `push_item` increments it!
         self.__item_count = 0
+        self.__filter_reset()
 
         for chain in from_array:
             if chain is not None:
@@ -535,11 +687,184 @@ class HashTable:
 
         return
 
+    def rehash_from_cuckoo_array(self, from_array):
+        """
+        Rehash the slots in `from_array`, and the stash, to the hash table's internal array.
+        """
+
+        # we need to reset the item count because `push_item` increments it!
+        self.__item_count = 0
+        self.__filter_reset()
+
+        # the stash belongs to the old array, so it is rehashed along with it
+        from_stash = self.__stash
+        self.__stash = []
+
+        for slot in itertools.chain(from_array, from_stash):
+            if slot is not None:
+                (key, value) = slot
+                self.push_item(key, value, should_resize=False)
+
+        return
+
+    ############################################################
+    #   copy-on-write
+    ############################################################
+
+    def fork(self):
+        """
+        Return a new hash table with the same items and settings, in O(1).
+
+        The two tables share their array and chains until one of them writes:
+        then that table copies the array of references (and the stash), and
+        clones just the chains it changes, one bucket at a time. A membership
+        filter is shared too, until a write adds or removes a key.
+        """
+
+        other = copy.copy(self)
+        other.__bind_methods()
+
+        # chains owned by neither new owner are shared, so both sides clone them on write
+        for table in (self, other):
+            table.__shared_array = True
+            table.__shared_filter = table.__filter is not None
+            table.__owner = object()
+
+        return other
+
+    def snapshot(self):
+        """
+        Return a read-only, point-in-time view of the hash table, in O(1).
+        Later writes to the hash table do not show in the snapshot.
+        """
+
+        return HashTableSnapshot(self.fork())
+
+    def __own_array(self):
+        """
+        Copy the array (and stash) before writing, if they're shared with a fork.
+        """
+
+        if self.__shared_array:
+            self.__array = list(self.__array)
+            self.__stash = list(self.__stash)
+            self.__shared_array = False
+
+        return
+
+    def __own_chain(self, index):
+        """
+        Return the chain at `index`, cloned first if it's shared with a fork.
+        """
+
+        chain = self.__array[index]
+
+        if chain is not None and chain.owner is not self.__owner:
+            chain = DoublyLinkedList(
+                value_iter=(item for (item, node) in chain),
+                owner=self.__owner,
+            )
+            self.__array[index] = chain
+
+        return chain
+
+    def __own_filter(self):
+        """
+        Copy the membership filter before writing, if it's shared with a fork.
+        """
+
+        if self.__shared_filter:
+            self.__filter = copy.deepcopy(self.__filter)
+            self.__shared_filter = False
+
+        return
+
+    ############################################################
+    #   membership filter
+    ############################################################
+
+    def __filter_reset(self):
+        """
+        Replace the membership filter (if any) with an empty one
+        sized for the items the array can hold before resizing up.
+        """
+
+        if self.__use_filter:
+            self.__filter = CountingBloomFilter(
+                capacity=self.__bucket_count * self.__load_before_resize_up,
+                error_rate=self.__filter_error_rate,
+                hasher=self.__hasher,
+            )
+            self.__shared_filter = False
+
+        return
+
+    def __filter_add(self, key, key_hash):
+        if self.__filter is not None:
+            self.__own_filter()
+            self.__filter.add(key, key_hash)
+        return
+
+    def __filter_remove(self, key, key_hash):
+        if self.__filter is not None:
+            self.__own_filter()
+            self.__filter.remove(key, key_hash)
+        return
+
+    def __filter_excludes(self, key, key_hash):
+        """
+        Whether the membership filter proves that `key` is not in the hash table.
+        """
+
+        return self.__filter is not None and not self.__filter.might_contain(key, key_hash)
+
     ############################################################
     #   item access
     ############################################################
 
     def push_item(self, key, value, should_resize=True, local_debug=None):
+        """
+        Set `key`'s value to `value` in the hash table.
+        Returns the hash table's new item count.
+        """
+
+        return self.__push_item(key, value, should_resize=should_resize, local_debug=local_debug)
+
+    def find_item(self, key, local_debug=None):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        # with a filter, the key is hashed once, for both the filter and the array,
+        # and a definite miss skips indexing into the array and scanning for the key
+        key_hash = None if self.__filter is None else self.__hash(key)
+
+        if self.__filter_excludes(key, key_hash):
+            self.debug_print(f"find_item({repr(key)})", "... filtered out", local_debug=local_debug)
+            return self.__default_value
+
+        return self.__find_item(key, local_debug=local_debug, key_hash=key_hash)
+
+    def pop_item(self, key, should_resize=True, local_debug=None):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        key_hash = None if self.__filter is None else self.__hash(key)
+
+        if self.__filter_excludes(key, key_hash):
+            self.debug_print(f"pop_item({repr(key)})", "... filtered out", local_debug=local_debug)
+            return (None, self.__item_count)
+
+        return self.__pop_item(key, should_resize=should_resize, local_debug=local_debug, key_hash=key_hash)
+
+    ########################################
+    #   chain storage
+    ########################################
+
+    def push_chain_item(self, key, value, should_resize=True, local_debug=None, key_hash=None):
         """
         Set `key`'s value to `value` in the hash table.
         Hash collisions are handled with linked list chaining.
@@ -554,14 +879,19 @@ class HashTable:
         debug_print()
         # yapf: enable
 
-        index = self.hash_index(key)
-        chain = self.__array[index]
+        self.__own_array()
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        index = self.hash_index(key, key_hash=key_hash)
+        chain = self.__own_chain(index)
 
         # if there's a chain at `index`, then...
         if chain is not None:
 
             # yapf: disable
-            debug_print(f"... there is a chain",)
+            debug_print("... there is a chain",)
             # yapf: enable
 
             # search it for `(key, value)`
@@ -571,7 +901,7 @@ class HashTable:
             if node is not None:
 
                 # yapf: disable
-                debug_print(f"... key found", f"... updating value",)
+                debug_print("... key found", "... updating value",)
                 # yapf: enable
 
                 node.value = (key, value)
@@ -580,21 +910,23 @@ class HashTable:
             else:
 
                 # yapf: disable
-                debug_print(f"... key not found", f"... inserting (key, value)",)
+                debug_print("... key not found", "... inserting (key, value)",)
                 # yapf: enable
 
                 self.__item_count += 1
+                self.__filter_add(key, key_hash)
                 chain.push_to_tail((key, value))
 
         # else, create a new chain
         else:
 
             # yapf: disable
-            debug_print(f"... there is no chain", f"... inserting new chain with (key, value)",)
+            debug_print("... there is no chain", "... inserting new chain with (key, value)",)
             # yapf: enable
 
             self.__item_count += 1
-            self.__array[index] = DoublyLinkedList(value=(key, value))
+            self.__filter_add(key, key_hash)
+            self.__array[index] = DoublyLinkedList(value=(key, value), owner=self.__owner)
 
         # maybe resize
         if should_resize:
@@ -603,7 +935,7 @@ class HashTable:
         # print(f"array[{repr(index)}] := {repr(value)}")
         return self.__item_count
 
-    def find_item(self, key, local_debug=None):
+    def find_chain_item(self, key, local_debug=None, key_hash=None):
         """
         Get `key`'s value in the hash table.
         Returns the key's value or `default_value` if the key is not found.
@@ -617,7 +949,10 @@ class HashTable:
         debug_print()
         # yapf: enable
 
-        index = self.hash_index(key)
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        index = self.hash_index(key, key_hash=key_hash)
         chain = self.__array[index]
         value = self.__default_value
 
@@ -625,7 +960,7 @@ class HashTable:
         if chain is not None:
 
             # yapf: disable
-            debug_print(f"... there is a chain",)
+            debug_print("... there is a chain",)
             # yapf: enable
 
             # search it for `(key, value)`
@@ -635,7 +970,7 @@ class HashTable:
             if node is not None:
 
                 # yapf: disable
-                debug_print(f"... key found", f"... getting value",)
+                debug_print("... key found", "... getting value",)
                 # yapf: enable
 
                 (__, value) = node.value
@@ -644,7 +979,7 @@ class HashTable:
             else:
 
                 # yapf: disable
-                debug_print(f"... key not found", f"... passing",)
+                debug_print("... key not found", "... passing",)
                 # yapf: enable
 
                 pass
@@ -653,7 +988,7 @@ class HashTable:
         else:
 
             # yapf: disable
-            debug_print(f"... there is no chain", f"... passing",)
+            debug_print("... there is no chain", "... passing",)
             # yapf: enable
 
             pass
@@ -663,7 +998,7 @@ class HashTable:
         # print(f"array[{repr(index)}] => {repr(value)}")
         return value
 
-    def pop_item(self, key, should_resize=True, local_debug=None):
+    def pop_chain_item(self, key, should_resize=True, local_debug=None, key_hash=None):
         """
         Remove `key`'s value in the hash table.
         Returns the removed value and the hash table's new item count.
@@ -677,7 +1012,12 @@ class HashTable:
         debug_print()
         # yapf: enable
 
-        index = self.hash_index(key)
+        self.__own_array()
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        index = self.hash_index(key, key_hash=key_hash)
         chain = self.__array[index]
         value = None
 
@@ -685,7 +1025,7 @@ class HashTable:
         if chain is not None:
 
             # yapf: disable
-            debug_print(f"... there is a chain",)
+            debug_print("... there is a chain",)
             # yapf: enable
 
             # search it for `(key, value)`
@@ -695,17 +1035,23 @@ class HashTable:
             if node is not None:
 
                 # yapf: disable
-                debug_print(f"... key found", f"... deleting (key, value)",)
+                debug_print("... key found", "... deleting (key, value)",)
                 # yapf: enable
 
+                # a chain shared with a fork is cloned first, so search the clone
+                if chain.owner is not self.__owner:
+                    chain = self.__own_chain(index)
+                    node = self.find_node_by_key(key, chain)
+
                 self.__item_count -= 1
-                (__, value) = chain.pop_node(node)
+                self.__filter_remove(key, key_hash)
+                ((__, value), __) = chain.pop_node(node)
 
                 # if the chain is now empty, remove it
                 if len(chain) == 0:
 
                     # yapf: disable
-                    debug_print(f"... chain is empty", f"... deleting",)
+                    debug_print("... chain is empty", "... deleting",)
                     # yapf: enable
 
                     self.__array[index] = None
@@ -714,7 +1060,7 @@ class HashTable:
             else:
 
                 # yapf: disable
-                debug_print(f"... key not found", f"... passing",)
+                debug_print("... key not found", "... passing",)
                 # yapf: enable
 
                 pass
@@ -723,7 +1069,7 @@ class HashTable:
         else:
 
             # yapf: disable
-            debug_print(f"... there is no chain", f"... passing",)
+            debug_print("... there is no chain", "... passing",)
             # yapf: enable
 
             pass
@@ -735,6 +1081,323 @@ class HashTable:
         # print(f"array[{repr(index)}] := {repr(value)}")
         return (value, self.__item_count)
 
+    ########################################
+    #   cuckoo storage
+    ########################################
+
+    def push_cuckoo_item(self, key, value, should_resize=True, local_debug=None, key_hash=None):
+        """
+        Set `key`'s value to `value` in the hash table.
+        Hash collisions are handled by displacing items to their other ways,
+        falling back to the stash and then to `resize_up`.
+        Returns the hash table's new item count.
+        """
+
+        # yapf: disable
+        def debug_print(*messages):
+            self.debug_print(f"push_item({repr(key)}, {repr(value)})", *messages, local_debug=local_debug)
+            return
+
+        debug_print()
+        # yapf: enable
+
+        self.__own_array()
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        indexes = self.cuckoo_indexes(key, key_hash)
+        (index, stash_index) = self.find_cuckoo_slot(key, indexes)
+
+        # if `key` is in a slot, update `value`
+        if index is not None:
+
+            # yapf: disable
+            debug_print("... key found", "... updating value",)
+            # yapf: enable
+
+            self.__array[index] = (key, value)
+
+        # if `key` is in the stash, update `value`
+        elif stash_index is not None:
+
+            # yapf: disable
+            debug_print("... key found in stash", "... updating value",)
+            # yapf: enable
+
+            self.__stash[stash_index] = (key, value)
+
+        # else, insert it
+        else:
+
+            # yapf: disable
+            debug_print("... key not found", "... inserting (key, value)",)
+            # yapf: enable
+
+            self.__item_count += 1
+            self.__filter_add(key, key_hash)
+            homeless = self.displace_cuckoo_item((key, value), indexes)
+
+            if homeless is not None:
+
+                # yapf: disable
+                debug_print("... displacement failed", f"... stashing {repr(homeless)}",)
+                # yapf: enable
+
+                self.__stash.append(homeless)
+
+        # maybe resize (only up, since a stash-forced up-size can leave the load low)
+        if should_resize:
+            if self.load_factor >= self.__load_before_resize_up:
+                self.resize_up()
+            try:
+                self.settle_cuckoo_stash(should_resize=True)
+            except Exception:
+                # take a new key back out, so the table holds what it held before
+                if index is None and stash_index is None:
+                    self.pop_cuckoo_item(key, should_resize=False, key_hash=key_hash)
+                raise
+
+        return self.__item_count
+
+    def find_cuckoo_item(self, key, local_debug=None, key_hash=None):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        # yapf: disable
+        def debug_print(*messages):
+            self.debug_print(f"find_item({repr(key)})", *messages, local_debug=local_debug)
+            return
+
+        debug_print()
+        # yapf: enable
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        (index, stash_index) = self.find_cuckoo_slot(key, self.cuckoo_indexes(key, key_hash))
+        value = self.__default_value
+
+        if index is not None:
+
+            # yapf: disable
+            debug_print("... key found", "... getting value",)
+            # yapf: enable
+
+            (__, value) = self.__array[index]
+
+        elif stash_index is not None:
+
+            # yapf: disable
+            debug_print("... key found in stash", "... getting value",)
+            # yapf: enable
+
+            (__, value) = self.__stash[stash_index]
+
+        else:
+
+            # yapf: disable
+            debug_print("... key not found", "... passing",)
+            # yapf: enable
+
+            pass
+
+        return value
+
+    def pop_cuckoo_item(self, key, should_resize=True, local_debug=None, key_hash=None):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        # yapf: disable
+        def debug_print(*messages):
+            self.debug_print(f"pop_item({repr(key)})", *messages, local_debug=local_debug)
+            return
+
+        debug_print()
+        # yapf: enable
+
+        self.__own_array()
+
+        if key_hash is None:
+            key_hash = self.__hash(key)
+
+        (index, stash_index) = self.find_cuckoo_slot(key, self.cuckoo_indexes(key, key_hash))
+        value = None
+
+        if index is not None:
+
+            # yapf: disable
+            debug_print("... key found", "... deleting (key, value)",)
+            # yapf: enable
+
+            self.__item_count -= 1
+            self.__filter_remove(key, key_hash)
+            (__, value) = self.__array[index]
+            self.__array[index] = None
+
+        elif stash_index is not None:
+
+            # yapf: disable
+            debug_print("... key found in stash", "... deleting (key, value)",)
+            # yapf: enable
+
+            self.__item_count -= 1
+            self.__filter_remove(key, key_hash)
+            (__, value) = self.__stash.pop(stash_index)
+
+        else:
+
+            # yapf: disable
+            debug_print("... key not found", "... passing",)
+            # yapf: enable
+
+            pass
+
+        # maybe resize
+        if should_resize:
+            self.resize()
+            self.settle_cuckoo_stash(should_resize=False)
+
+        return (value, self.__item_count)
+
+    def settle_cuckoo_stash(self, should_resize=True):
+        """
+        Move stashed items back into their ways where there is room.
+        If the stash is still overfull, the ways are too crowded, so up-size.
+        Returns the stash's new length.
+        """
+
+        from_stash = self.__stash
+        self.__stash = []
+
+        for item in from_stash:
+            homeless = self.displace_cuckoo_item(item, self.cuckoo_indexes(item[0]))
+            if homeless is not None:
+                self.__stash.append(homeless)
+
+        # at `max_bucket_count`, an overfull stash can only keep growing,
+        # and lookups would scan it, so give up instead
+        if should_resize:
+            while len(self.__stash) > self.__cuckoo_stash_size:
+                old_bucket_count = self.__bucket_count
+                if self.resize_up() == old_bucket_count:
+                    raise Exception("CuckooStashOverflowError")
+
+        return len(self.__stash)
+
+    def find_cuckoo_slot(self, key, indexes):
+        """
+        Find `key` among its candidate `indexes`, then in the stash.
+        Returns `(index, stash_index)`, either of which may be `None`.
+        """
+
+        for index in indexes:
+            slot = self.__array[index]
+            if slot is not None and slot[0] == key:
+                return (index, None)
+
+        for (stash_index, (k, v)) in enumerate(self.__stash):
+            if k == key:
+                return (None, stash_index)
+
+        return (None, None)
+
+    def displace_cuckoo_item(self, item, indexes):
+        """
+        Place `item` in a free slot among `indexes`, kicking out occupants
+        to their other ways for at most `cuckoo_max_kicks` rounds.
+        Returns the item left without a slot, or `None` if all were placed.
+        """
+
+        for index in indexes:
+            if self.__array[index] is None:
+                self.__array[index] = item
+                return None
+
+        index = indexes[0]
+
+        for kick in range(self.__cuckoo_max_kicks):
+
+            # swap `item` into `index`, and pick up whatever was there
+            (self.__array[index], item) = (item, self.__array[index])
+
+            alternatives = [i for i in self.cuckoo_indexes(item[0]) if i != index]
+
+            for alternative in alternatives:
+                if self.__array[alternative] is None:
+                    self.__array[alternative] = item
+                    return None
+
+            # every way of `item` is the same bucket, so it can't move
+            if len(alternatives) == 0:
+                break
+
+            index = alternatives[kick % len(alternatives)]
+
+        return item
+
+    ############################################################
+    #   iteration
+    ############################################################
+
+    def items(self):
+        """
+        Yield every `(key, value)` pair in the hash table, in bucket order.
+        """
+
+        if self.__storage == "cuckoo":
+            for slot in itertools.chain(self.__array, self.__stash):
+                if slot is not None:
+                    yield slot
+
+        else:
+            for chain in self.__array:
+                if chain is not None:
+                    for (item, node) in chain:
+                        yield item
+
+        return
+
+    def keys(self):
+        """
+        Yield every key in the hash table, in bucket order.
+        """
+
+        for (key, value) in self.items():
+            yield key
+
+        return
+
+    def values(self):
+        """
+        Yield every value in the hash table, in bucket order.
+        """
+
+        for (key, value) in self.items():
+            yield value
+
+        return
+
+    def __iter__(self):
+        return self.keys()
+
+    def freeze(self):
+        """
+        Build an immutable `FrozenHashTable` holding the hash table's current items.
+        Raises `PerfectHashBuildError` if two keys have the same hash
+        (see `FrozenHashTable.build`).
+        """
+
+        return FrozenHashTable.build(
+            self.items(),
+            default_value=self.__default_value,
+            hasher=self.__hasher,
+        )
+
     ########################################
     #   other names
     ########################################
@@ -785,6 +1448,69 @@ class HashTable:
         return self.pop_item(key, **kwargs)
 
 
+############################################################
+#   hash table snapshot
+############################################################
+
+
+class HashTableSnapshot:
+    """
+    A read-only view of a hash table, as it was when `HashTable.snapshot` was called.
+    """
+
+    def __init__(self, table):
+
+        self.__table = table
+
+        return
+
+    def __len__(self):
+        return len(self.__table)
+
+    def __iter__(self):
+        return iter(self.__table)
+
+    @property
+    def item_count(self):
+        return self.__table.item_count
+
+    @property
+    def bucket_count(self):
+        return self.__table.bucket_count
+
+    def find_item(self, key, local_debug=None):
+        return self.__table.find_item(key, local_debug=local_debug)
+
+    def items(self):
+        return self.__table.items()
+
+    def keys(self):
+        return self.__table.keys()
+
+    def values(self):
+        return self.__table.values()
+
+    def fork(self):
+        """
+        Return a writable hash table with the snapshot's items, in O(1).
+        """
+
+        return self.__table.fork()
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
+
+
 ############################################################
 
 if __name__ == "__main__":
@@ -0,0 +1,522 @@
+############################################################
+
+from array import array
+
+from tools.math_tools import int_max
+from tools.data_structures.hash_table import HashTable
+from tools.data_structures.ordered_hash_table import power_of_two_at_least
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+############################################################
+#   int hash table
+############################################################
+
+# Knuth's multiplicative ("Fibonacci") hash: 2**64 over the golden ratio
+MULTIPLIER = 0x9E3779B97F4A7C15
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+class IntHashTable:
+    """
+    A hash table from 64-bit integer keys to values of one `array` typecode
+    (`value_typecode`, "q" for int64 by default, or "d" for float64), or to
+    any Python objects if `value_typecode` is `None`.
+
+    Keys, values and a byte of occupancy per bucket are kept in flat typed
+    arrays, so an item costs a few bytes per bucket rather than a few Python
+    objects. Keys are hashed by multiplying by a 64-bit odd constant and
+    keeping the top bits, with no `str()`, and collide into the next bucket
+    along (linear probing). Removing an item shifts the items after it back,
+    so there are no deleted markers to probe past. At least one bucket is
+    always left empty, even without resizing, and no probe goes further than
+    `bucket_count` buckets.
+
+    `bucket_count` is always a power of two. With NumPy installed,
+    `get_many` and `put_many` work on whole arrays of keys at once.
+    """
+
+    DEFAULT_BUCKET_COUNT = HashTable.DEFAULT_BUCKET_COUNT
+    DEFAULT_MIN_BUCKET_COUNT = HashTable.DEFAULT_MIN_BUCKET_COUNT
+    DEFAULT_LOAD_BEFORE_RESIZE_UP = 2 / 3
+    DEFAULT_LOAD_BEFORE_RESIZE_DOWN = HashTable.DEFAULT_LOAD_BEFORE_RESIZE_DOWN
+    DEFAULT_DEFAULT_VALUE = HashTable.DEFAULT_DEFAULT_VALUE
+    DEFAULT_VALUE_TYPECODE = "q"
+
+    def __init__(
+        self,
+        bucket_count=DEFAULT_BUCKET_COUNT,
+        min_bucket_count=DEFAULT_MIN_BUCKET_COUNT,
+        load_before_resize_up=DEFAULT_LOAD_BEFORE_RESIZE_UP,
+        load_before_resize_down=DEFAULT_LOAD_BEFORE_RESIZE_DOWN,
+        default_value=DEFAULT_DEFAULT_VALUE,
+        value_typecode=DEFAULT_VALUE_TYPECODE,
+    ):
+
+        self.__min_bucket_count = power_of_two_at_least(min(bucket_count, min_bucket_count))
+        self.__load_before_resize_up = load_before_resize_up
+        self.__load_before_resize_down = load_before_resize_down
+        self.__default_value = default_value
+        self.__value_typecode = value_typecode
+
+        self.__item_count = 0
+        (self.__keys, self.__values, self.__flags) = self.new_arrays(power_of_two_at_least(bucket_count))
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__item_count
+
+    def __contains__(self, key):
+        return self.find_slot(key) is not None
+
+    #-----------------------------------------------------------
+
+    @property
+    def item_count(self):
+        return self.__item_count
+
+    @property
+    def bucket_count(self):
+        return self.__bucket_count
+
+    @property
+    def default_value(self):
+        return self.__default_value
+
+    @property
+    def value_typecode(self):
+        return self.__value_typecode
+
+    @property
+    def load_factor(self):
+        return self.__item_count / self.__bucket_count
+
+    ############################################################
+    #   hashing and resizing
+    ############################################################
+
+    def new_arrays(self, bucket_count):
+        """
+        Set the bucket count to `bucket_count`, and returns new, empty
+        `(keys, values, flags)` arrays of that size.
+        """
+
+        self.__bucket_count = bucket_count
+        self.__shift = 64 - (bucket_count.bit_length() - 1)
+
+        keys = array("q", [0]) * bucket_count
+        flags = array("b", [0]) * bucket_count
+
+        if self.__value_typecode is None:
+            values = [None] * bucket_count
+        else:
+            values = array(self.__value_typecode, [0]) * bucket_count
+
+        return (keys, values, flags)
+
+    def hash_index(self, key):
+        return ((key * MULTIPLIER) & MASK_64) >> self.__shift if self.__shift < 64 else 0
+
+    def hash_indexes(self, keys):
+        """
+        `hash_index` of each key in the NumPy int64 array `keys`.
+        """
+
+        if self.__shift >= 64:
+            return numpy.zeros(len(keys), dtype=numpy.int64)
+
+        with numpy.errstate(over="ignore"):
+            hashes = keys.view(numpy.uint64) * numpy.uint64(MULTIPLIER)
+
+        return (hashes >> numpy.uint64(self.__shift)).astype(numpy.int64)
+
+    def find_slot(self, key):
+        """
+        Returns the bucket holding `key`, or `None` if it's not found.
+        """
+
+        mask = self.__bucket_count - 1
+        slot = self.hash_index(key)
+
+        for __ in range(self.__bucket_count):
+            if not self.__flags[slot]:
+                break
+            if self.__keys[slot] == key:
+                return slot
+            slot = (slot + 1) & mask
+
+        return None
+
+    def resize(self):
+        """
+        Rehash if the table is too full or too empty.
+        Returns the final `bucket_count`.
+        """
+
+        bucket_count = self.__bucket_count
+
+        if self.__item_count >= bucket_count * self.__load_before_resize_up:
+            self.reserve(self.__item_count)
+
+        elif self.load_factor <= self.__load_before_resize_down and bucket_count > self.__min_bucket_count:
+            self.rehash(int_max(self.__min_bucket_count, bucket_count // 2))
+
+        return self.__bucket_count
+
+    def reserve(self, item_count):
+        """
+        Grow the table once, if need be, to hold `item_count` items
+        without further resizing on the way.
+        Returns the final `bucket_count`.
+        """
+
+        bucket_count = self.__bucket_count
+        while item_count >= min(bucket_count * self.__load_before_resize_up, bucket_count):
+            bucket_count *= 2
+
+        if bucket_count > self.__bucket_count:
+            self.rehash(bucket_count)
+
+        return self.__bucket_count
+
+    def rehash(self, bucket_count):
+        """
+        Move every item into new arrays of `bucket_count` buckets.
+        """
+
+        old_keys = self.__keys
+        old_values = self.__values
+        old_flags = self.__flags
+
+        (self.__keys, self.__values, self.__flags) = self.new_arrays(bucket_count)
+
+        if numpy is not None:
+            occupied = numpy.flatnonzero(numpy.frombuffer(old_flags, dtype=numpy.int8))
+            keys = numpy.frombuffer(old_keys, dtype=numpy.int64)[occupied]
+            if self.__value_typecode is None:
+                values = [old_values[slot] for slot in occupied.tolist()]
+            else:
+                values = numpy.frombuffer(old_values, dtype=self.__value_typecode)[occupied]
+            self.__insert_many(keys, values)
+            return
+
+        mask = bucket_count - 1
+        for (slot, flag) in enumerate(old_flags):
+            if flag:
+                key = old_keys[slot]
+                new_slot = self.hash_index(key)
+                while self.__flags[new_slot]:
+                    new_slot = (new_slot + 1) & mask
+                self.__keys[new_slot] = key
+                self.__values[new_slot] = old_values[slot]
+                self.__flags[new_slot] = 1
+
+        return
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    def push_item(self, key, value, should_resize=True):
+        """
+        Set `key`'s value to `value` in the hash table.
+        Returns the hash table's new item count.
+        """
+
+        mask = self.__bucket_count - 1
+        slot = self.hash_index(key)
+
+        for __ in range(self.__bucket_count):
+            if not self.__flags[slot]:
+                break
+            if self.__keys[slot] == key:
+                self.__values[slot] = value
+                return self.__item_count
+            slot = (slot + 1) & mask
+        else:
+            # every bucket is full, so the table has to grow anyway
+            self.rehash(self.__bucket_count * 2)
+            return self.push_item(key, value, should_resize=should_resize)
+
+        self.__keys[slot] = key
+        self.__values[slot] = value
+        self.__flags[slot] = 1
+        self.__item_count += 1
+
+        if should_resize:
+            self.resize()
+
+        # even without resizing, never fill the last empty bucket,
+        # which is what ends the probes of missing keys and of `pop_item`
+        elif self.__item_count >= self.__bucket_count:
+            self.rehash(self.__bucket_count * 2)
+
+        return self.__item_count
+
+    def find_item(self, key):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        slot = self.find_slot(key)
+
+        if slot is None:
+            return self.__default_value
+        else:
+            return self.__values[slot]
+
+    def pop_item(self, key, should_resize=True):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        slot = self.find_slot(key)
+
+        if slot is None:
+            return (None, self.__item_count)
+
+        value = self.__values[slot]
+
+        # shift back each following item that may sit at the emptied slot,
+        # i.e. that is at least as far from its own slot as from the emptied one
+        mask = self.__bucket_count - 1
+        hole = slot
+        slot = (slot + 1) & mask
+
+        while self.__flags[slot]:
+            home = self.hash_index(self.__keys[slot])
+            if ((slot - home) & mask) >= ((slot - hole) & mask):
+                self.__keys[hole] = self.__keys[slot]
+                self.__values[hole] = self.__values[slot]
+                hole = slot
+            slot = (slot + 1) & mask
+
+        self.__flags[hole] = 0
+        if self.__value_typecode is None:
+            self.__values[hole] = None
+        self.__item_count -= 1
+
+        if should_resize:
+            self.resize()
+
+        return (value, self.__item_count)
+
+    def items(self):
+        """
+        Yield every `(key, value)` pair in the hash table.
+        """
+
+        for (slot, flag) in enumerate(self.__flags):
+            if flag:
+                yield (self.__keys[slot], self.__values[slot])
+
+        return
+
+    def keys(self):
+        for (key, __) in self.items():
+            yield key
+        return
+
+    def values(self):
+        for (__, value) in self.items():
+            yield value
+        return
+
+    def __iter__(self):
+        return self.keys()
+
+    ############################################################
+    #   many items at once
+    ############################################################
+
+    def get_many(self, keys):
+        """
+        Look up every key in `keys`.
+        Returns `(values, found)`: each key's value, and whether it was found.
+        With NumPy these are arrays, and a missing key's value is 0
+        (or `default_value`, for object values); without, they are lists,
+        and a missing key's value is `default_value`.
+        """
+
+        if numpy is None:
+            slots = [self.find_slot(key) for key in keys]
+            return (
+                [self.__default_value if slot is None else self.__values[slot] for slot in slots],
+                [slot is not None for slot in slots],
+            )
+
+        slots = self.find_slots(numpy.ascontiguousarray(keys, dtype=numpy.int64))
+        found = slots >= 0
+
+        if self.__value_typecode is None:
+            values = numpy.full(len(slots), self.__default_value, dtype=object)
+            values[found] = [self.__values[slot] for slot in slots[found].tolist()]
+        else:
+            table_values = numpy.frombuffer(self.__values, dtype=self.__value_typecode)
+            values = numpy.zeros(len(slots), dtype=table_values.dtype)
+            values[found] = table_values[slots[found]]
+
+        return (values, found)
+
+    def put_many(self, keys, values):
+        """
+        Set the value of each key in `keys` to the matching one in `values`;
+        where a key repeats, its last value wins.
+        Returns the hash table's new item count.
+        """
+
+        if numpy is None:
+            if hasattr(keys, "__len__"):
+                self.reserve(self.__item_count + len(keys))
+            for (key, value) in zip(keys, values):
+                self.push_item(key, value)
+            return self.__item_count
+
+        keys = numpy.ascontiguousarray(keys, dtype=numpy.int64)
+        if self.__value_typecode is None:
+            values = list(values)
+        else:
+            values = numpy.asarray(values, dtype=self.__value_typecode)
+
+        # keep the last of each repeated key
+        (__, last) = numpy.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+
+        keys = keys[last]
+        if self.__value_typecode is None:
+            values = [values[i] for i in last.tolist()]
+        else:
+            values = values[last]
+
+        slots = self.find_slots(keys)
+        found = slots >= 0
+
+        if self.__value_typecode is None:
+            for (slot, i) in zip(slots[found].tolist(), numpy.flatnonzero(found).tolist()):
+                self.__values[slot] = values[i]
+            values = [values[i] for i in numpy.flatnonzero(~found).tolist()]
+        else:
+            numpy.frombuffer(self.__values, dtype=self.__value_typecode)[slots[found]] = values[found]
+            values = values[~found]
+
+        keys = keys[~found]
+        self.reserve(self.__item_count + len(keys))
+        self.__insert_many(keys, values)
+        self.__item_count += len(keys)
+
+        return self.__item_count
+
+    def find_slots(self, keys):
+        """
+        `find_slot` of each key in the NumPy int64 array `keys`,
+        all probed together; returns an array, with -1 for a missing key.
+        """
+
+        mask = self.__bucket_count - 1
+        table_keys = numpy.frombuffer(self.__keys, dtype=numpy.int64)
+        flags = numpy.frombuffer(self.__flags, dtype=numpy.int8)
+
+        result = numpy.full(len(keys), -1, dtype=numpy.int64)
+        pending = numpy.arange(len(keys))
+        slots = self.hash_indexes(keys)
+
+        for __ in range(self.__bucket_count):
+            if len(pending) == 0:
+                break
+
+            occupied = flags[slots] != 0
+            hit = occupied & (table_keys[slots] == keys[pending])
+            result[pending[hit]] = slots[hit]
+
+            # keep probing the keys that met another key
+            going = occupied & ~hit
+            pending = pending[going]
+            slots = (slots[going] + 1) & mask
+
+        return result
+
+    def __insert_many(self, keys, values):
+        """
+        Put the NumPy int64 array of `keys`, known to be distinct and not in
+        the table, with their `values`, all probed together, without counting
+        them. The arrays must already have room.
+
+        Each round, every key still pending looks at its next slot; of the keys
+        that find the same empty slot, the first takes it, and the rest,
+        with the keys that found a full slot, move on to the next.
+        """
+
+        mask = self.__bucket_count - 1
+        table_keys = numpy.frombuffer(self.__keys, dtype=numpy.int64)
+        flags = numpy.frombuffer(self.__flags, dtype=numpy.int8)
+        if self.__value_typecode is not None:
+            table_values = numpy.frombuffer(self.__values, dtype=self.__value_typecode)
+
+        pending = numpy.arange(len(keys))
+        slots = self.hash_indexes(keys)
+
+        while len(pending) > 0:
+            empty = numpy.flatnonzero(flags[slots] == 0)
+            (taken_slots, first) = numpy.unique(slots[empty], return_index=True)
+            winners = empty[first]
+            placed = pending[winners]
+
+            table_keys[taken_slots] = keys[placed]
+            flags[taken_slots] = 1
+            if self.__value_typecode is None:
+                for (slot, i) in zip(taken_slots.tolist(), placed.tolist()):
+                    self.__values[slot] = values[i]
+            else:
+                table_values[taken_slots] = values[placed]
+
+            going = numpy.ones(len(pending), dtype=bool)
+            going[winners] = False
+            pending = pending[going]
+            slots = (slots[going] + 1) & mask
+
+        return
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __setitem__(self, key, value, **kwargs):
+        self.push_item(key, value, **kwargs)
+        return
+
+    def set(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def put(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def push(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
+
+    def __delitem__(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def delete(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def pop(self, key, **kwargs):
+        return self.pop_item(key, **kwargs)
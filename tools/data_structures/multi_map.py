@@ -0,0 +1,358 @@
+############################################################
+
+from array import array
+
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   multi map
+############################################################
+
+
+class MultiMap:
+    """
+    A map from each key to any number of values, in the order they were appended.
+
+    Rather than a Python list per key, every key's values live in one shared
+    arena: a list, or with a `typecode`, a typed `array`. Each key owns a chain
+    of segments of the arena, the first `DEFAULT_FIRST_SEGMENT_SIZE` slots
+    long and each one after twice the last (up to `DEFAULT_MAX_SEGMENT_SIZE`),
+    so a key's values are mostly contiguous, and appending is amortized O(1).
+
+    Keys are interned to integer ids in a `HashTable`, and the per-key and
+    per-segment bookkeeping is kept in parallel `array("q")`s, so a key costs
+    a handful of machine integers, not a handful of Python objects.
+
+    Removing values leaves holes in the arena, which are reused for segments
+    of the same size, or squeezed out by `compact`.
+    """
+
+    DEFAULT_FIRST_SEGMENT_SIZE = 2
+    DEFAULT_MAX_SEGMENT_SIZE = 0o100
+
+    def __init__(self, typecode=None):
+
+        self.__typecode = typecode
+        self.__arena = [] if typecode is None else array(typecode)
+
+        # key => key id
+        self.__key_ids = HashTable(default_value=None)
+
+        # key id => key, or `None` once the key is removed
+        self.__keys = []
+        self.__heads = array("q")
+        self.__tails = array("q")
+        self.__tail_used = array("q")
+        self.__counts = array("q")
+
+        # segment id => ...
+        self.__segment_starts = array("q")
+        self.__segment_sizes = array("q")
+        self.__segment_nexts = array("q")
+
+        # segment size => ids of the segments free to reuse
+        self.__free_segments = HashTable(default_value=None)
+
+        self.__key_count = 0
+        self.__value_count = 0
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__key_count
+
+    def __contains__(self, key):
+        return self.__key_ids.find_item(key) is not None
+
+    def __iter__(self):
+        return self.keys()
+
+    @property
+    def value_count(self):
+        return self.__value_count
+
+    @property
+    def arena_size(self):
+        """
+        The number of slots in the arena, used or not.
+        """
+
+        return len(self.__arena)
+
+    ############################################################
+    #   segments
+    ############################################################
+
+    def new_segment(self, size):
+        """
+        Returns the id of a segment of `size` slots,
+        reusing a free one if there is one.
+        """
+
+        free_segments = self.__free_segments.find_item(size)
+        if free_segments:
+            segment_id = free_segments.pop()
+            self.__segment_nexts[segment_id] = -1
+            return segment_id
+
+        segment_id = len(self.__segment_starts)
+        self.__segment_starts.append(len(self.__arena))
+        self.__segment_sizes.append(size)
+        self.__segment_nexts.append(-1)
+
+        if self.__typecode is None:
+            self.__arena.extend([None] * size)
+        else:
+            self.__arena.extend(array(self.__typecode, [0]) * size)
+
+        return segment_id
+
+    def free_segment(self, segment_id):
+
+        size = self.__segment_sizes[segment_id]
+        free_segments = self.__free_segments.find_item(size)
+
+        if free_segments is None:
+            self.__free_segments.push_item(size, [segment_id])
+        else:
+            free_segments.append(segment_id)
+
+        return
+
+    def positions(self, key_id):
+        """
+        Yield the arena position of each of the values of `key_id`, in order.
+        """
+
+        remaining = self.__counts[key_id]
+        segment_id = self.__heads[key_id]
+
+        while remaining > 0:
+            start = self.__segment_starts[segment_id]
+            length = min(remaining, self.__segment_sizes[segment_id])
+            yield from range(start, start + length)
+            remaining -= length
+            segment_id = self.__segment_nexts[segment_id]
+
+        return
+
+    ############################################################
+    #   values
+    ############################################################
+
+    def append(self, key, value):
+        """
+        Append `value` to `key`'s values.
+        Returns the number of values `key` now has.
+        """
+
+        key_id = self.__key_ids.find_item(key)
+
+        if key_id is None:
+            key_id = len(self.__keys)
+            self.__key_ids.push_item(key, key_id)
+            self.__keys.append(key)
+            segment_id = self.new_segment(self.DEFAULT_FIRST_SEGMENT_SIZE)
+            self.__heads.append(segment_id)
+            self.__tails.append(segment_id)
+            self.__tail_used.append(0)
+            self.__counts.append(0)
+            self.__key_count += 1
+
+        tail = self.__tails[key_id]
+        used = self.__tail_used[key_id]
+
+        if used == self.__segment_sizes[tail]:
+            new_tail = self.new_segment(min(2 * used, self.DEFAULT_MAX_SEGMENT_SIZE))
+            self.__segment_nexts[tail] = new_tail
+            self.__tails[key_id] = new_tail
+            tail = new_tail
+            used = 0
+
+        self.__arena[self.__segment_starts[tail] + used] = value
+        self.__tail_used[key_id] = used + 1
+        self.__counts[key_id] += 1
+        self.__value_count += 1
+
+        return self.__counts[key_id]
+
+    def extend(self, key, values):
+        """
+        Append every value in `values` to `key`'s values.
+        Returns the number of values `key` now has.
+        """
+
+        count = self.count(key)
+        for value in values:
+            count = self.append(key, value)
+
+        return count
+
+    def values(self, key):
+        """
+        Yield `key`'s values, in the order they were appended.
+        """
+
+        key_id = self.__key_ids.find_item(key)
+
+        if key_id is not None:
+            arena = self.__arena
+            for position in self.positions(key_id):
+                yield arena[position]
+
+        return
+
+    def count(self, key):
+        """
+        Returns the number of values `key` has.
+        """
+
+        key_id = self.__key_ids.find_item(key)
+
+        if key_id is None:
+            return 0
+        else:
+            return self.__counts[key_id]
+
+    def remove(self, key, value):
+        """
+        Remove the first of `key`'s values equal to `value`;
+        the values after it move up, keeping their order.
+        Returns `True` if a value was removed.
+        """
+
+        key_id = self.__key_ids.find_item(key)
+
+        if key_id is None:
+            return False
+
+        arena = self.__arena
+        positions = list(self.positions(key_id))
+
+        for (i, position) in enumerate(positions):
+            if arena[position] == value:
+                break
+        else:
+            return False
+
+        for (position, next_position) in zip(positions[i:], positions[i + 1:]):
+            arena[position] = arena[next_position]
+
+        count = self.__counts[key_id] - 1
+        self.__counts[key_id] = count
+        self.__value_count -= 1
+
+        if count == 0:
+            self.pop_key(key)
+            return True
+
+        self.__tail_used[key_id] -= 1
+
+        # drop the tail segment if it's now empty
+        tail = self.__tails[key_id]
+        if self.__tail_used[key_id] == 0 and tail != self.__heads[key_id]:
+            segment_id = self.__heads[key_id]
+            while self.__segment_nexts[segment_id] != tail:
+                segment_id = self.__segment_nexts[segment_id]
+            self.__segment_nexts[segment_id] = -1
+            self.__tails[key_id] = segment_id
+            self.__tail_used[key_id] = self.__segment_sizes[segment_id]
+            self.free_segment(tail)
+
+        return True
+
+    def pop_key(self, key):
+        """
+        Remove `key` and all of its values.
+        Returns the removed values, as a list.
+        """
+
+        key_id = self.__key_ids.find_item(key)
+
+        if key_id is None:
+            return []
+
+        values = [self.__arena[position] for position in self.positions(key_id)]
+
+        segment_id = self.__heads[key_id]
+        while segment_id != -1:
+            next_segment_id = self.__segment_nexts[segment_id]
+            self.free_segment(segment_id)
+            segment_id = next_segment_id
+
+        self.__key_ids.pop_item(key)
+        self.__keys[key_id] = None
+        self.__heads[key_id] = -1
+        self.__tails[key_id] = -1
+        self.__tail_used[key_id] = 0
+        self.__value_count -= len(values)
+        self.__counts[key_id] = 0
+        self.__key_count -= 1
+
+        return values
+
+    def keys(self):
+        """
+        Yield every key, in the order they were first appended to.
+        """
+
+        for (key_id, key) in enumerate(self.__keys):
+            if self.__heads[key_id] != -1:
+                yield key
+
+        return
+
+    def items(self):
+        """
+        Yield every `(key, value)` pair, key by key.
+        """
+
+        arena = self.__arena
+
+        for (key_id, key) in enumerate(self.__keys):
+            if self.__heads[key_id] != -1:
+                for position in self.positions(key_id):
+                    yield (key, arena[position])
+
+        return
+
+    ############################################################
+    #   compaction
+    ############################################################
+
+    def compact(self):
+        """
+        Rebuild the arena with every key's values in one segment, back to back,
+        dropping the holes left by removals and the ids of removed keys.
+        Returns the new `arena_size`.
+        """
+
+        items = [(key, list(self.values(key))) for key in self.keys()]
+
+        self.__arena = [] if self.__typecode is None else array(self.__typecode)
+        self.__key_ids = HashTable(default_value=None)
+        self.__keys = []
+        self.__heads = array("q")
+        self.__tails = array("q")
+        self.__tail_used = array("q")
+        self.__counts = array("q")
+        self.__segment_starts = array("q")
+        self.__segment_sizes = array("q")
+        self.__segment_nexts = array("q")
+        self.__free_segments = HashTable(default_value=None)
+
+        for (key_id, (key, values)) in enumerate(items):
+            self.__key_ids.push_item(key, key_id)
+            self.__keys.append(key)
+            self.__heads.append(key_id)
+            self.__tails.append(key_id)
+            self.__tail_used.append(len(values))
+            self.__counts.append(len(values))
+            self.__segment_starts.append(len(self.__arena))
+            self.__segment_sizes.append(len(values))
+            self.__segment_nexts.append(-1)
+            self.__arena.extend(values)
+
+        return len(self.__arena)
@@ -0,0 +1,395 @@
+############################################################
+
+from array import array
+
+from tools import hash_tools
+from tools.math_tools import int_max
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   ordered hash table
+############################################################
+
+# index slots that hold no entry
+EMPTY = -1
+DELETED = -2
+
+# stands in for the key of a deleted entry
+DELETED_KEY = object()
+
+PERTURB_SHIFT = 5
+
+
+def index_typecode(bucket_count):
+    """
+    The smallest signed array typecode that can hold every entry position
+    of an index of `bucket_count` slots.
+    """
+
+    for typecode in ("b", "h", "i", "q"):
+        if bucket_count <= 2 ** (8 * array(typecode).itemsize - 1):
+            return typecode
+
+    return "q"
+
+
+class OrderedHashTable:
+    """
+    A hash table that remembers the order its keys were first pushed in.
+
+    Items live in dense, append-only entry arrays (hashes, keys, values), in
+    insertion order. The hash table proper is a sparse index of `bucket_count`
+    small integers, each the position of an entry or a marker for an empty or
+    deleted slot, probed as in CPython's dict. So iteration walks the entries
+    in order, and a resize only rebuilds the index, from the stored hashes,
+    while squeezing out any deleted entries.
+
+    `bucket_count` is always a power of two.
+    """
+
+    DEFAULT_BUCKET_COUNT = HashTable.DEFAULT_BUCKET_COUNT
+    DEFAULT_MIN_BUCKET_COUNT = HashTable.DEFAULT_MIN_BUCKET_COUNT
+    DEFAULT_MAX_BUCKET_COUNT = HashTable.DEFAULT_MAX_BUCKET_COUNT
+    DEFAULT_LOAD_BEFORE_RESIZE_UP = 2 / 3
+    DEFAULT_LOAD_BEFORE_RESIZE_DOWN = HashTable.DEFAULT_LOAD_BEFORE_RESIZE_DOWN
+    DEFAULT_DEFAULT_VALUE = HashTable.DEFAULT_DEFAULT_VALUE
+    DEFAULT_HASHER = HashTable.DEFAULT_HASHER
+
+    def __init__(
+        self,
+        bucket_count=DEFAULT_BUCKET_COUNT,
+        min_bucket_count=DEFAULT_MIN_BUCKET_COUNT,
+        max_bucket_count=DEFAULT_MAX_BUCKET_COUNT,
+        load_before_resize_up=DEFAULT_LOAD_BEFORE_RESIZE_UP,
+        load_before_resize_down=DEFAULT_LOAD_BEFORE_RESIZE_DOWN,
+        default_value=DEFAULT_DEFAULT_VALUE,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        self.__min_bucket_count = power_of_two_at_least(min(bucket_count, min_bucket_count))
+        self.__max_bucket_count = power_of_two_at_least(max(bucket_count, max_bucket_count))
+        self.__load_before_resize_up = load_before_resize_up
+        self.__load_before_resize_down = load_before_resize_down
+        self.__default_value = default_value
+
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_hasher(hasher)
+
+        self.__item_count = 0
+        self.__hashes = array("Q")
+        self.__keys = []
+        self.__values = []
+
+        self.__bucket_count = None
+        self.__index = None
+        self.rebuild_index(power_of_two_at_least(bucket_count))
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__item_count
+
+    def __contains__(self, key):
+        return self.find_position(key) is not None
+
+    #-----------------------------------------------------------
+
+    @property
+    def item_count(self):
+        return self.__item_count
+
+    @property
+    def bucket_count(self):
+        return self.__bucket_count
+
+    @property
+    def entry_count(self):
+        """
+        The number of entries, including deleted ones not yet squeezed out.
+        """
+
+        return len(self.__keys)
+
+    @property
+    def default_value(self):
+        return self.__default_value
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    @property
+    def load_factor(self):
+        return self.__item_count / self.__bucket_count
+
+    ############################################################
+    #   index
+    ############################################################
+
+    def probe(self, key_hash):
+        """
+        Yield the index slots to try for `key_hash`, in order.
+        Once the hash is shifted out, the slots cycle through the whole index,
+        so the probe stops after one full cycle, even if there is no empty slot.
+        """
+
+        mask = self.__bucket_count - 1
+        perturb = key_hash
+        slot = key_hash & mask
+
+        while perturb:
+            yield slot
+            perturb >>= PERTURB_SHIFT
+            slot = (5 * slot + 1 + perturb) & mask
+
+        for __ in range(self.__bucket_count):
+            yield slot
+            slot = (5 * slot + 1) & mask
+
+        return
+
+    def find_position(self, key, key_hash=None):
+        """
+        Returns the entry position of `key`, or `None` if it's not found.
+        """
+
+        if key_hash is None:
+            key_hash = self.__hash(key) & 0xFFFFFFFFFFFFFFFF
+
+        for slot in self.probe(key_hash):
+            position = self.__index[slot]
+
+            if position == EMPTY:
+                return None
+
+            if position != DELETED and self.__hashes[position] == key_hash and self.__keys[position] == key:
+                return position
+
+        return None
+
+    def find_slot(self, key_hash, position):
+        """
+        Returns the index slot pointing at entry `position`.
+        """
+
+        for slot in self.probe(key_hash):
+            if self.__index[slot] == position:
+                return slot
+
+    def rebuild_index(self, bucket_count):
+        """
+        Squeeze the deleted entries out of the entry arrays,
+        and rebuild the index with `bucket_count` slots.
+        """
+
+        if len(self.__keys) != self.__item_count:
+            live = [position for (position, key) in enumerate(self.__keys) if key is not DELETED_KEY]
+            self.__hashes = array("Q", (self.__hashes[position] for position in live))
+            self.__keys = [self.__keys[position] for position in live]
+            self.__values = [self.__values[position] for position in live]
+
+        self.__bucket_count = bucket_count
+        self.__index = array(index_typecode(bucket_count), [EMPTY]) * bucket_count
+
+        for (position, key_hash) in enumerate(self.__hashes):
+            for slot in self.probe(key_hash):
+                if self.__index[slot] == EMPTY:
+                    self.__index[slot] = position
+                    break
+
+        return
+
+    def resize(self):
+        """
+        Rebuild the index if it's too full (counting deleted entries, which still
+        take up slots), or too empty.
+        Returns the final `bucket_count`.
+        """
+
+        bucket_count = self.__bucket_count
+
+        if len(self.__keys) >= bucket_count * self.__load_before_resize_up:
+
+            # deleted entries are squeezed out, so grow for the live items only,
+            # leaving them room to double
+            while bucket_count < self.__max_bucket_count:
+                if self.__item_count < bucket_count * self.__load_before_resize_up / 2:
+                    break
+                bucket_count *= 2
+
+            # past `max_bucket_count`, still never let the index fill up,
+            # and leave enough room that rebuilds stay rare
+            while self.__item_count >= bucket_count * self.__load_before_resize_up * 3 / 4:
+                bucket_count *= 2
+
+            self.rebuild_index(bucket_count)
+
+        elif self.load_factor <= self.__load_before_resize_down and bucket_count > self.__min_bucket_count:
+            self.rebuild_index(int_max(self.__min_bucket_count, bucket_count // 2))
+
+        return self.__bucket_count
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    def push_item(self, key, value, should_resize=True):
+        """
+        Set `key`'s value to `value` in the hash table.
+        A new key goes at the end of the order; an existing key keeps its place.
+        Returns the hash table's new item count.
+        """
+
+        key_hash = self.__hash(key) & 0xFFFFFFFFFFFFFFFF
+
+        position = self.find_position(key, key_hash)
+
+        if position is not None:
+            self.__values[position] = value
+            return self.__item_count
+
+        # without resizing, deleted entries can pile up past the last position
+        # the index's typecode can hold, so squeeze them out before appending
+        if len(self.__keys) >= 2 ** (8 * self.__index.itemsize - 1):
+            self.rebuild_index(self.__bucket_count)
+
+        # reuse the first deleted slot on the probe path, or else the empty one
+        for slot in self.probe(key_hash):
+            if self.__index[slot] in (EMPTY, DELETED):
+                break
+        else:
+            # every slot holds a live item, as can happen without resizing,
+            # so the index has to grow anyway
+            self.rebuild_index(self.__bucket_count * 2)
+            return self.push_item(key, value, should_resize=should_resize)
+
+        self.__index[slot] = len(self.__keys)
+        self.__hashes.append(key_hash)
+        self.__keys.append(key)
+        self.__values.append(value)
+        self.__item_count += 1
+
+        if should_resize:
+            self.resize()
+
+        return self.__item_count
+
+    def find_item(self, key):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        position = self.find_position(key)
+
+        if position is None:
+            return self.__default_value
+        else:
+            return self.__values[position]
+
+    def pop_item(self, key, should_resize=True):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        key_hash = self.__hash(key) & 0xFFFFFFFFFFFFFFFF
+
+        position = self.find_position(key, key_hash)
+
+        if position is None:
+            return (None, self.__item_count)
+
+        value = self.__values[position]
+
+        self.__index[self.find_slot(key_hash, position)] = DELETED
+        self.__keys[position] = DELETED_KEY
+        self.__values[position] = None
+        self.__item_count -= 1
+
+        if should_resize:
+            self.resize()
+
+        return (value, self.__item_count)
+
+    def items(self):
+        """
+        Yield every `(key, value)` pair in the hash table, in insertion order.
+        """
+
+        for (key, value) in zip(self.__keys, self.__values):
+            if key is not DELETED_KEY:
+                yield (key, value)
+
+        return
+
+    def keys(self):
+        """
+        Yield every key in the hash table, in insertion order.
+        """
+
+        for key in self.__keys:
+            if key is not DELETED_KEY:
+                yield key
+
+        return
+
+    def values(self):
+        """
+        Yield every value in the hash table, in insertion order.
+        """
+
+        for (key, value) in zip(self.__keys, self.__values):
+            if key is not DELETED_KEY:
+                yield value
+
+        return
+
+    def __iter__(self):
+        return self.keys()
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __setitem__(self, key, value, **kwargs):
+        self.push_item(key, value, **kwargs)
+        return
+
+    def set(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def put(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def push(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
+
+    def __delitem__(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def delete(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def pop(self, key, **kwargs):
+        return self.pop_item(key, **kwargs)
+
+
+############################################################
+
+
+def power_of_two_at_least(n):
+    return 1 << max(0, int(n) - 1).bit_length()
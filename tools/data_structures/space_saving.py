@@ -0,0 +1,148 @@
+############################################################
+
+import heapq
+import itertools
+
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   space-saving heavy hitters
+############################################################
+
+
+class SpaceSaving:
+    """
+    The approximate heavy hitters of a stream of keys, in fixed memory
+    (the Space-Saving algorithm of Metwally, Agrawal and El Abbadi).
+
+    At most `capacity` keys are counted. When a new key arrives and all the
+    counters are taken, it takes over the smallest counter, and that counter's
+    old count is kept as the new key's `error`. So every reported count is at
+    most `error` too high, and every key seen more than `item_count / capacity`
+    times is sure to be kept.
+
+    Keys are never compared with each other, so they only need to be hashable.
+    """
+
+    DEFAULT_CAPACITY = 0o1000
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+
+        self.__capacity = capacity
+        self.__item_count = 0
+
+        # key => [count, error, sequence]
+        self.__counters = HashTable(bucket_count=capacity, default_value=None)
+
+        # every counter gets the next `sequence` number when a key takes it,
+        # which breaks ties between equal counts without comparing keys
+        self.__sequence = itertools.count()
+
+        # a min-heap of `(count, sequence, key)`, which may hold stale entries;
+        # an entry is only trusted if it matches the key's current count
+        self.__heap = []
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__counters)
+
+    @property
+    def capacity(self):
+        return self.__capacity
+
+    @property
+    def item_count(self):
+        """
+        The total count of keys added, including those no longer counted.
+        """
+
+        return self.__item_count
+
+    ############################################################
+    #   counting
+    ############################################################
+
+    def add(self, key, count=1):
+        """
+        Count `count` more occurrences of `key`.
+        Returns the key's estimated count.
+        """
+
+        self.__item_count += count
+
+        counter = self.__counters.find_item(key)
+
+        if counter is not None:
+            counter[0] += count
+
+        elif len(self.__counters) < self.__capacity:
+            counter = [count, 0, next(self.__sequence)]
+            self.__counters.push_item(key, counter)
+
+        # else, take over the smallest counter
+        else:
+            (min_count, min_key) = self.pop_min()
+            self.__counters.pop_item(min_key)
+            counter = [min_count + count, min_count, next(self.__sequence)]
+            self.__counters.push_item(key, counter)
+
+        heapq.heappush(self.__heap, (counter[0], counter[2], key))
+
+        # stale entries pile up as counts grow, so sweep them now and then
+        if len(self.__heap) > 4 * self.__capacity:
+            self.rebuild_heap()
+
+        return counter[0]
+
+    def add_many(self, keys):
+        """
+        Count one occurrence of every key in `keys`.
+        Returns the total count of keys added.
+        """
+
+        for key in keys:
+            self.add(key)
+
+        return self.__item_count
+
+    def pop_min(self):
+        """
+        Remove the heap's entry for the key with the smallest count.
+        Returns `(count, key)`.
+        """
+
+        while True:
+            (count, sequence, key) = heapq.heappop(self.__heap)
+            counter = self.__counters.find_item(key)
+            if counter is not None and counter[0] == count:
+                return (count, key)
+
+    def rebuild_heap(self):
+        self.__heap = [(counter[0], counter[2], key) for (key, counter) in self.__counters.items()]
+        heapq.heapify(self.__heap)
+        return
+
+    ############################################################
+    #   reporting
+    ############################################################
+
+    def top(self, k=None):
+        """
+        Return the `k` keys with the highest estimated counts (or all of them),
+        as `(key, count, error)` triples, by count, most first,
+        then by when the key took its counter, earliest first.
+        """
+
+        def order(item):
+            (key, (count, error, sequence)) = item
+            return (-count, sequence)
+
+        if k is None:
+            counters = sorted(self.__counters.items(), key=order)
+        else:
+            counters = heapq.nsmallest(k, self.__counters.items(), key=order)
+
+        return [(key, count, error) for (key, (count, error, sequence)) in counters]
@@ -0,0 +1,568 @@
+############################################################
+
+from array import array
+
+from tools import hash_tools
+from tools.math_tools import int_max
+from tools.data_structures.hash_table import HashTable
+from tools.data_structures.int_hash_table import MULTIPLIER, MASK_64
+from tools.data_structures.ordered_hash_table import power_of_two_at_least
+
+############################################################
+#   string arena
+############################################################
+
+# an index slot that holds no key id
+EMPTY = -1
+
+
+def home_slot(key_hash, bucket_count):
+    """
+    The first slot to probe for `key_hash` in a power-of-two `bucket_count`,
+    taken from the top bits of the hash times a large odd constant, since the
+    low bits of the FNV and DJB2 hashes only depend on the low bits of each byte.
+    """
+
+    shift = 65 - bucket_count.bit_length()
+    return ((key_hash * MULTIPLIER) & MASK_64) >> shift if shift < 64 else 0
+
+
+class StringArena:
+    """
+    An append-only store of string keys, each encoded to UTF-8 once and
+    copied into one shared `bytearray`. A key is known by its key id, its
+    position in parallel arrays of offsets, lengths and hashes, so holding
+    a key costs a few machine integers and its bytes, not a `str` object.
+
+    With `interning`, adding a key that's already in the arena returns the
+    id it already has, so tables sharing an arena share each key's bytes,
+    and can tell keys apart by id alone. The interning index compares
+    candidate keys against `memoryview` slices of the arena.
+
+    Keys are never removed; a table that drops a key leaves its bytes behind.
+    """
+
+    DEFAULT_BUCKET_COUNT = HashTable.DEFAULT_BUCKET_COUNT
+    DEFAULT_LOAD_BEFORE_RESIZE_UP = 2 / 3
+    DEFAULT_INTERNING = True
+    DEFAULT_HASHER = HashTable.DEFAULT_HASHER
+
+    def __init__(
+        self,
+        bucket_count=DEFAULT_BUCKET_COUNT,
+        load_before_resize_up=DEFAULT_LOAD_BEFORE_RESIZE_UP,
+        interning=DEFAULT_INTERNING,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        self.__load_before_resize_up = load_before_resize_up
+        self.__interning = interning
+        self.__hasher = hasher
+        self.__hash = hash_tools.get_bytes_hasher(hasher)
+
+        self.__bytes = bytearray()
+        self.__offsets = array("q")
+        self.__lengths = array("I")
+        self.__hashes = array("Q")
+
+        # slot => key id, for interning
+        self.__index = array("q", [EMPTY]) * power_of_two_at_least(bucket_count) if interning else None
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__offsets)
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    @property
+    def interning(self):
+        return self.__interning
+
+    @property
+    def hasher(self):
+        return self.__hasher
+
+    @property
+    def byte_count(self):
+        """
+        The number of bytes of keys held in the arena.
+        """
+
+        return len(self.__bytes)
+
+    ############################################################
+    #   keys
+    ############################################################
+
+    def encode(self, key):
+        """
+        Returns `key` as `(bytes, hash)`, ready for `add` or `find`.
+        """
+
+        key_bytes = str(key).encode()
+        return (key_bytes, self.__hash(key_bytes))
+
+    def key(self, key_id):
+        return self.key_bytes(key_id).decode()
+
+    def key_bytes(self, key_id):
+        offset = self.__offsets[key_id]
+        return bytes(self.__bytes[offset:offset + self.__lengths[key_id]])
+
+    def key_hash(self, key_id):
+        return self.__hashes[key_id]
+
+    def equals(self, key_id, key_bytes):
+        """
+        Returns whether the key `key_id` has the encoded bytes `key_bytes`.
+        """
+
+        length = self.__lengths[key_id]
+
+        if length != len(key_bytes):
+            return False
+
+        offset = self.__offsets[key_id]
+        with memoryview(self.__bytes) as view:
+            return view[offset:offset + length] == key_bytes
+
+    def add(self, key_bytes, key_hash):
+        """
+        Add the encoded key `key_bytes`, with hash `key_hash`, to the arena.
+        Returns its key id: if `interning`, the id it already had, if any.
+        """
+
+        if self.__interning:
+            key_id = self.find_encoded(key_bytes, key_hash)
+            if key_id is not None:
+                return key_id
+
+        key_id = len(self.__offsets)
+        self.__offsets.append(len(self.__bytes))
+        self.__lengths.append(len(key_bytes))
+        self.__hashes.append(key_hash)
+        self.__bytes += key_bytes
+
+        if self.__interning:
+            self.__index_key_id(self.__index, key_id)
+            if len(self.__offsets) >= min(len(self.__index) * self.__load_before_resize_up, len(self.__index)):
+                self.rehash(2 * len(self.__index))
+
+        return key_id
+
+    def find(self, key):
+        """
+        Returns the key id of `key`, or `None` if it's not found.
+        Only an interning arena can look keys up.
+        """
+
+        return self.find_encoded(*self.encode(key))
+
+    def find_encoded(self, key_bytes, key_hash):
+
+        if not self.__interning:
+            raise Exception("NotInterningError")
+
+        mask = len(self.__index) - 1
+        slot = home_slot(key_hash, len(self.__index))
+
+        for __ in range(len(self.__index)):
+            key_id = self.__index[slot]
+            if key_id == EMPTY:
+                break
+            if self.__hashes[key_id] == key_hash and self.equals(key_id, key_bytes):
+                return key_id
+            slot = (slot + 1) & mask
+
+        return None
+
+    ############################################################
+    #   interning index
+    ############################################################
+
+    def rehash(self, bucket_count):
+        """
+        Rebuild the interning index with `bucket_count` slots.
+        """
+
+        self.__index = array("q", [EMPTY]) * bucket_count
+
+        for key_id in range(len(self.__offsets)):
+            self.__index_key_id(self.__index, key_id)
+
+        return
+
+    def __index_key_id(self, index, key_id):
+
+        mask = len(index) - 1
+        slot = home_slot(self.__hashes[key_id], len(index))
+
+        for __ in range(len(index)):
+            if index[slot] == EMPTY:
+                break
+            slot = (slot + 1) & mask
+        else:
+            raise Exception("IndexFullError")
+
+        index[slot] = key_id
+
+        return
+
+
+############################################################
+#   arena hash table
+############################################################
+
+
+class ArenaHashTable:
+    """
+    A hash table with string keys held in a `StringArena`, by default its own,
+    or one shared with other tables.
+
+    Each key is encoded and hashed once per operation, and only ever stored
+    as bytes in the arena; the table itself is an array of key ids, probed
+    linearly, next to a list of values. Resizing reuses the hashes stored in
+    the arena, so keys are never re-encoded or rehashed.
+
+    When the arena is `interning`, the arena matches the key's bytes, and the
+    table only compares key ids; a key the arena has never seen can't be in
+    the table at all. Otherwise the table matches keys by hash, then bytes.
+
+    A shared arena only ever grows, keeping the bytes of every key any of its
+    tables has held. A table's own arena is compacted instead: once most of
+    its keys have been removed from the table, the live ones are copied to a
+    new arena, so a table that keeps replacing its keys stays in bounded space.
+
+    At least one slot is always left empty, even without resizing, and no
+    probe goes further than `bucket_count` slots.
+
+    Keys come back out as `str`.
+    """
+
+    DEFAULT_BUCKET_COUNT = HashTable.DEFAULT_BUCKET_COUNT
+    DEFAULT_MIN_BUCKET_COUNT = HashTable.DEFAULT_MIN_BUCKET_COUNT
+    DEFAULT_LOAD_BEFORE_RESIZE_UP = 2 / 3
+    DEFAULT_LOAD_BEFORE_RESIZE_DOWN = HashTable.DEFAULT_LOAD_BEFORE_RESIZE_DOWN
+    DEFAULT_DEFAULT_VALUE = HashTable.DEFAULT_DEFAULT_VALUE
+    DEFAULT_HASHER = HashTable.DEFAULT_HASHER
+
+    def __init__(
+        self,
+        arena=None,
+        bucket_count=DEFAULT_BUCKET_COUNT,
+        min_bucket_count=DEFAULT_MIN_BUCKET_COUNT,
+        load_before_resize_up=DEFAULT_LOAD_BEFORE_RESIZE_UP,
+        load_before_resize_down=DEFAULT_LOAD_BEFORE_RESIZE_DOWN,
+        default_value=DEFAULT_DEFAULT_VALUE,
+        hasher=DEFAULT_HASHER,
+    ):
+
+        # without interning, the table's own index keeps keys unique
+        self.__arena = StringArena(interning=False, hasher=hasher) if arena is None else arena
+        self.__owns_arena = arena is None
+
+        self.__min_bucket_count = power_of_two_at_least(min(bucket_count, min_bucket_count))
+        self.__load_before_resize_up = load_before_resize_up
+        self.__load_before_resize_down = load_before_resize_down
+        self.__default_value = default_value
+
+        self.__item_count = 0
+        self.__key_ids = array("q", [EMPTY]) * power_of_two_at_least(bucket_count)
+        self.__values = [None] * len(self.__key_ids)
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return self.__item_count
+
+    def __contains__(self, key):
+        return self.find_slot(*self.__arena.encode(key)) is not None
+
+    @property
+    def arena(self):
+        return self.__arena
+
+    @property
+    def item_count(self):
+        return self.__item_count
+
+    @property
+    def bucket_count(self):
+        return len(self.__key_ids)
+
+    @property
+    def default_value(self):
+        return self.__default_value
+
+    @property
+    def load_factor(self):
+        return self.__item_count / len(self.__key_ids)
+
+    ############################################################
+    #   probing and resizing
+    ############################################################
+
+    def find_slot(self, key_bytes, key_hash):
+        """
+        Returns the slot holding the encoded key `key_bytes`,
+        or `None` if it's not found.
+        """
+
+        arena = self.__arena
+
+        if arena.interning:
+            key_id = arena.find_encoded(key_bytes, key_hash)
+            return None if key_id is None else self.find_key_id_slot(key_id, key_hash)
+
+        mask = len(self.__key_ids) - 1
+        slot = home_slot(key_hash, len(self.__key_ids))
+
+        for __ in range(len(self.__key_ids)):
+            key_id = self.__key_ids[slot]
+            if key_id == EMPTY:
+                break
+            if arena.key_hash(key_id) == key_hash and arena.equals(key_id, key_bytes):
+                return slot
+            slot = (slot + 1) & mask
+
+        return None
+
+    def find_key_id_slot(self, key_id, key_hash):
+        """
+        Returns the slot holding the key `key_id` of an interning arena,
+        or `None` if it's not found.
+        """
+
+        mask = len(self.__key_ids) - 1
+        slot = home_slot(key_hash, len(self.__key_ids))
+
+        for __ in range(len(self.__key_ids)):
+            if self.__key_ids[slot] == EMPTY:
+                break
+            if self.__key_ids[slot] == key_id:
+                return slot
+            slot = (slot + 1) & mask
+
+        return None
+
+    def resize(self):
+        """
+        Rehash if the table is too full or too empty,
+        or if it holds under half of the keys in its own arena.
+        Returns the final `bucket_count`.
+        """
+
+        bucket_count = len(self.__key_ids)
+
+        if self.__item_count >= min(bucket_count * self.__load_before_resize_up, bucket_count):
+            self.rehash(2 * bucket_count)
+
+        elif self.load_factor <= self.__load_before_resize_down and bucket_count > self.__min_bucket_count:
+            self.rehash(int_max(self.__min_bucket_count, bucket_count // 2))
+
+        # (at least `bucket_count` keys have been dropped since the last compaction,
+        # so the copying is paid for)
+        elif self.__owns_arena and len(self.__arena) > 2 * int_max(self.__item_count, bucket_count):
+            self.rehash(bucket_count)
+
+        return len(self.__key_ids)
+
+    def rehash(self, bucket_count):
+        """
+        Move every item into new arrays of `bucket_count` slots.
+        If the table has its own arena, and under half of the arena's keys
+        are still in the table, the live keys move to a new arena too.
+        """
+
+        old_arena = self.__arena
+        old_key_ids = self.__key_ids
+        old_values = self.__values
+
+        is_compacting = self.__owns_arena and len(old_arena) > 2 * self.__item_count
+        if is_compacting:
+            self.__arena = StringArena(interning=False, hasher=old_arena.hasher)
+
+        self.__key_ids = array("q", [EMPTY]) * bucket_count
+        self.__values = [None] * bucket_count
+
+        for (key_id, value) in zip(old_key_ids, old_values):
+            if key_id != EMPTY:
+                if is_compacting:
+                    key_id = self.__arena.add(old_arena.key_bytes(key_id), old_arena.key_hash(key_id))
+                self.__place(key_id, value)
+
+        return
+
+    def __place(self, key_id, value):
+
+        mask = len(self.__key_ids) - 1
+        slot = home_slot(self.__arena.key_hash(key_id), len(self.__key_ids))
+
+        for __ in range(len(self.__key_ids)):
+            if self.__key_ids[slot] == EMPTY:
+                break
+            slot = (slot + 1) & mask
+        else:
+            raise Exception("TableFullError")
+
+        self.__key_ids[slot] = key_id
+        self.__values[slot] = value
+
+        return
+
+    ############################################################
+    #   item access
+    ############################################################
+
+    def push_item(self, key, value, should_resize=True):
+        """
+        Set `key`'s value to `value` in the hash table.
+        Returns the hash table's new item count.
+        """
+
+        arena = self.__arena
+        (key_bytes, key_hash) = arena.encode(key)
+
+        # an interning arena finds or adds the key in one lookup
+        if arena.interning:
+            key_id = arena.add(key_bytes, key_hash)
+            slot = self.find_key_id_slot(key_id, key_hash)
+        else:
+            key_id = None
+            slot = self.find_slot(key_bytes, key_hash)
+
+        if slot is not None:
+            self.__values[slot] = value
+            return self.__item_count
+
+        if key_id is None:
+            key_id = arena.add(key_bytes, key_hash)
+
+        self.__place(key_id, value)
+        self.__item_count += 1
+
+        if should_resize:
+            self.resize()
+
+        # even without resizing, never fill the last empty slot,
+        # which is what ends the probes of missing keys and of `pop_item`
+        elif self.__item_count >= len(self.__key_ids):
+            self.rehash(2 * len(self.__key_ids))
+
+        return self.__item_count
+
+    def find_item(self, key):
+        """
+        Get `key`'s value in the hash table.
+        Returns the key's value or `default_value` if the key is not found.
+        """
+
+        slot = self.find_slot(*self.__arena.encode(key))
+
+        if slot is None:
+            return self.__default_value
+        else:
+            return self.__values[slot]
+
+    def pop_item(self, key, should_resize=True):
+        """
+        Remove `key`'s value in the hash table.
+        Returns the removed value and the hash table's new item count.
+        """
+
+        slot = self.find_slot(*self.__arena.encode(key))
+
+        if slot is None:
+            return (None, self.__item_count)
+
+        value = self.__values[slot]
+
+        # shift back each following item that may sit at the emptied slot
+        mask = len(self.__key_ids) - 1
+        hole = slot
+        slot = (slot + 1) & mask
+
+        while self.__key_ids[slot] != EMPTY:
+            home = home_slot(self.__arena.key_hash(self.__key_ids[slot]), len(self.__key_ids))
+            if ((slot - home) & mask) >= ((slot - hole) & mask):
+                self.__key_ids[hole] = self.__key_ids[slot]
+                self.__values[hole] = self.__values[slot]
+                hole = slot
+            slot = (slot + 1) & mask
+
+        self.__key_ids[hole] = EMPTY
+        self.__values[hole] = None
+        self.__item_count -= 1
+
+        if should_resize:
+            self.resize()
+
+        return (value, self.__item_count)
+
+    def items(self):
+        """
+        Yield every `(key, value)` pair in the hash table.
+        """
+
+        for (key_id, value) in zip(self.__key_ids, self.__values):
+            if key_id != EMPTY:
+                yield (self.__arena.key(key_id), value)
+
+        return
+
+    def keys(self):
+        for (key, __) in self.items():
+            yield key
+        return
+
+    def values(self):
+        for (key_id, value) in zip(self.__key_ids, self.__values):
+            if key_id != EMPTY:
+                yield value
+        return
+
+    def __iter__(self):
+        return self.keys()
+
+    ########################################
+    #   other names
+    ########################################
+
+    def __setitem__(self, key, value, **kwargs):
+        self.push_item(key, value, **kwargs)
+        return
+
+    def set(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def put(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def push(self, key, value, **kwargs):
+        return self.push_item(key, value, **kwargs)
+
+    def __getitem__(self, key):
+        return self.find_item(key)
+
+    def get(self, key):
+        return self.find_item(key)
+
+    def find(self, key):
+        return self.find_item(key)
+
+    def __delitem__(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def delete(self, key, **kwargs):
+        self.pop_item(key, **kwargs)
+        return
+
+    def pop(self, key, **kwargs):
+        return self.pop_item(key, **kwargs)
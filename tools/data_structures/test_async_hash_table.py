@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from .async_hash_table import AsyncHashTable
+
+
+class TestAsyncHashTable(unittest.IsolatedAsyncioTestCase):
+
+    async def test_async_hash_table_insertion_and_retrieval(self):
+        aht = AsyncHashTable(bucket_count=8, yield_every=4)
+
+        for i in range(100):
+            await aht.put(f"key-{i}", f"val-{i}")
+
+        await aht.wait_for_resize()
+
+        for i in range(100):
+            return_value = aht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+        self.assertTrue(aht.bucket_count > 8)
+
+    async def test_async_hash_table_writes_during_resize(self):
+        aht = AsyncHashTable(bucket_count=8, yield_every=1)
+
+        await aht.update((f"key-{i}", f"val-{i}") for i in range(6))
+        self.assertTrue(aht.is_resizing)
+
+        # let the migration run part-way
+        await asyncio.sleep(0)
+
+        await aht.put("key-0", "new-val-0")
+        await aht.put("key-6", "val-6")
+        await aht.delete("key-5")
+
+        await aht.wait_for_resize()
+        self.assertTrue(not aht.is_resizing)
+
+        return_values = await aht.get_many(f"key-{i}" for i in range(7))
+        self.assertTrue(
+            return_values == ["new-val-0", "val-1", "val-2", "val-3", "val-4", None, "val-6"]
+        )
+        self.assertTrue(len(aht) == 6)
+
+    def test_async_hash_table_unsupported_storage(self):
+        with self.assertRaises(Exception):
+            AsyncHashTable(storage="cuckoo")
+
+
+if __name__ == "__main__":
+    unittest.main()
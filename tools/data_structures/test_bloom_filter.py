@@ -0,0 +1,64 @@
+import unittest
+
+from .bloom_filter import BloomFilter, CountingBloomFilter
+from .hash_table import HashTable
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bf = BloomFilter(capacity=1000)
+
+        bf.add_many(f"key-{i}" for i in range(1000))
+
+        for i in range(1000):
+            self.assertTrue(f"key-{i}" in bf)
+
+    def test_bloom_filter_false_positive_rate(self):
+        bf = BloomFilter(capacity=1000, error_rate=1 / 100)
+
+        bf.add_many(f"key-{i}" for i in range(1000))
+
+        false_positives = sum(1 for i in range(1000) if f"other-{i}" in bf)
+        self.assertTrue(false_positives < 50)
+
+    def test_bloom_filter_cannot_remove(self):
+        bf = BloomFilter()
+        bf.add("key-0")
+
+        with self.assertRaises(Exception):
+            bf.remove("key-0")
+
+    def test_counting_bloom_filter_remove(self):
+        cbf = CountingBloomFilter(capacity=100)
+
+        cbf.add_many(f"key-{i}" for i in range(100))
+
+        for i in range(100):
+            cbf.remove(f"key-{i}")
+
+        self.assertTrue(len(cbf) == 0)
+        self.assertTrue(not any(cbf.cells))
+
+    def test_hash_table_with_membership_filter(self):
+        ht = HashTable(bucket_count=8, membership_filter=True)
+
+        for i in range(100):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        for i in range(50):
+            ht.delete(f"key-{i}")
+
+        for i in range(50):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value is None)
+
+        for i in range(50, 100):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+        self.assertTrue(len(ht.membership_filter) == 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from .hash_table import HashTable
+from .frozen_hash_table import FrozenHashTable
+
+
+class TestFrozenHashTable(unittest.TestCase):
+
+    def test_frozen_hash_table_build_and_retrieval(self):
+        fht = FrozenHashTable.build((f"key-{i}", f"val-{i}") for i in range(1000))
+
+        self.assertTrue(len(fht) == 1000)
+
+        for i in range(1000):
+            return_value = fht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+        return_value = fht.get("key-1000")
+        self.assertTrue(return_value is None)
+        self.assertTrue("key-1000" not in fht)
+
+    def test_frozen_hash_table_is_minimal(self):
+        fht = FrozenHashTable.build((f"key-{i}", i) for i in range(100))
+
+        self.assertTrue(sorted(fht.values()) == list(range(100)))
+
+    def test_frozen_hash_table_empty(self):
+        fht = FrozenHashTable.build([], default_value=0)
+
+        self.assertTrue(len(fht) == 0)
+        return_value = fht.get("key-0")
+        self.assertTrue(return_value == 0)
+
+    def test_frozen_hash_table_rejects_colliding_keys(self):
+        # "EzEzEz" and "EzEzFY" have the same djb2 hash, so no seed separates them
+        with self.assertRaises(Exception):
+            FrozenHashTable.build([("EzEzEz", 1), ("EzEzFY", 2)], hasher="djb2")
+
+        ht = HashTable(bucket_count=8, hasher="djb2")
+        ht.put("EzEzEz", 1)
+        ht.put("EzEzFY", 2)
+
+        with self.assertRaises(Exception):
+            ht.freeze()
+
+        fht = FrozenHashTable.build([("EzEzEz", 1), ("EzEzFY", 2)])
+        self.assertTrue(fht.get("EzEzFY") == 2)
+
+    def test_hash_table_freeze(self):
+        ht = HashTable(bucket_count=8)
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        fht = ht.freeze()
+
+        for i in range(10):
+            return_value = fht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+    def test_frozen_hash_table_is_hashable(self):
+        fht_1 = FrozenHashTable.build([("a", 1), ("b", 2)])
+        fht_2 = FrozenHashTable.build([("b", 2), ("a", 1)], group_size=2)
+
+        self.assertTrue(fht_1 == fht_2)
+        self.assertTrue(hash(fht_1) == hash(fht_2))
+        self.assertTrue(len({fht_1, fht_2}) == 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from .hash_ring import MODES, HashRing, ShardedHashTable
+
+
+class TestHashRing(unittest.TestCase):
+
+    def test_hash_ring_balance_and_movement(self):
+        keys = [f"key-{i}" for i in range(2000)]
+
+        for mode in MODES:
+            ring = HashRing(nodes=[f"node-{i}" for i in range(8)], mode=mode)
+            before = [ring.node_for(key) for key in keys]
+
+            counts = [before.count(node) for node in ring.nodes]
+            self.assertTrue(min(counts) > len(keys) / 8 / 2)
+            self.assertTrue(max(counts) < len(keys) / 8 * 2)
+
+            # adding a node only moves keys onto it, about 1/9 of them
+            ring.add_node("node-8")
+            after = [ring.node_for(key) for key in keys]
+            moved = [(b, a) for (b, a) in zip(before, after) if b != a]
+
+            self.assertTrue(all(a == "node-8" for (__, a) in moved))
+            self.assertTrue(len(keys) / 9 / 2 < len(moved) < len(keys) / 9 * 2)
+
+            # and removing it moves them back
+            ring.remove_node("node-8")
+            self.assertTrue([ring.node_for(key) for key in keys] == before)
+
+    def test_sharded_hash_table(self):
+        sht = ShardedHashTable(shards=["a", "b", "c"])
+
+        for i in range(600):
+            sht.put(f"key-{i}", f"val-{i}")
+
+        self.assertTrue(len(sht) == 600)
+        self.assertTrue(sum(sht.shard_sizes().values()) == 600)
+
+        moved_count = sht.add_shard("d")
+        self.assertTrue(moved_count == sht.shard_sizes()["d"])
+        self.assertTrue(0 < moved_count < 300)
+
+        moved_count = sht.remove_shard("a")
+        self.assertTrue(0 < moved_count < 300)
+        self.assertTrue(sht.shards == ("b", "c", "d"))
+
+        for i in range(600):
+            self.assertTrue(sht.get(f"key-{i}") == f"val-{i}")
+
+        (value, item_count) = sht.pop_item("key-0")
+        self.assertTrue(value == "val-0" and item_count == 599)
+        self.assertTrue(sht.get("key-0") is None)
+
+    def test_hash_ring_removal(self):
+        keys = [f"key-{i}" for i in range(2000)]
+
+        for mode in MODES:
+            ring = HashRing(nodes=[f"node-{i}" for i in range(8)], mode=mode)
+            before = [ring.node_for(key) for key in keys]
+
+            # removing a node from the middle only moves the keys of the nodes it says
+            changed_nodes = ring.remove_node("node-3")
+            self.assertTrue("node-3" not in ring and len(ring) == 7)
+            self.assertTrue(changed_nodes[0] == "node-3")
+            self.assertTrue(len(changed_nodes) == (2 if mode == "jump" else 1))
+
+            after = [ring.node_for(key) for key in keys]
+            moved = [(b, a) for (b, a) in zip(before, after) if b != a]
+
+            self.assertTrue("node-3" not in after)
+            self.assertTrue(all(b in changed_nodes for (b, __) in moved))
+            self.assertTrue(len(moved) < len(keys) / 8 * 2 * len(changed_nodes))
+
+            with self.assertRaises(Exception):
+                ring.remove_node("node-3")
+
+    def test_sharded_hash_table_remove_shard(self):
+        for mode in MODES:
+            sht = ShardedHashTable(shards=[f"shard-{i}" for i in range(6)], mode=mode)
+
+            for i in range(1200):
+                sht.put(f"key-{i}", f"val-{i}")
+
+            for shard in ("shard-2", "shard-0", "shard-5", "shard-3"):
+                moved_count = sht.remove_shard(shard)
+                self.assertTrue(0 < moved_count < 1200)
+                self.assertTrue(shard not in sht.shards)
+
+                # every key is still there, in the shard the ring assigns it
+                self.assertTrue(len(sht) == 1200 and sum(sht.shard_sizes().values()) == 1200)
+                for i in range(1200):
+                    key = f"key-{i}"
+                    self.assertTrue(sht.get(key) == f"val-{i}")
+                    self.assertTrue(sht.table(sht.ring.node_for(key)).get(key) == f"val-{i}")
+
+            self.assertTrue(len(sht.shards) == 2)
+
+    def test_sharded_hash_table_remove_last_shard(self):
+        for mode in MODES:
+            sht = ShardedHashTable(shards=["shard-0"], mode=mode)
+            sht.put("key-0", "val-0")
+
+            # the last shard's keys have nowhere to go, so it stays
+            with self.assertRaises(Exception):
+                sht.remove_shard("shard-0")
+            self.assertTrue(sht.shards == ("shard-0",) and len(sht) == 1)
+            self.assertTrue(sht.get("key-0") == "val-0")
+
+            # until it's empty
+            sht.pop("key-0")
+            self.assertTrue(sht.remove_shard("shard-0") == 0)
+            self.assertTrue(sht.shards == () and len(sht) == 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
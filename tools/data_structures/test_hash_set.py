@@ -0,0 +1,80 @@
+import unittest
+
+from .hash_set import HashSet
+
+
+class TestHashSet(unittest.TestCase):
+
+    def test_hash_set_add_contains_discard(self):
+        hs = HashSet()
+
+        self.assertTrue(hs.add("a"))
+        self.assertTrue(hs.add("b"))
+        self.assertTrue(not hs.add("a"))
+        self.assertTrue(len(hs) == 2)
+        self.assertTrue("a" in hs and "b" in hs and "c" not in hs)
+
+        self.assertTrue(hs.discard("a"))
+        self.assertTrue(not hs.discard("a"))
+        self.assertTrue(len(hs) == 1)
+        self.assertTrue("a" not in hs)
+
+    def test_hash_set_resize(self):
+        hs = HashSet(bucket_count=8)
+
+        self.assertTrue(hs.add_many(f"key-{i}" for i in range(1000)) == 1000)
+        self.assertTrue(len(hs) == 1000)
+        self.assertTrue(hs.load_factor < 3 / 4)
+        self.assertTrue(all(f"key-{i}" in hs for i in range(1000)))
+
+        for i in range(990):
+            hs.discard(f"key-{i}")
+
+        self.assertTrue(len(hs) == 10)
+        self.assertTrue(hs.bucket_count < 64)
+        self.assertTrue(sorted(hs) == sorted(f"key-{i}" for i in range(990, 1000)))
+
+    def test_hash_set_add_many_presizes(self):
+        keys = [f"key-{i}" for i in range(500)]
+        hs = HashSet(keys)
+
+        self.assertTrue(len(hs) == 500)
+        self.assertTrue(hs.bucket_count == hs.bucket_count_for(500))
+
+        # a sized batch is rehashed once, and an unsized one only grows
+        for (batch, rehash_count) in ((keys, 1), (iter(keys), 4)):
+            hs = HashSet()
+            rehashes = []
+            rehash = hs.rehash
+            hs.rehash = lambda bucket_count: (rehashes.append(bucket_count), rehash(bucket_count))
+
+            self.assertTrue(hs.add_many(batch) == 500)
+            self.assertTrue(len(rehashes) == rehash_count)
+            self.assertTrue(rehashes == sorted(rehashes))
+            self.assertTrue(hs.bucket_count == hs.bucket_count_for(500))
+            self.assertTrue(all(hs.contains(key) for key in keys))
+
+        # adding keys it has already doesn't count them
+        self.assertTrue(hs.add_many(keys[:100] + ["new"]) == 1 and len(hs) == 501)
+
+    def test_hash_set_operations(self):
+        a = HashSet(str(i) for i in range(0, 60))
+        b = HashSet(str(i) for i in range(40, 50))
+
+        self.assertTrue(sorted(a | b, key=int) == [str(i) for i in range(0, 60)])
+        self.assertTrue(sorted(a & b, key=int) == [str(i) for i in range(40, 50)])
+        self.assertTrue(sorted(b & a, key=int) == [str(i) for i in range(40, 50)])
+        self.assertTrue(sorted(a - b, key=int) == [str(i) for i in range(0, 40)] + [str(i) for i in range(50, 60)])
+        self.assertTrue(len(b - a) == 0)
+
+        c = HashSet(["x", "y"])
+        self.assertTrue(sorted(b | c)[-2:] == ["x", "y"])
+        self.assertTrue((a | b) == a)
+        self.assertTrue(a.copy() == a)
+
+        # the operands are left alone
+        self.assertTrue(len(a) == 60 and len(b) == 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
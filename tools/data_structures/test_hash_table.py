@@ -192,6 +192,17 @@ class TestHashTable(unittest.TestCase):
         return_value = ht.get("key-9")
         self.assertTrue(return_value == "val-9")
 
+    def test_hash_table_pop_returns_value(self):
+        ht = HashTable(bucket_count=8)
+
+        ht.put("key-0", "val-0")
+        ht.put("key-1", "val-1")
+
+        return_value = ht.pop("key-0")
+        self.assertTrue(return_value == ("val-0", 1))
+        return_value = ht.pop("key-0")
+        self.assertTrue(return_value == (None, 1))
+
 
 if __name__ == "__main__":
     unittest.main()
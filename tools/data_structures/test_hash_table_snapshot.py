@@ -0,0 +1,89 @@
+import unittest
+
+from .hash_table import HashTable
+
+
+class TestHashTableSnapshot(unittest.TestCase):
+
+    def test_snapshot_is_unchanged_by_writes(self):
+        for storage in HashTable.storages:
+            ht = HashTable(bucket_count=8, storage=storage)
+
+            for i in range(10):
+                ht.put(f"key-{i}", f"val-{i}")
+
+            snapshot = ht.snapshot()
+
+            ht.put("key-0", "new-val-0")
+            ht.put("key-10", "val-10")
+            ht.delete("key-1")
+
+            for i in range(10):
+                return_value = snapshot.get(f"key-{i}")
+                self.assertTrue(return_value == f"val-{i}")
+
+            return_value = snapshot.get("key-10")
+            self.assertTrue(return_value is None)
+            self.assertTrue(len(snapshot) == 10)
+
+            return_value = ht.get("key-0")
+            self.assertTrue(return_value == "new-val-0")
+            return_value = ht.get("key-1")
+            self.assertTrue(return_value is None)
+            return_value = ht.get("key-10")
+            self.assertTrue(return_value == "val-10")
+            self.assertTrue(len(ht) == 10)
+
+    def test_fork_shares_unchanged_chains(self):
+        ht = HashTable(bucket_count=0o100)
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        fork = ht.fork()
+        fork.put("key-0", "new-val-0")
+
+        return_value = ht.get("key-0")
+        self.assertTrue(return_value == "val-0")
+        return_value = fork.get("key-0")
+        self.assertTrue(return_value == "new-val-0")
+
+        # only the written bucket was cloned
+        ht_chains = [chain for chain in ht._HashTable__array if chain is not None]
+        fork_chains = [chain for chain in fork._HashTable__array if chain is not None]
+        shared_chains = [a for (a, b) in zip(ht_chains, fork_chains) if a is b]
+        self.assertTrue(len(shared_chains) == len(ht_chains) - 1)
+
+    def test_fork_with_membership_filter(self):
+        ht = HashTable(bucket_count=8, membership_filter=True)
+        ht.put("key-0", "val-0")
+
+        fork = ht.fork()
+        fork.delete("key-0")
+
+        return_value = ht.get("key-0")
+        self.assertTrue(return_value == "val-0")
+        return_value = fork.get("key-0")
+        self.assertTrue(return_value is None)
+
+    def test_fork_shares_membership_filter(self):
+        ht = HashTable(bucket_count=8, membership_filter=True)
+        ht.put("key-0", "val-0")
+
+        # the filter is shared until a write changes it
+        fork = ht.fork()
+        self.assertTrue(fork.membership_filter is ht.membership_filter)
+
+        fork.get("key-0")
+        fork.put("key-0", "new-val-0")
+        self.assertTrue(fork.membership_filter is ht.membership_filter)
+
+        fork.put("key-1", "val-1")
+        self.assertTrue(fork.membership_filter is not ht.membership_filter)
+        self.assertTrue("key-1" not in ht)
+        self.assertTrue(ht.get("key-0") == "val-0")
+        self.assertTrue(fork.get("key-1") == "val-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+This is the same test, but with cuckoo storage, where every key lives in
+one of a fixed number of slots (or the stash) instead of a chain.
+"""
+
+import itertools
+import unittest
+
+from tools import hash_tools
+
+from .hash_table import HashTable
+
+
+class TestHashTable(unittest.TestCase):
+
+    def test_hash_table_insertion_and_retrieval(self):
+        ht = HashTable(bucket_count=8, storage="cuckoo")
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        for i in range(10):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+        self.assertTrue(len(ht) == 10)
+
+    def test_hash_table_pution_overwrites_correctly(self):
+        ht = HashTable(bucket_count=8, storage="cuckoo")
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"new-val-{i}")
+
+        for i in range(10):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value == f"new-val-{i}")
+
+        self.assertTrue(len(ht) == 10)
+
+    def test_hash_table_removes_correctly(self):
+        ht = HashTable(bucket_count=8, storage="cuckoo")
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        for i in reversed(range(10)):
+            ht.delete(f"key-{i}")
+
+        for i in range(10):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value is None)
+
+        self.assertTrue(len(ht) == 0)
+
+    def test_hash_table_resize(self):
+        ht = HashTable(bucket_count=8, storage="cuckoo")
+
+        for i in range(10):
+            ht.put(f"key-{i}", f"val-{i}", should_resize=False)
+
+        ht.resize()
+
+        self.assertTrue(ht.bucket_count == 16)
+
+        for i in range(10):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+    def test_hash_table_bounded_stash(self):
+        ht = HashTable(bucket_count=8, storage="cuckoo", cuckoo_ways=2)
+
+        for i in range(1000):
+            ht.put(f"key-{i}", f"val-{i}")
+            self.assertTrue(ht.stash_count <= ht.cuckoo_stash_size)
+
+        for i in range(1000):
+            return_value = ht.get(f"key-{i}")
+            self.assertTrue(return_value == f"val-{i}")
+
+    def test_hash_table_unknown_storage(self):
+        with self.assertRaises(Exception):
+            HashTable(storage="unknown")
+
+    def test_hash_table_rejects_weak_hasher(self):
+        with self.assertRaises(Exception):
+            HashTable(storage="cuckoo", hasher="naive")
+
+    def test_hash_table_rejects_colliding_hasher(self):
+        # "Ez" and "FY" have the same djb2 hash, so these 8 keys all do too,
+        # and no seed can tell them apart
+        keys = ["".join(parts) for parts in itertools.product(["Ez", "FY"], repeat=3)]
+        self.assertTrue(len({hash_tools.djb2_hash(key) for key in keys}) == 1)
+
+        with self.assertRaises(Exception):
+            HashTable(storage="cuckoo", hasher="djb2")
+
+        for hasher in HashTable.cuckoo_hashers:
+            ht = HashTable(bucket_count=8, storage="cuckoo", hasher=hasher)
+
+            for key in keys:
+                ht.put(key, key)
+
+            for key in keys:
+                self.assertTrue(ht.get(key) == key)
+
+    def test_hash_table_stash_overflow_at_max(self):
+        ht = HashTable(bucket_count=8, max_bucket_count=8, storage="cuckoo")
+
+        with self.assertRaises(Exception):
+            for i in range(100):
+                ht.put(f"key-{i}", f"val-{i}")
+
+        # the push that overflowed is undone
+        self.assertTrue(len(ht) == i)
+        self.assertTrue(f"key-{i}" not in ht)
+        self.assertTrue(len(list(ht.items())) == i)
+        for j in range(i):
+            self.assertTrue(ht.get(f"key-{j}") == f"val-{j}")
+
+    def test_hash_table_grows_past_chain_max(self):
+        ht = HashTable(storage="cuckoo")
+        item_count = HashTable.DEFAULT_MAX_BUCKET_COUNT
+
+        for i in range(item_count):
+            ht.put(f"key-{i}", f"val-{i}")
+
+        self.assertTrue(len(ht) == item_count)
+        self.assertTrue(ht.bucket_count > HashTable.DEFAULT_MAX_BUCKET_COUNT)
+        for i in range(0, item_count, 0o100):
+            self.assertTrue(ht.get(f"key-{i}") == f"val-{i}")
+
+    def test_hash_table_seeds_are_independent(self):
+        # under a hash that's linear in its state, seeding the state shifts
+        # every key of a given length alike, so the difference between two
+        # seeds' hashes would be the same for all of them
+        for hasher in HashTable.cuckoo_hashers:
+            hash = hash_tools.get_hasher(hasher)
+            differences = {hash(f"key-{i:04}", seed=1) - hash(f"key-{i:04}", seed=0) for i in range(100)}
+            self.assertTrue(len(differences) > 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
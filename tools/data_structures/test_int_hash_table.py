@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from . import int_hash_table
+from .int_hash_table import IntHashTable
+
+
+class TestIntHashTable(unittest.TestCase):
+
+    def test_int_hash_table_push_find_pop(self):
+        rng = random.Random(0)
+        ht = IntHashTable()
+        expected = {}
+
+        for __ in range(5000):
+            key = rng.randrange(-2**63, 2**63) if rng.random() < 0.1 else rng.randrange(500)
+            if rng.random() < 0.7:
+                value = rng.randrange(2**40)
+                ht.push_item(key, value)
+                expected[key] = value
+            else:
+                (value, item_count) = ht.pop_item(key)
+                self.assertTrue(value == expected.pop(key, None))
+                self.assertTrue(item_count == len(expected))
+
+        self.assertTrue(len(ht) == len(expected))
+        self.assertTrue(dict(ht.items()) == expected)
+        self.assertTrue(all(ht[key] == value for (key, value) in expected.items()))
+        self.assertTrue(ht.find_item(10**6) is None and 10**6 not in ht)
+
+        for key in list(expected):
+            del ht[key]
+
+        self.assertTrue(len(ht) == 0)
+        self.assertTrue(ht.bucket_count == IntHashTable.DEFAULT_MIN_BUCKET_COUNT)
+
+    def test_int_hash_table_value_typecodes(self):
+        floats = IntHashTable(value_typecode="d", default_value=-1.0)
+        objects = IntHashTable(value_typecode=None)
+
+        for i in range(100):
+            floats[i] = i / 4
+            objects[i] = str(i)
+
+        self.assertTrue(floats[10] == 2.5 and floats[100] == -1.0)
+        self.assertTrue(objects[10] == "10" and objects[100] is None)
+
+    def test_int_hash_table_many(self):
+        for value_typecode in ("q", None):
+            ht = IntHashTable(value_typecode=value_typecode)
+            ht.put_many([1, 2, 3, 2], [10, 20, 30, 40])
+            ht.put_many(range(3, 1003), range(3, 1003))
+
+            self.assertTrue(len(ht) == 1002)
+            self.assertTrue(ht[2] == 40 and ht[3] == 3 and ht[1002] == 1002)
+
+            (values, found) = ht.get_many([1, 2, 5000, 999])
+            self.assertTrue(list(found) == [True, True, False, True])
+            self.assertTrue([values[i] for i in (0, 1, 3)] == [10, 40, 999])
+
+            for key in range(1, 1003, 2):
+                ht.pop_item(key)
+
+            (values, found) = ht.get_many(range(1, 1003))
+            self.assertTrue(list(found) == [key % 2 == 0 for key in range(1, 1003)])
+
+    def test_int_hash_table_many_without_numpy(self):
+        numpy = int_hash_table.numpy
+        int_hash_table.numpy = None
+
+        try:
+            ht = IntHashTable()
+            ht.put_many([1, 2, 3, 2], [10, 20, 30, 40])
+            self.assertTrue(ht.get_many([2, 4]) == ([40, None], [True, False]))
+        finally:
+            int_hash_table.numpy = numpy
+
+    def test_int_hash_table_full_without_resizing(self):
+        ht = IntHashTable(bucket_count=8)
+
+        for key in range(8):
+            ht.push_item(key, key * 10, should_resize=False)
+
+        # the table grows rather than fill its last empty bucket,
+        # so misses still end
+        self.assertTrue(ht.bucket_count > 8)
+        self.assertTrue(ht.find_item(100) is None)
+        self.assertTrue(100 not in ht)
+        self.assertTrue(ht.pop_item(100, should_resize=False) == (None, 8))
+        self.assertTrue(all(ht.find_item(key) == key * 10 for key in range(8)))
+
+        if int_hash_table.numpy is not None:
+            (values, found) = ht.get_many([3, 100])
+            self.assertTrue(list(found) == [True, False])
+
+        for key in range(8):
+            self.assertTrue(ht.pop_item(key, should_resize=False) == (key * 10, 7 - key))
+
+
+if __name__ == "__main__":
+    unittest.main()
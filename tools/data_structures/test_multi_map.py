@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from .multi_map import MultiMap
+
+
+class TestMultiMap(unittest.TestCase):
+
+    def test_multi_map_append_and_values(self):
+        mm = MultiMap()
+
+        for i in range(100):
+            mm.append(f"key-{i % 7}", i)
+
+        self.assertTrue(len(mm) == 7)
+        self.assertTrue(mm.value_count == 100)
+        self.assertTrue(list(mm.values("key-3")) == list(range(3, 100, 7)))
+        self.assertTrue(mm.count("key-3") == len(range(3, 100, 7)))
+        self.assertTrue(mm.count("missing") == 0)
+        self.assertTrue(list(mm.values("missing")) == [])
+        self.assertTrue(sorted(mm.items(), key=lambda item: item[1]) == [(f"key-{i % 7}", i) for i in range(100)])
+
+    def test_multi_map_remove(self):
+        mm = MultiMap(typecode="q")
+
+        mm.extend("a", [1, 2, 3, 2, 5, 6, 7])
+
+        self.assertTrue(mm.remove("a", 2))
+        self.assertTrue(list(mm.values("a")) == [1, 3, 2, 5, 6, 7])
+        self.assertTrue(not mm.remove("a", 4))
+        self.assertTrue(not mm.remove("b", 1))
+
+        for value in (7, 6, 5, 2, 3):
+            self.assertTrue(mm.remove("a", value))
+
+        self.assertTrue(list(mm.values("a")) == [1])
+        mm.append("a", 8)
+        self.assertTrue(list(mm.values("a")) == [1, 8])
+
+        self.assertTrue(mm.remove("a", 1) and mm.remove("a", 8))
+        self.assertTrue("a" not in mm)
+        self.assertTrue(len(mm) == 0 and mm.value_count == 0)
+
+    def test_multi_map_against_lists(self):
+        rng = random.Random(0)
+        mm = MultiMap()
+        expected = {}
+
+        for i in range(3000):
+            key = rng.randrange(50)
+            if rng.random() < 0.7:
+                mm.append(key, i)
+                expected.setdefault(key, []).append(i)
+            elif expected.get(key):
+                value = rng.choice(expected[key])
+                self.assertTrue(mm.remove(key, value))
+                expected[key].remove(value)
+                if not expected[key]:
+                    del expected[key]
+
+        self.assertTrue(sorted(mm.keys()) == sorted(expected))
+        self.assertTrue(all(list(mm.values(key)) == values for (key, values) in expected.items()))
+
+        size = mm.arena_size
+        self.assertTrue(mm.compact() == mm.value_count <= size)
+        self.assertTrue(all(list(mm.values(key)) == values for (key, values) in expected.items()))
+
+        self.assertTrue(mm.pop_key(next(iter(expected))) == expected.pop(next(iter(expected))))
+        self.assertTrue(len(mm) == len(expected))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import random
+import unittest
+
+from .ordered_hash_table import OrderedHashTable
+
+
+class TestOrderedHashTable(unittest.TestCase):
+
+    def test_ordered_hash_table_insertion_order(self):
+        ht = OrderedHashTable(bucket_count=8)
+
+        keys = [f"key-{i}" for i in range(100)]
+        random.Random(0).shuffle(keys)
+
+        for (i, key) in enumerate(keys):
+            ht.put(key, i)
+
+        self.assertTrue(len(ht) == 100)
+        self.assertTrue(list(ht.keys()) == keys)
+        self.assertTrue(list(ht.values()) == list(range(100)))
+        self.assertTrue(all(ht.get(key) == i for (i, key) in enumerate(keys)))
+
+        # updating a key keeps its place
+        ht.put(keys[0], "first")
+        self.assertTrue(list(ht.items())[0] == (keys[0], "first"))
+
+    def test_ordered_hash_table_pop_and_reinsert(self):
+        ht = OrderedHashTable()
+
+        for i in range(50):
+            ht.put(str(i), i)
+
+        for i in range(0, 50, 2):
+            self.assertTrue(ht.pop(str(i)) == (i, 49 - i // 2))
+
+        self.assertTrue(ht.pop("missing") == (None, 25))
+        self.assertTrue(ht.get("0") is None)
+        self.assertTrue(list(ht) == [str(i) for i in range(1, 50, 2)])
+
+        # a re-pushed key goes to the end
+        ht.put("0", "back")
+        self.assertTrue(list(ht)[-1] == "0")
+        self.assertTrue(ht.get("0") == "back")
+
+    def test_ordered_hash_table_resize(self):
+        ht = OrderedHashTable(bucket_count=8, max_bucket_count=64)
+
+        for i in range(1000):
+            ht.put(i, i * i)
+
+        self.assertTrue(len(ht) == 1000)
+        self.assertTrue(ht.load_factor < 1)
+        self.assertTrue(all(ht.get(i) == i * i for i in range(1000)))
+
+        for i in range(990):
+            ht.delete(i)
+
+        self.assertTrue(len(ht) == 10)
+        self.assertTrue(ht.entry_count < 100)
+        self.assertTrue(list(ht.items()) == [(i, i * i) for i in range(990, 1000)])
+
+        # churn leaves deleted entries behind, which resizes squeeze out
+        for i in range(5000):
+            ht.put(f"churn-{i}", i)
+            ht.delete(f"churn-{i}")
+
+        self.assertTrue(len(ht) == 10)
+        self.assertTrue(ht.entry_count < ht.bucket_count)
+
+    def test_ordered_hash_table_full_index(self):
+        ht = OrderedHashTable(bucket_count=8)
+
+        keys = [f"key-{i}" for i in range(8)]
+        for key in keys:
+            ht.push_item(key, key.upper(), should_resize=False)
+        self.assertTrue(ht.bucket_count == 8)
+
+        # with no empty slot left, misses still end
+        self.assertTrue(ht.find_item("missing") is None)
+        self.assertTrue("missing" not in ht)
+        self.assertTrue(ht.pop_item("missing", should_resize=False) == (None, 8))
+        self.assertTrue(all(ht.find_item(key) == key.upper() for key in keys))
+
+        # and a new key grows the index, even without resizing
+        ht.push_item("key-8", "KEY-8", should_resize=False)
+        keys.append("key-8")
+        self.assertTrue(ht.bucket_count == 16)
+        self.assertTrue(list(ht.keys()) == keys)
+        self.assertTrue(all(ht.find_item(key) == key.upper() for key in keys))
+
+        # deleted slots are reused, rather than growing
+        ht = OrderedHashTable(bucket_count=8)
+        for key in keys[:8]:
+            ht.push_item(key, key, should_resize=False)
+        ht.pop_item("key-3", should_resize=False)
+        ht.push_item("key-8", "key-8", should_resize=False)
+        self.assertTrue(ht.bucket_count == 8)
+        self.assertTrue(list(ht.keys()) == keys[:3] + keys[4:])
+
+    def test_ordered_hash_table_churn_without_resizing(self):
+        ht = OrderedHashTable(bucket_count=8)
+        ht.push_item("first", 0, should_resize=False)
+
+        # every cycle appends an entry, past what the index's typecode can point at
+        for i in range(1000):
+            ht.push_item(f"key-{i}", i, should_resize=False)
+            self.assertTrue(ht.pop_item(f"key-{i}", should_resize=False) == (i, 1))
+
+        self.assertTrue(ht.bucket_count == 8)
+        self.assertTrue(ht.entry_count < 1000)
+        self.assertTrue(list(ht.items()) == [("first", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import random
+import unittest
+
+from .space_saving import SpaceSaving
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_space_saving_exact_under_capacity(self):
+        ss = SpaceSaving(capacity=10)
+
+        ss.add_many(["a", "b", "a", "c", "a", "b"])
+
+        self.assertTrue(ss.top() == [("a", 3, 0), ("b", 2, 0), ("c", 1, 0)])
+        self.assertTrue(ss.top(1) == [("a", 3, 0)])
+
+    def test_space_saving_mixed_keys(self):
+        ss = SpaceSaving(capacity=4)
+
+        ss.add(1)
+        ss.add("a")
+        ss.add((2, 3))
+        ss.add(None)
+        ss.add("b")
+
+        # ties go to the key that took its counter first
+        self.assertTrue(ss.top() == [("b", 2, 1), ("a", 1, 0), ((2, 3), 1, 0), (None, 1, 0)])
+        self.assertTrue(ss.top(2) == [("b", 2, 1), ("a", 1, 0)])
+
+    def test_space_saving_finds_heavy_hitters(self):
+        rng = random.Random(0)
+        keys = [f"heavy-{i % 5}" for i in range(500)]
+        keys += [f"light-{rng.randrange(1000)}" for i in range(1500)]
+        rng.shuffle(keys)
+
+        ss = SpaceSaving(capacity=50)
+        ss.add_many(keys)
+
+        self.assertTrue(len(ss) == 50)
+        self.assertTrue(ss.item_count == 2000)
+
+        top = ss.top(5)
+        self.assertTrue(sorted(key for (key, count, error) in top) == [f"heavy-{i}" for i in range(5)])
+
+        # estimates never under-count, and over-count by at most `error`
+        for (key, count, error) in top:
+            self.assertTrue(count - error <= 100 <= count)
+
+
+if __name__ == "__main__":
+    unittest.main()
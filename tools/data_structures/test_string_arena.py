@@ -0,0 +1,115 @@
+import random
+import unittest
+
+from .string_arena import StringArena, ArenaHashTable
+
+
+class TestStringArena(unittest.TestCase):
+
+    def test_string_arena_interning(self):
+        arena = StringArena()
+
+        key_ids = [arena.add(*arena.encode(f"key-{i % 100}")) for i in range(300)]
+
+        self.assertTrue(len(arena) == 100)
+        self.assertTrue(key_ids[:100] == key_ids[100:200] == list(range(100)))
+        self.assertTrue(arena.key(42) == "key-42" and arena.find("key-42") == 42)
+        self.assertTrue(arena.find("key-100") is None and "key-100" not in arena)
+        self.assertTrue(arena.byte_count == sum(len(f"key-{i}") for i in range(100)))
+
+    def test_arena_hash_table(self):
+        for arena in (None, StringArena()):
+            rng = random.Random(0)
+            ht = ArenaHashTable(arena=arena)
+            expected = {}
+
+            for i in range(3000):
+                key = f"käy-{rng.randrange(400)}"
+                if rng.random() < 0.7:
+                    ht.push_item(key, i)
+                    expected[key] = i
+                else:
+                    (value, item_count) = ht.pop_item(key)
+                    self.assertTrue(value == expected.pop(key, None))
+                    self.assertTrue(item_count == len(expected))
+
+            self.assertTrue(dict(ht.items()) == expected)
+            self.assertTrue(all(ht[key] == value for (key, value) in expected.items()))
+            self.assertTrue(ht.find_item("käy-400") is None and "käy-400" not in ht)
+
+    def test_arena_hash_tables_share_keys(self):
+        arena = StringArena()
+        ht_1 = ArenaHashTable(arena=arena)
+        ht_2 = ArenaHashTable(arena=arena)
+
+        for i in range(50):
+            ht_1[f"key-{i}"] = i
+            ht_2[f"key-{i}"] = -i
+
+        self.assertTrue(len(arena) == 50)
+        self.assertTrue(ht_1["key-7"] == 7 and ht_2["key-7"] == -7)
+
+    def test_arena_hash_table_compacts_own_arena(self):
+        ht = ArenaHashTable()
+        live = []
+
+        # a table that keeps replacing its keys
+        for i in range(5000):
+            key = f"key-{i}"
+            ht[key] = i
+            live.append(key)
+            if len(live) > 20:
+                del ht[live.pop(0)]
+            self.assertTrue(len(ht.arena) <= 2 * max(len(ht), ht.bucket_count) + 1)
+
+        self.assertTrue(len(ht) == 20)
+        self.assertTrue(sorted(ht.keys()) == sorted(live))
+        self.assertTrue(all(ht[key] == int(key[4:]) for key in live))
+        self.assertTrue(ht["key-0"] is None)
+
+        # popping and pushing the same key back churns the arena too
+        for __ in range(1000):
+            ht.pop_item("key-4999")
+            ht["key-4999"] = 4999
+        self.assertTrue(len(ht.arena) <= 2 * ht.bucket_count + 1)
+        self.assertTrue(ht["key-4999"] == 4999)
+
+    def test_arena_hash_table_keeps_shared_arena(self):
+        arena = StringArena()
+        ht = ArenaHashTable(arena=arena)
+
+        for i in range(200):
+            ht[f"key-{i}"] = i
+            del ht[f"key-{i}"]
+
+        self.assertTrue(ht.arena is arena and len(arena) == 200)
+        self.assertTrue(arena.find("key-7") is not None)
+
+    def test_arena_hash_table_full_without_resizing(self):
+        keys = [f"key-{i}" for i in range(8)]
+
+        for arena in (None, StringArena(bucket_count=8, load_before_resize_up=2)):
+            ht = ArenaHashTable(arena=arena, bucket_count=8)
+
+            for key in keys:
+                ht.push_item(key, key.upper(), should_resize=False)
+
+            # the table grows rather than fill its last empty slot,
+            # so misses still end
+            self.assertTrue(ht.bucket_count > 8)
+            self.assertTrue(ht.find_item("x") is None)
+            self.assertTrue("x" not in ht)
+            self.assertTrue(ht.pop_item("x", should_resize=False) == (None, 8))
+            self.assertTrue(all(ht.find_item(key) == key.upper() for key in keys))
+
+            for key in keys:
+                ht.pop_item(key, should_resize=False)
+            self.assertTrue(len(ht) == 0)
+
+        # nor does an interning arena fill its index, however high its load
+        self.assertTrue(arena.find("x") is None)
+        self.assertTrue(all(arena.find(key) is not None for key in keys))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+############################################################
+
+############################################################
+#   hashing functions
+############################################################
+
+# A nonzero `seed` scrambles the finished hash through a seeded finalizer
+# (MurmurHash3's `fmix`), so one function can be drawn on as a family of
+# (roughly) independent hashes. Seeding the starting state instead would not
+# do: these hashes are linear in their state, so every key would shift alike.
+# Either way, keys whose unseeded hashes are equal stay equal under every seed,
+# so a family drawn this way is only as good as the unseeded hash's collisions.
+SEED_MIXER = 0x9E3779B97F4A7C15
+
+
+def seed_hash_32(s_hash, seed):
+
+    if seed == 0:
+        return s_hash
+
+    s_hash ^= (seed * SEED_MIXER) & 0xFFFFFFFF
+    s_hash ^= s_hash >> 16
+    s_hash = (s_hash * 0x85EBCA6B) & 0xFFFFFFFF
+    s_hash ^= s_hash >> 13
+    s_hash = (s_hash * 0xC2B2AE35) & 0xFFFFFFFF
+    s_hash ^= s_hash >> 16
+
+    return s_hash
+
+
+def seed_hash_64(s_hash, seed):
+
+    if seed == 0:
+        return s_hash
+
+    s_hash ^= (seed * SEED_MIXER) & 0xFFFFFFFFFFFFFFFF
+    s_hash ^= s_hash >> 33
+    s_hash = (s_hash * 0xFF51AFD7ED558CCD) & 0xFFFFFFFFFFFFFFFF
+    s_hash ^= s_hash >> 33
+    s_hash = (s_hash * 0xC4CEB9FE1A85EC53) & 0xFFFFFFFFFFFFFFFF
+    s_hash ^= s_hash >> 33
+
+    return s_hash
+
+
+def naive_hash(string, seed=0):
+    """
+    `naive_hash_bytes` of `string`, encoded to UTF-8.
+    """
+
+    return naive_hash_bytes(str(string).encode(), seed)
+
+
+def naive_hash_bytes(s_bytes, seed=0):
+    """
+    Naïve hash from bytes to integer.
+    """
+
+    s_hash = 0
+
+    for b in s_bytes:
+        s_hash += b
+        s_hash &= 0xFFFFFFFF
+
+    return seed_hash_32(s_hash, seed)
+
+
+def djb2_hash(string, seed=0):
+    """
+    `djb2_hash_bytes` of `string`, encoded to UTF-8.
+    """
+
+    return djb2_hash_bytes(str(string).encode(), seed)
+
+
+def djb2_hash_bytes(s_bytes, seed=0):
+    """
+    DJB2 32-bit hash function
+    """
+
+    s_hash = 5381
+
+    for b in s_bytes:
+        s_hash *= 0x21
+        s_hash += b
+        s_hash &= 0xFFFFFFFF
+
+    return seed_hash_32(s_hash, seed)
+
+
+def fnv1_hash(string, seed=0):
+    """
+    `fnv1_hash_bytes` of `string`, encoded to UTF-8.
+    """
+
+    return fnv1_hash_bytes(str(string).encode(), seed)
+
+
+def fnv1_hash_bytes(s_bytes, seed=0):
+    """
+    FNV-1 64-bit hash function
+    """
+
+    s_hash = 0xCBF29CE484222325
+
+    for b in s_bytes:
+        s_hash *= 0x100000001B3
+        s_hash += b
+        s_hash &= 0xFFFFFFFFFFFFFFFF
+
+    return seed_hash_64(s_hash, seed)
+
+
+def fnv1a_hash(string, seed=0):
+    """
+    `fnv1a_hash_bytes` of `string`, encoded to UTF-8.
+    """
+
+    return fnv1a_hash_bytes(str(string).encode(), seed)
+
+
+def fnv1a_hash_bytes(s_bytes, seed=0):
+    """
+    FNV-1a 64-bit hash function
+    """
+
+    s_hash = 0xCBF29CE484222325
+
+    for b in s_bytes:
+        s_hash += b
+        s_hash *= 0x100000001B3
+        s_hash &= 0xFFFFFFFFFFFFFFFF
+
+    return seed_hash_64(s_hash, seed)
+
+
+hashers = {
+    "naive": naive_hash,
+    "djb2": djb2_hash,
+    "fnv1": fnv1_hash,
+    "fnv1a": fnv1a_hash,
+}
+
+# how each function applies a seed to its unseeded hash, so that
+# `seed_hashers[name](hashers[name](key), seed) == hashers[name](key, seed)`,
+# and one hash of a key can be reseeded without hashing the key again
+seed_hashers = {
+    "naive": seed_hash_32,
+    "djb2": seed_hash_32,
+    "fnv1": seed_hash_64,
+    "fnv1a": seed_hash_64,
+}
+
+# the same functions, of keys already encoded to `bytes`
+bytes_hashers = {
+    "naive": naive_hash_bytes,
+    "djb2": djb2_hash_bytes,
+    "fnv1": fnv1_hash_bytes,
+    "fnv1a": fnv1a_hash_bytes,
+}
+
+
+def get_hasher(name):
+    """
+    Look up a hashing function by name.
+    """
+
+    if name not in hashers:
+        raise Exception("UnknownHasherError")
+    else:
+        return hashers[name]
+
+
+def get_seed_hasher(name):
+    """
+    Look up the seeding function of a hashing function by name.
+    """
+
+    if name not in seed_hashers:
+        raise Exception("UnknownHasherError")
+    else:
+        return seed_hashers[name]
+
+
+def get_bytes_hasher(name):
+    """
+    Look up a hashing function of `bytes` by name.
+    """
+
+    if name not in bytes_hashers:
+        raise Exception("UnknownHasherError")
+    else:
+        return bytes_hashers[name]
@@ -0,0 +1,438 @@
+############################################################
+
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+
+from tools import hash_tools
+from tools.data_structures.hash_set import HashSet
+from tools.data_structures.multi_map import MultiMap
+from tools.data_structures.ordered_hash_table import OrderedHashTable
+
+############################################################
+
+JOIN_TYPES = ("inner", "left", "semi", "anti")
+BUILD_SIDES = ("left", "right")
+
+DEFAULT_PARTITION_COUNT = 0o100
+
+# partitions are picked by a differently-seeded hash than the tables use,
+# so each partition's keys still spread over its table's buckets
+PARTITION_SEED = 0o11
+
+############################################################
+#   spilling
+############################################################
+
+
+class Partitions:
+    """
+    Sets of `partition_count` files of pickled records under `spill_dir` (by
+    default, a temporary directory), each record written to the file of the
+    set that its key hashes to, so records with equal keys always land in the
+    same file. Writing to a named set again appends to its files.
+    """
+
+    def __init__(self, spill_dir=None, partition_count=DEFAULT_PARTITION_COUNT, prefix="partitions"):
+
+        self.__partition_count = partition_count
+        self.__spill_dir = spill_dir
+        self.__owns_spill_dir = False
+        self.__prefix = prefix
+        self.__names = itertools.count()
+
+        # the sets written so far, which later writes append to
+        self.__written_names = HashSet()
+
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return
+
+    @property
+    def partition_count(self):
+        return self.__partition_count
+
+    def partition_index(self, key):
+        return hash_tools.fnv1a_hash(key, seed=PARTITION_SEED) % self.__partition_count
+
+    def write(self, records, key, name=None):
+        """
+        Write every record of `records` to the partition of `key(record)`,
+        in the set of files called `name`, appending to them if it was written
+        before, or (by default) in a new set.
+        Returns the partition files' paths, one per partition.
+        """
+
+        if self.__spill_dir is None:
+            self.__spill_dir = tempfile.mkdtemp(prefix=f"{self.__prefix}-")
+            self.__owns_spill_dir = True
+
+        name = f"{next(self.__names):04}" if name is None else name
+        paths = [
+            os.path.join(self.__spill_dir, f"{self.__prefix}-{name}-{partition_index:04}.pickle")
+            for partition_index in range(self.__partition_count)
+        ]
+
+        # (files left in `spill_dir` by anything else are overwritten)
+        mode = "ab" if self.__written_names.contains(name) else "wb"
+        self.__written_names.add(name)
+
+        files = [open(path, mode) for path in paths]
+        try:
+            for record in records:
+                pickle.dump(record, files[self.partition_index(key(record))])
+        finally:
+            for f in files:
+                f.close()
+
+        return paths
+
+    @staticmethod
+    def read(path):
+        """
+        Yield the records of the partition file at `path`, in order.
+        """
+
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    break
+
+        return
+
+    def close(self):
+        """
+        Delete the partition files, if they're in a temporary directory.
+        """
+
+        if self.__owns_spill_dir:
+            shutil.rmtree(self.__spill_dir, ignore_errors=True)
+            self.__spill_dir = None
+            self.__owns_spill_dir = False
+
+        return
+
+
+############################################################
+#   hash join
+############################################################
+
+
+def hash_join(
+    left,
+    right,
+    key=None,
+    left_key=None,
+    right_key=None,
+    how="inner",
+    build=None,
+    memory_budget=None,
+    spill_dir=None,
+    partition_count=DEFAULT_PARTITION_COUNT,
+):
+    """
+    Join the records of the iterables `left` and `right` where
+    `left_key(left_record) == right_key(right_record)` (both `key` by default).
+
+    Yield, according to `how`:
+    -   "inner": a `(left_record, right_record)` pair per match.
+    -   "left": the same, plus `(left_record, None)` per unmatched left record.
+    -   "semi": each left record that has a match, once.
+    -   "anti": each left record that has no match.
+
+    The `build` side ("left" or "right") is held in a table, and the other side
+    is streamed past it. By default, that's the smaller side, if both have
+    lengths, else the right. Results come out in the order of the streamed
+    side, but when building on the left, unmatched left records (and, for a
+    semi join, each left record) come out as they are settled.
+
+    With a `memory_budget`, if the build side has more than that many records,
+    both sides are split into `partition_count` files by key, on disk under
+    `spill_dir` (by default, a temporary directory), and joined file by file
+    (a "grace" hash join). A file that is still over budget is joined in memory.
+    """
+
+    left_key = key if left_key is None else left_key
+    right_key = key if right_key is None else right_key
+
+    if left_key is None or right_key is None:
+        raise Exception("MissingKeyError")
+
+    if how not in JOIN_TYPES:
+        raise Exception("UnknownJoinTypeError")
+
+    if build is None:
+        if hasattr(left, "__len__") and hasattr(right, "__len__") and len(left) < len(right):
+            build = "left"
+        else:
+            build = "right"
+
+    if build not in BUILD_SIDES:
+        raise Exception("UnknownBuildSideError")
+
+    if memory_budget is None:
+        yield from join_in_memory(left, right, left_key, right_key, how, build)
+        return
+
+    # hold back up to the budget of the build side, to see if it fits
+    if build == "left":
+        (left, fits) = buffer_up_to(left, memory_budget)
+    else:
+        (right, fits) = buffer_up_to(right, memory_budget)
+
+    if fits:
+        yield from join_in_memory(left, right, left_key, right_key, how, build)
+        return
+
+    with Partitions(spill_dir, partition_count, prefix="hash_join") as partitions:
+        left_paths = partitions.write(left, left_key, name="left")
+        right_paths = partitions.write(right, right_key, name="right")
+
+        for (left_path, right_path) in zip(left_paths, right_paths):
+            yield from join_in_memory(
+                Partitions.read(left_path),
+                Partitions.read(right_path),
+                left_key,
+                right_key,
+                how,
+                build,
+            )
+
+    return
+
+
+def buffer_up_to(records, count):
+    """
+    Read up to `count` of the iterable `records` ahead.
+    Returns `(records, fits)`: the records, as a list if there were no
+    more than `count` (and `fits` is true), or else as an iterator of
+    all of them, the ones read ahead first.
+    """
+
+    records = iter(records)
+    head = list(itertools.islice(records, count + 1))
+
+    if len(head) <= count:
+        return (head, True)
+    else:
+        return (itertools.chain(head, records), False)
+
+
+def join_in_memory(left, right, left_key, right_key, how, build):
+    """
+    `hash_join`, without spilling.
+    """
+
+    if build == "right":
+
+        # semi and anti joins only ask whether a key is on the right
+        if how in ("semi", "anti"):
+            right_keys = HashSet(right_key(record) for record in right)
+            for left_record in left:
+                if right_keys.contains(left_key(left_record)) == (how == "semi"):
+                    yield left_record
+            return
+
+        (right_records, table) = build_table(right, right_key)
+
+        for left_record in left:
+            is_matched = False
+            for position in table.values(left_key(left_record)):
+                is_matched = True
+                yield (left_record, right_records[position])
+            if how == "left" and not is_matched:
+                yield (left_record, None)
+
+        return
+
+    (left_records, table) = build_table(left, left_key)
+    is_matched = bytearray(len(left_records))
+
+    for right_record in right:
+        for position in table.values(right_key(right_record)):
+            if how in ("inner", "left"):
+                yield (left_records[position], right_record)
+            elif how == "semi" and not is_matched[position]:
+                yield left_records[position]
+            is_matched[position] = 1
+
+    if how in ("left", "anti"):
+        for (position, left_record) in enumerate(left_records):
+            if not is_matched[position]:
+                yield (left_record, None) if how == "left" else left_record
+
+    return
+
+
+def build_table(records, key):
+    """
+    Returns `(records, table)`: the iterable `records` as a list,
+    and a `MultiMap` of each key => the positions of its records in the list.
+    """
+
+    records = list(records)
+    table = MultiMap(typecode="q")
+
+    for (position, record) in enumerate(records):
+        table.append(key(record), position)
+
+    return (records, table)
+
+
+############################################################
+#   group by
+############################################################
+
+
+class Aggregation:
+    """
+    An aggregate over the records of a group, computed through partial states:
+    a group starts at `initial()`, each record is folded in by `add(state, record)`,
+    two partial states of the same group combine by `merge(state, other_state)`,
+    and the final state becomes the result by `finish(state)`.
+    Since partial states merge, groups can be aggregated piecemeal.
+    """
+
+    def __init__(self, initial, add, merge, finish=None):
+
+        self.initial = initial
+        self.add = add
+        self.merge = merge
+        self.finish = (lambda state: state) if finish is None else finish
+
+        return
+
+
+def count():
+    return Aggregation(lambda: 0, lambda state, record: state + 1, lambda a, b: a + b)
+
+
+def total(value):
+    return Aggregation(lambda: 0, lambda state, record: state + value(record), lambda a, b: a + b)
+
+
+def minimum(value):
+    return Aggregation(
+        lambda: None,
+        lambda state, record: value(record) if state is None else min(state, value(record)),
+        lambda a, b: b if a is None else a if b is None else min(a, b),
+    )
+
+
+def maximum(value):
+    return Aggregation(
+        lambda: None,
+        lambda state, record: value(record) if state is None else max(state, value(record)),
+        lambda a, b: b if a is None else a if b is None else max(a, b),
+    )
+
+
+def mean(value):
+    return Aggregation(
+        lambda: (0, 0),
+        lambda state, record: (state[0] + value(record), state[1] + 1),
+        lambda a, b: (a[0] + b[0], a[1] + b[1]),
+        lambda state: state[0] / state[1] if state[1] else None,
+    )
+
+
+def collect(value):
+
+    def add(state, record):
+        state.append(value(record))
+        return state
+
+    return Aggregation(lambda: [], add, lambda a, b: a + b)
+
+
+def group_by(
+    records,
+    key,
+    aggregations,
+    memory_budget=None,
+    spill_dir=None,
+    partition_count=DEFAULT_PARTITION_COUNT,
+):
+    """
+    Group the iterable `records` by `key(record)`, and aggregate each group.
+    `aggregations` is a dict of names => `Aggregation`s.
+    Yield `(key, results)` per group, `results` being a dict of each name
+    => its aggregate, in the order the groups first appear.
+
+    Each group keeps one partial state per aggregation, in an `OrderedHashTable`.
+    With a `memory_budget`, whenever more than that many groups are held,
+    their partial states are appended to `partition_count` files by key, on
+    disk under `spill_dir` (by default, a temporary directory), and the table
+    is emptied; at the end, each file's partial states are merged group by
+    group. Groups then come out partition by partition.
+    """
+
+    names = tuple(aggregations)
+    aggregations = tuple(aggregations[name] for name in names)
+
+    states = OrderedHashTable(default_value=None)
+    paths = None
+
+    with Partitions(spill_dir, partition_count, prefix="group_by") as partitions:
+
+        for record in records:
+            record_key = key(record)
+            group_states = states.find_item(record_key)
+
+            if group_states is None:
+                if memory_budget is not None and len(states) >= memory_budget:
+                    paths = partitions.write(states.items(), key=lambda item: item[0], name="states")
+                    states = OrderedHashTable(default_value=None)
+                group_states = [aggregation.initial() for aggregation in aggregations]
+                states.push_item(record_key, group_states)
+
+            for (i, aggregation) in enumerate(aggregations):
+                group_states[i] = aggregation.add(group_states[i], record)
+
+        if paths is None:
+            yield from finish_groups(states, names, aggregations)
+            return
+
+        paths = partitions.write(states.items(), key=lambda item: item[0], name="states")
+        states = None
+
+        for path in paths:
+            partition_states = OrderedHashTable(default_value=None)
+
+            for (record_key, group_states) in Partitions.read(path):
+                merged_states = partition_states.find_item(record_key)
+                if merged_states is None:
+                    partition_states.push_item(record_key, group_states)
+                else:
+                    for (i, aggregation) in enumerate(aggregations):
+                        merged_states[i] = aggregation.merge(merged_states[i], group_states[i])
+
+            yield from finish_groups(partition_states, names, aggregations)
+
+    return
+
+
+def finish_groups(states, names, aggregations):
+    """
+    Yield `(key, results)` for each group of partial `states`.
+    """
+
+    for (record_key, group_states) in states.items():
+        yield (
+            record_key,
+            {
+                name: aggregation.finish(state)
+                for (name, aggregation, state) in zip(names, aggregations, group_states)
+            },
+        )
+
+    return
@@ -0,0 +1,389 @@
+############################################################
+
+import functools
+import itertools
+import multiprocessing
+import os
+import pickle
+
+from tools.data_structures.hash_table import HashTable
+
+############################################################
+#   memo
+############################################################
+
+# stands in for "not cached", since `None` may well be a cached value
+MISSING = object()
+
+
+class Memo:
+    """
+    A cache of computed values in a `HashTable`, keyed by tuples,
+    that counts its hits and misses.
+
+    Any keyword arguments are passed on to the `HashTable`.
+    """
+
+    def __init__(self, **table_kwargs):
+
+        self.__table_kwargs = {**table_kwargs, "default_value": MISSING}
+        self.__table = HashTable(**self.__table_kwargs)
+        self.__hit_count = 0
+        self.__miss_count = 0
+
+        return
+
+    #-----------------------------------------------------------
+
+    def __len__(self):
+        return len(self.__table)
+
+    def __contains__(self, key):
+        return self.__table.find_item(key) is not MISSING
+
+    @property
+    def table(self):
+        return self.__table
+
+    @property
+    def hit_count(self):
+        return self.__hit_count
+
+    @hit_count.setter
+    def hit_count(self, value):
+        self.__hit_count = value
+        return
+
+    @property
+    def miss_count(self):
+        return self.__miss_count
+
+    @miss_count.setter
+    def miss_count(self, value):
+        self.__miss_count = value
+        return
+
+    @property
+    def hit_ratio(self):
+        """
+        The fraction of lookups that found a cached value (0 before any lookup).
+        """
+
+        lookup_count = self.__hit_count + self.__miss_count
+
+        if lookup_count == 0:
+            return 0
+        else:
+            return self.__hit_count / lookup_count
+
+    def stats(self):
+        """
+        Returns a dict of the cache's size, hit and miss counts, and hit ratio.
+        """
+
+        return {
+            "size": len(self),
+            "hit_count": self.__hit_count,
+            "miss_count": self.__miss_count,
+            "hit_ratio": self.hit_ratio,
+        }
+
+    #-----------------------------------------------------------
+
+    def lookup(self, key):
+        """
+        Get `key`'s cached value, counting a hit or a miss.
+        Returns the value, or `MISSING`.
+        """
+
+        value = self.__table.find_item(key)
+
+        if value is MISSING:
+            self.__miss_count += 1
+        else:
+            self.__hit_count += 1
+
+        return value
+
+    def store(self, key, value):
+        self.__table.push_item(key, value)
+        return value
+
+    def clear(self):
+        self.__table = HashTable(**self.__table_kwargs)
+        self.__hit_count = 0
+        self.__miss_count = 0
+        return
+
+
+############################################################
+#   memoize
+############################################################
+
+
+def memoize(function=None, **table_kwargs):
+    """
+    Decorate `function` to cache its results in a `Memo`, by the tuple of its arguments.
+    The decorated function's `memo` attribute holds the cache, and its stats.
+
+    Use as `@memoize`, or as `@memoize(**table_kwargs)` to size the `HashTable`.
+    """
+
+    if function is None:
+        return lambda function: memoize(function, **table_kwargs)
+
+    memo = Memo(**table_kwargs)
+
+    @functools.wraps(function)
+    def memoized(*args, **kwargs):
+
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+
+        value = memo.lookup(key)
+        if value is MISSING:
+            value = memo.store(key, function(*args, **kwargs))
+
+        return value
+
+    memoized.memo = memo
+
+    return memoized
+
+
+############################################################
+#   recurrences
+############################################################
+
+
+def evaluate(state, children, combine, memo=None):
+    """
+    Evaluate a recurrence at `state` with an explicit stack instead of recursion,
+    so no depth of recurrence can overflow Python's call stack.
+    -   `children(state)` returns the states the value of `state` depends on
+        (empty for a base case).
+    -   `combine(state, values)` returns the value of `state`,
+        given the `values` of its children, in the same order.
+    -   `memo` caches the value of every state evaluated (by default, a new `Memo`),
+        so each state is computed only once, and can be shared between calls.
+
+    States must be hashable by the `HashTable`, such as tuples of numbers.
+    Returns the value of `state`.
+    """
+
+    if memo is None:
+        memo = Memo()
+
+    value = memo.lookup(state)
+    if value is not MISSING:
+        return value
+
+    # each frame is `[state, its children, the values of those looked at so far]`
+    stack = [[state, tuple(children(state)), []]]
+
+    while stack:
+        (frame_state, frame_children, values) = stack[-1]
+
+        # gather the values of the children that are cached already,
+        # and descend into the first one that isn't
+        while len(values) < len(frame_children):
+            child = frame_children[len(values)]
+            value = memo.lookup(child)
+            if value is MISSING:
+                stack.append([child, tuple(children(child)), []])
+                break
+            values.append(value)
+
+        else:
+            # every child has been evaluated, so combine them,
+            # and hand the value to the parent
+            value = memo.store(frame_state, combine(frame_state, values))
+            stack.pop()
+            if stack:
+                stack[-1][2].append(value)
+
+    return value
+
+
+############################################################
+#   lookup table
+############################################################
+
+
+class LookupTable(Memo):
+    """
+    A `Memo` of a pure `function` over a small discrete `domain`:
+    one iterable of values per argument, whose product is every call to cache.
+
+    The table can be filled eagerly, with `precompute`, or lazily, as the
+    table is called: a call that misses is computed, and cached. With a
+    `path`, the table starts from what was last `save`d there.
+
+    When every argument's domain is a `range`, the values of calls within the
+    domain are also kept in a dense list, indexed by the arguments' positions
+    in their ranges, so those lookups need no hashing at all.
+
+    Any other keyword arguments are passed on to the `HashTable`.
+    """
+
+    def __init__(self, function, domain=None, path=None, **table_kwargs):
+
+        super().__init__(**table_kwargs)
+
+        self.__function = function
+        self.__domain = domain
+        self.__path = path
+
+        if domain is not None and all(isinstance(values, range) for values in domain):
+            self.__ranges = tuple(domain)
+            self.__dense = [MISSING] * functools.reduce(
+                lambda size, values: size * len(values), self.__ranges, 1
+            )
+        else:
+            self.__ranges = None
+            self.__dense = None
+
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+        functools.update_wrapper(self, function)
+
+        return
+
+    #-----------------------------------------------------------
+
+    @property
+    def function(self):
+        return self.__function
+
+    @property
+    def domain(self):
+        return self.__domain
+
+    @property
+    def path(self):
+        return self.__path
+
+    #-----------------------------------------------------------
+
+    def dense_index(self, args):
+        """
+        Return the index of `args` in the dense list,
+        or `None` if there is none, or `args` is outside of the domain.
+        """
+
+        if self.__ranges is None or len(args) != len(self.__ranges):
+            return None
+
+        index = 0
+
+        for (arg, values) in zip(args, self.__ranges):
+            # (`in` on a range is only quick for ints)
+            if type(arg) is not int or arg not in values:
+                return None
+            index = index * len(values) + values.index(arg)
+
+        return index
+
+    def lookup(self, key):
+
+        index = self.dense_index(key)
+
+        if index is None:
+            return super().lookup(key)
+
+        value = self.__dense[index]
+
+        if value is MISSING:
+            self.miss_count += 1
+        else:
+            self.hit_count += 1
+
+        return value
+
+    def store(self, key, value):
+
+        index = self.dense_index(key)
+
+        if index is not None:
+            self.__dense[index] = value
+
+        return super().store(key, value)
+
+    def clear(self):
+
+        super().clear()
+
+        if self.__dense is not None:
+            self.__dense = [MISSING] * len(self.__dense)
+
+        return
+
+    def __call__(self, *args):
+
+        value = self.lookup(args)
+        if value is MISSING:
+            value = self.store(args, self.__function(*args))
+
+        return value
+
+    def precompute(self, domain=None, processes=1):
+        """
+        Compute and cache `function` at every point of `domain` (by default,
+        the table's) that isn't cached yet. With more than one of `processes`
+        (`None` for one per core), the points are computed by a process pool,
+        so `function` must be picklable, such as a module-level function.
+        Returns the number of points computed.
+        """
+
+        domain = self.__domain if domain is None else domain
+
+        if domain is None:
+            raise Exception("MissingDomainError")
+
+        points = [args for args in itertools.product(*domain) if args not in self]
+
+        if processes == 1 or len(points) < 2:
+            values = [self.__function(*args) for args in points]
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                values = pool.starmap(self.__function, points)
+
+        for (args, value) in zip(points, values):
+            self.store(args, value)
+
+        return len(points)
+
+    ########################################
+    #   persistence
+    ########################################
+
+    def save(self, path=None):
+        """
+        Write the cached `(args, value)` pairs to the file at `path` (by default,
+        the table's), through a temporary file, so a reader never sees half of one.
+        """
+
+        path = self.__path if path is None else path
+
+        with open(f"{path}.tmp", "wb") as f:
+            pickle.dump(list(self.table.items()), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(f"{path}.tmp", path)
+
+        return
+
+    def load(self, path=None):
+        """
+        Cache the `(args, value)` pairs in the file at `path` (by default, the table's).
+        Returns the number of pairs loaded.
+        """
+
+        path = self.__path if path is None else path
+
+        with open(path, "rb") as f:
+            items = pickle.load(f)
+
+        for (args, value) in items:
+            self.store(args, value)
+
+        return len(items)
@@ -0,0 +1,202 @@
+import os
+import random
+import tempfile
+import unittest
+
+from .join_tools import (
+    BUILD_SIDES,
+    JOIN_TYPES,
+    Aggregation,
+    Partitions,
+    collect,
+    count,
+    group_by,
+    hash_join,
+    maximum,
+    mean,
+    minimum,
+    total,
+)
+
+
+def brute_force_join(left, right, left_key, right_key, how):
+    results = []
+
+    for left_record in left:
+        matches = [right_record for right_record in right if left_key(left_record) == right_key(right_record)]
+        if how == "inner":
+            results.extend((left_record, right_record) for right_record in matches)
+        elif how == "left":
+            results.extend((left_record, right_record) for right_record in matches or [None])
+        elif how == "semi" and matches:
+            results.append(left_record)
+        elif how == "anti" and not matches:
+            results.append(left_record)
+
+    return sorted(results, key=repr)
+
+
+def brute_force_group_by(records, key, value):
+    groups = {}
+
+    for record in records:
+        groups.setdefault(key(record), []).append(value(record))
+
+    return {
+        group_key: {
+            "count": len(values),
+            "total": sum(values),
+            "minimum": min(values),
+            "maximum": max(values),
+            "mean": sum(values) / len(values),
+            "collect": sorted(values),
+        }
+        for (group_key, values) in groups.items()
+    }
+
+
+class TestJoinTools(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0o100)
+
+        # (id, key, payload), with repeated keys on both sides, and keys on only one side
+        self.left = [(i, rng.randrange(60), f"l{i}") for i in range(300)]
+        self.right = [(i, rng.randrange(40, 100), f"r{i}") for i in range(200)]
+
+    def assert_joins(self, **kwargs):
+        key = lambda record: record[1]  # noqa: E731
+
+        for how in JOIN_TYPES:
+            expected = brute_force_join(self.left, self.right, key, key, how)
+            for build in BUILD_SIDES:
+                results = list(hash_join(self.left, self.right, key=key, how=how, build=build, **kwargs))
+                self.assertTrue(sorted(results, key=repr) == expected)
+
+    def test_hash_join(self):
+        self.assert_joins()
+
+    def test_hash_join_within_budget(self):
+        self.assert_joins(memory_budget=1000)
+
+    def test_hash_join_spilled(self):
+        self.assert_joins(memory_budget=10, partition_count=7)
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            self.assert_joins(memory_budget=10, partition_count=3, spill_dir=spill_dir)
+            self.assertTrue(len(os.listdir(spill_dir)) == 2 * 3)
+
+    def test_hash_join_keys(self):
+        left = [("a", 1), ("b", 2), ("c", 2)]
+        right = [(2, "x"), (3, "y"), (2, "z")]
+
+        left_key = lambda record: record[1]  # noqa: E731
+        right_key = lambda record: record[0]  # noqa: E731
+
+        results = hash_join(left, right, left_key=left_key, right_key=right_key)
+        self.assertTrue(
+            sorted(results) == [(("b", 2), (2, "x")), (("b", 2), (2, "z")), (("c", 2), (2, "x")), (("c", 2), (2, "z"))]
+        )
+
+        # unsized inputs, and the order of the streamed side
+        results = list(hash_join(iter(left), iter(right), left_key=left_key, right_key=right_key, how="left"))
+        self.assertTrue(
+            [left_record for (left_record, __) in results] == [("a", 1), ("b", 2), ("b", 2), ("c", 2), ("c", 2)]
+        )
+
+        with self.assertRaises(Exception):
+            list(hash_join(left, right))
+        with self.assertRaises(Exception):
+            list(hash_join(left, right, key=len, how="outer"))
+        with self.assertRaises(Exception):
+            list(hash_join(left, right, key=len, build="middle"))
+
+    def test_group_by(self):
+        rng = random.Random(0o200)
+        records = [(f"g{rng.randrange(50)}", rng.randrange(-100, 100)) for __ in range(2000)]
+
+        aggregations = {
+            "count": count(),
+            "total": total(lambda record: record[1]),
+            "minimum": minimum(lambda record: record[1]),
+            "maximum": maximum(lambda record: record[1]),
+            "mean": mean(lambda record: record[1]),
+            "collect": collect(lambda record: record[1]),
+        }
+        expected = brute_force_group_by(records, lambda record: record[0], lambda record: record[1])
+
+        for kwargs in ({}, {"memory_budget": 1000}, {"memory_budget": 7, "partition_count": 5}):
+            groups = list(group_by(records, lambda record: record[0], aggregations, **kwargs))
+
+            self.assertTrue(len(groups) == len(expected))
+            for (group_key, results) in groups:
+                expected_results = dict(expected[group_key])
+                self.assertTrue(abs(results.pop("mean") - expected_results.pop("mean")) < 1e-9)
+                results["collect"] = sorted(results["collect"])
+                self.assertTrue(results == expected_results)
+
+        # without spilling, groups come out in the order they first appear
+        groups = list(group_by(records, lambda record: record[0], {"count": count()}))
+        first_seen = list(dict.fromkeys(record[0] for record in records))
+        self.assertTrue([group_key for (group_key, __) in groups] == first_seen)
+
+    def test_group_by_spilled(self):
+        records = [(i % 40, i) for i in range(1000)]
+        aggregations = {
+            "total": total(lambda record: record[1]),
+            "first": Aggregation(
+                lambda: None,
+                lambda state, record: record[1] if state is None else state,
+                lambda a, b: b if a is None else a,
+            ),
+        }
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            groups = dict(
+                group_by(
+                    records,
+                    lambda record: record[0],
+                    aggregations,
+                    memory_budget=8,
+                    spill_dir=spill_dir,
+                    partition_count=4,
+                )
+            )
+
+            # every spill appends to the same set of partition files
+            self.assertTrue(len(os.listdir(spill_dir)) == 4)
+
+        self.assertTrue(groups == {key: {"total": sum(range(key, 1000, 40)), "first": key} for key in range(40)})
+
+    def test_partitions(self):
+        with tempfile.TemporaryDirectory() as spill_dir:
+            with Partitions(spill_dir, partition_count=4, prefix="test") as partitions:
+                paths = partitions.write(range(100), key=lambda x: x % 10, name="numbers")
+                self.assertTrue(partitions.write(range(100, 200), key=lambda x: x % 10, name="numbers") == paths)
+                other_paths = partitions.write(range(10), key=lambda x: x)
+
+                self.assertTrue(len(paths) == 4 and not set(paths) & set(other_paths))
+
+                # both writes are in the files, in order, each record in its key's file
+                records = [list(Partitions.read(path)) for path in paths]
+                self.assertTrue(sorted(x for partition in records for x in partition) == list(range(200)))
+                for (partition_index, partition) in enumerate(records):
+                    self.assertTrue(partition == sorted(partition))
+                    self.assertTrue(all(partitions.partition_index(x % 10) == partition_index for x in partition))
+
+            # a given spill directory is left in place
+            self.assertTrue(len(os.listdir(spill_dir)) == 8)
+
+            # and a new run starts its sets afresh
+            with Partitions(spill_dir, partition_count=4, prefix="test") as partitions:
+                paths = partitions.write(range(10), key=lambda x: x, name="numbers")
+                self.assertTrue(sorted(x for path in paths for x in Partitions.read(path)) == list(range(10)))
+
+        with Partitions() as partitions:
+            paths = partitions.write(range(10), key=lambda x: x)
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+        self.assertTrue(not any(os.path.exists(path) for path in paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from .memo_tools import MISSING, LookupTable, Memo, evaluate, memoize
+
+
+class TestMemo(unittest.TestCase):
+
+    def test_memo(self):
+        memo = Memo()
+        self.assertTrue(len(memo) == 0)
+        self.assertTrue(memo.hit_ratio == 0)
+
+        self.assertTrue(memo.lookup((1, 2)) is MISSING)
+        self.assertTrue(memo.store((1, 2), None) is None)
+        self.assertTrue(memo.lookup((1, 2)) is None)
+        self.assertTrue((1, 2) in memo)
+        self.assertTrue((2, 1) not in memo)
+
+        self.assertTrue(memo.store((2, 1), "x") == "x")
+        self.assertTrue(memo.lookup((2, 1)) == "x")
+        self.assertTrue(len(memo) == 2)
+
+        # `in` doesn't count as a lookup
+        self.assertTrue(memo.stats() == {"size": 2, "hit_count": 2, "miss_count": 1, "hit_ratio": 2 / 3})
+
+        memo.clear()
+        self.assertTrue(memo.stats() == {"size": 0, "hit_count": 0, "miss_count": 0, "hit_ratio": 0})
+        self.assertTrue((1, 2) not in memo)
+
+    def test_memo_table_kwargs(self):
+        memo = Memo(bucket_count=0o10, max_bucket_count=0o10)
+
+        for i in range(0o100):
+            memo.store((i,), i)
+        self.assertTrue(memo.table.bucket_count == 0o10)
+
+        memo.clear()
+        self.assertTrue(memo.table.bucket_count == 0o10)
+        self.assertTrue(memo.table.find_item((0,)) is MISSING)
+
+    def test_memoize(self):
+        calls = []
+
+        @memoize
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+
+        self.assertTrue(add.__name__ == "add")
+        self.assertTrue(add(1) == 1 and add(1) == 1)
+        self.assertTrue(add(1, 2) == 3 and add(1, 2) == 3)
+        self.assertTrue(add(1, b=2) == 3 and add(1, b=2) == 3)
+        self.assertTrue(calls == [(1, 0), (1, 2), (1, 2)])
+
+        self.assertTrue(add.memo.stats() == {"size": 3, "hit_count": 3, "miss_count": 3, "hit_ratio": 1 / 2})
+
+    def test_memoize_kwargs(self):
+
+        @memoize(bucket_count=0o20, max_bucket_count=0o20)
+        def square(x):
+            return None if x < 0 else x * x
+
+        # `None` results are cached too
+        self.assertTrue(square(-1) is None and square(-1) is None)
+        self.assertTrue([square(x) for x in range(0o100)] == [x * x for x in range(0o100)])
+        self.assertTrue(square.memo.hit_count == 1)
+        self.assertTrue(square.memo.table.max_bucket_count == 0o20)
+
+    def test_evaluate(self):
+
+        def children(n):
+            return () if n < 2 else (n - 1, n - 2)
+
+        def combine(n, values):
+            return n if n < 2 else values[0] + values[1]
+
+        (a, b) = (0, 1)
+        fibonacci = [a]
+        for __ in range(0o100):
+            (a, b) = (b, a + b)
+            fibonacci.append(a)
+
+        memo = Memo()
+        for n in range(0o100):
+            self.assertTrue(evaluate(n, children, combine, memo=memo) == fibonacci[n])
+
+        # each state is combined once, and every call after the first is a hit
+        self.assertTrue(len(memo) == 0o100)
+        self.assertTrue(evaluate(0o77, children, combine, memo=memo) == fibonacci[0o77])
+        self.assertTrue(len(memo) == 0o100)
+
+        # far deeper than the call stack would allow
+        depth = sys.getrecursionlimit() * 4
+        total = evaluate(depth, lambda n: () if n == 0 else (n - 1,), lambda n, values: n + sum(values))
+        self.assertTrue(total == depth * (depth + 1) // 2)
+
+    def test_evaluate_order(self):
+        # children's values come back in the order the children were given
+        seen = []
+
+        def combine(state, values):
+            seen.append((state, tuple(values)))
+            return state
+
+        evaluate("abc", lambda s: tuple(s[:i] + s[i + 1:] for i in range(len(s))) if len(s) > 1 else (), combine)
+        self.assertTrue(seen[-1] == ("abc", ("bc", "ac", "ab")))
+        self.assertTrue(len(seen) == len(set(seen)))
+
+
+class TestLookupTable(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "table.cache")
+        self.calls = []
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def power(self, x, y):
+        self.calls.append((x, y))
+        return x**y
+
+    def test_lookup_table_hits_and_misses(self):
+        table = LookupTable(self.power, domain=(range(2, 6), range(1, 4)))
+        self.assertTrue(table.__name__ == "power")
+
+        self.assertTrue(table.lookup((2, 3)) is MISSING)
+        self.assertTrue(table(2, 3) == 8 and table(2, 3) == 8)
+        self.assertTrue(table.lookup((2, 3)) == 8)
+
+        # calls outside of the domain, or not of ints, are cached by hashing
+        self.assertTrue(table(9, 2) == 81 and table(9, 2) == 81)
+        self.assertTrue(table(2.0, 3) == 8.0 and table(2.0, 3) == 8.0)
+        self.assertTrue(table.dense_index((9, 2)) is None and table.dense_index((2.0, 3)) is None)
+        self.assertTrue(table.dense_index((2, 1)) == 0 and table.dense_index((5, 3)) == 11)
+
+        self.assertTrue(self.calls == [(2, 3), (9, 2), (2.0, 3)])
+        self.assertTrue(table.stats() == {"size": 3, "hit_count": 4, "miss_count": 4, "hit_ratio": 1 / 2})
+
+        table.clear()
+        self.assertTrue(table.lookup((2, 3)) is MISSING)
+        self.assertTrue(table(2, 3) == 8)
+        self.assertTrue(self.calls[-1] == (2, 3))
+
+    def test_lookup_table_without_ranges(self):
+        table = LookupTable(self.power, domain=([2, 3], (1, 2)))
+        self.assertTrue(table.dense_index((2, 1)) is None)
+
+        self.assertTrue(table.precompute() == 4)
+        self.assertTrue(table.precompute() == 0)
+        self.assertTrue(table(3, 2) == 9 and table.hit_count == 1)
+        self.assertTrue(len(self.calls) == 4)
+
+    def test_lookup_table_precompute(self):
+        table = LookupTable(self.power, domain=(range(2, 6), range(1, 4)))
+        table(2, 1)
+
+        self.assertTrue(table.precompute() == 11)
+        self.assertTrue(len(table) == 12)
+        self.assertTrue(sorted(self.calls) == sorted((x, y) for x in range(2, 6) for y in range(1, 4)))
+
+        # a domain of its own, for the call
+        self.assertTrue(table.precompute(domain=([7], [2])) == 1 and table(7, 2) == 49)
+
+        with self.assertRaises(Exception):
+            LookupTable(self.power).precompute()
+
+    def test_lookup_table_precompute_processes(self):
+        table = LookupTable(pow, domain=(range(2, 6), range(1, 4)))
+
+        self.assertTrue(table.precompute(processes=2) == 12)
+        self.assertTrue(all(table.lookup((x, y)) == x**y for x in range(2, 6) for y in range(1, 4)))
+        self.assertTrue(table.miss_count == 0)
+
+    def test_lookup_table_persistence(self):
+        table = LookupTable(self.power, domain=(range(2, 6), range(1, 4)), path=self.path)
+        self.assertTrue(len(table) == 0)
+
+        table.precompute()
+        table(9, 2)
+        table.save()
+        self.assertTrue(os.path.exists(self.path) and not os.path.exists(f"{self.path}.tmp"))
+
+        # a new table starts from the file, and computes nothing it has
+        self.calls = []
+        loaded = LookupTable(self.power, domain=(range(2, 6), range(1, 4)), path=self.path)
+        self.assertTrue(len(loaded) == 13)
+        self.assertTrue(loaded.precompute() == 0)
+        self.assertTrue(loaded(3, 3) == 27 and loaded(9, 2) == 81)
+        self.assertTrue(self.calls == [] and loaded.hit_count == 2)
+
+        # saving and loading elsewhere
+        path = os.path.join(self.temp_dir.name, "other.cache")
+        loaded.save(path)
+        other = LookupTable(self.power)
+        self.assertTrue(other.load(path) == 13)
+        self.assertTrue(other(5, 3) == 125 and self.calls == [])
+
+
+if __name__ == "__main__":
+    unittest.main()